@@ -0,0 +1,9 @@
+"""Benchmarks for the summarizer pipeline.
+
+Run from the repository root with the package installed (or with
+`src/main/python` on PYTHONPATH):
+
+  python -m benchmarks.run --sizes 1000 10000 --out results.json
+  python -m benchmarks.bench_catalog
+  python -m benchmarks.bench_loading
+"""
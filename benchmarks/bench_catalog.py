@@ -0,0 +1,63 @@
+"""Compare catalog range lookups with the glob + regex scan in find_notes.
+
+Usage:
+  python -m benchmarks.bench_catalog            # 10k and 100k files
+  python -m benchmarks.bench_catalog --sizes 1000 10000
+"""
+
+import argparse
+import datetime as dt
+import tempfile
+import time
+from pathlib import Path
+
+from summarizer.catalog import NoteCatalog
+from summarizer.file_ops import scan_notes
+
+from .corpus import generate, last_day
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def run(count: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = generate(Path(tmp) / "notes", count, words=20)
+        # A 14-day context window plus the last day of the corpus.
+        end = last_day(count)
+        start = end - dt.timedelta(days=14)
+
+        catalog = NoteCatalog(root, db_path=Path(tmp) / "catalog.sqlite3")
+        t = time.perf_counter()
+        catalog.rebuild()
+        build = time.perf_counter() - t
+
+        glob_s = timed(lambda: scan_notes(root, start, end))
+        refresh_s = timed(catalog.refresh)
+        query_s = timed(lambda: catalog.query(start, end))
+        assert catalog.query(start, end) == scan_notes(root, start, end)
+        catalog.close()
+
+    print(
+        f"{count:>7} files | glob scan {glob_s * 1000:8.1f} ms | "
+        f"catalog refresh {refresh_s * 1000:6.2f} ms + query "
+        f"{query_s * 1000:6.2f} ms | initial build {build:6.1f} s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+    for count in args.sizes:
+        run(count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Tail latency with and without hedged requests, offline.
+
+The primary is a FakeClient whose calls occasionally stall or fail; the
+backup is slower on average but well behaved. The same sequence of calls is
+made through a HedgedClient holding only the primary (retries, no hedging)
+and through one holding both, and the latency percentiles and winners are
+compared. Times are scaled down so a run takes seconds.
+
+Usage:
+  python -m benchmarks.bench_hedging
+  python -m benchmarks.bench_hedging --requests 500 --stall-rate 0.05 --async
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from summarizer.hedging import HedgedClient, LatencyHistory, percentile
+
+from .fake_client import FakeClient
+
+PROMPT = "# ID: 2024-01-01-note  [2024-01-01]\nSome notes."
+
+
+def clients(args: argparse.Namespace) -> List[FakeClient]:
+    primary = FakeClient(
+        latency=args.latency, jitter=args.latency / 4, seed=1,
+        stall_rate=args.stall_rate, stall=args.stall,
+        fail_rate=args.fail_rate, model="primary",
+    )
+    backup = FakeClient(latency=args.latency * 1.5, jitter=args.latency / 4,
+                        seed=2, model="backup")
+    return [primary, backup]
+
+
+def run(client: HedgedClient, n: int, use_async: bool) -> List[float]:
+    times: List[float] = []
+    for _ in range(n):
+        t = time.perf_counter()
+        try:
+            if use_async:
+                asyncio.run(client.acomplete(PROMPT))
+            else:
+                client.complete(PROMPT)
+        except RuntimeError:
+            pass   # every provider failed; its time still counts
+        times.append(time.perf_counter() - t)
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="Primary's mean latency in seconds")
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    parser.add_argument("--stall", type=float, default=0.5,
+                        help="Latency of a stalled call in seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.02)
+    parser.add_argument("--percentile", type=float, default=95.0)
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Use acomplete, which cancels the losing request")
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests, primary {args.latency * 1000:.0f} ms, "
+          f"{args.stall_rate:.0%} stall for {args.stall * 1000:.0f} ms, "
+          f"{args.fail_rate:.0%} fail")
+    for label, n_clients in (("primary only", 1), ("hedged", 2)):
+        hedged = HedgedClient(
+            clients(args)[:n_clients], LatencyHistory(),
+            hedge_percentile=args.percentile, initial_delay=args.latency * 5,
+            backoff=args.latency, max_backoff=args.latency * 8,
+        )
+        times = run(hedged, args.requests, args.use_async)
+        wins: Dict[str, int] = {}
+        for o in hedged.outcomes:
+            key = f"{o.winner.split('/')[-1]} ({o.reason.split(':')[0]})"
+            wins[key] = wins.get(key, 0) + 1
+        print(f"\n{label}")
+        print("  " + "  ".join(
+            f"p{p}: {percentile(times, p) * 1000:7.1f} ms" for p in (50, 95, 99)
+        ) + f"  max: {max(times) * 1000:7.1f} ms")
+        print(f"  failed: {args.requests - len(hedged.outcomes)}  wins: "
+              + ", ".join(f"{k} {v}" for k, v in sorted(wins.items())))
+
+
+if __name__ == "__main__":
+    main()
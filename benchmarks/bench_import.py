@@ -0,0 +1,64 @@
+"""Import-time budget check for CLI startup, based on `python -X importtime`.
+
+Measures the cumulative import time of `summarizer.cli` (the console entry
+point) and checks that neither `--help` nor an early "No transcripts found"
+exit imports a provider SDK. Exits non-zero when a budget is exceeded, so it
+can gate CI:
+
+  python -m benchmarks.bench_import --budget-ms 30
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+SDK_MODULES = ("openai", "anthropic", "google.generativeai")
+
+
+def import_times(args: List[str]) -> Dict[str, int]:
+    """Run python -X importtime with args; return module -> cumulative microseconds."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True, text=True, stdin=subprocess.DEVNULL,
+    )
+    times: Dict[str, int] = {}
+    for m in LINE.finditer(proc.stderr):
+        times[m.group(4)] = int(m.group(2))
+    return times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=30.0,
+                        help="Max cumulative import time of summarizer.cli (default: 30)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [
+        import_times(["-c", "import summarizer.cli"]).get("summarizer.cli", 0)
+        for _ in range(args.repeat)
+    ]
+    best_ms = min(samples) / 1000
+    ok = best_ms <= args.budget_ms
+    print(f"summarizer.cli import: {best_ms:.1f} ms (budget {args.budget_ms:.0f} ms)"
+          f" {'OK' if ok else 'OVER BUDGET'}")
+
+    with tempfile.TemporaryDirectory() as empty:
+        paths = {
+            "--help": ["-m", "summarizer", "--help"],
+            "no transcripts": ["-m", "summarizer", "2025-01-01", "--input-dir", empty],
+        }
+        for label, argv in paths.items():
+            loaded = [m for m in import_times(argv) if m.startswith(SDK_MODULES)]
+            print(f"{label}: {'imports ' + ', '.join(sorted(loaded)[:3]) if loaded else 'no SDK imports'}")
+            ok = ok and not loaded
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,72 @@
+"""Compare serial and parallel transcript loading on cold and warm page cache.
+
+Cold-cache runs evict each file with posix_fadvise(POSIX_FADV_DONTNEED) before
+timing; on platforms without it only warm numbers are reported. For a
+network or cloud-synced folder pass it with --input-dir (files are only read).
+
+Usage:
+  python -m benchmarks.bench_loading --count 500
+  python -m benchmarks.bench_loading --input-dir ~/transcripts --workers 4 16
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from summarizer.file_ops import load_notes
+
+from .corpus import generate
+
+
+def evict(paths: List[Path]) -> bool:
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for p in paths:
+        fd = os.open(p, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+
+def bench(paths: List[Path], workers: int, processes: int, cold: bool) -> float:
+    if cold and not evict(paths):
+        return float("nan")
+    t = time.perf_counter()
+    load_notes(paths, io_workers=workers, parse_processes=processes)
+    return time.perf_counter() - t
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input-dir", type=Path, default=None)
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--words", type=int, default=1500, help="Words per note")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--processes", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.input_dir
+        if root is None:
+            root = generate(Path(tmp), args.count, args.words)
+        paths = sorted(root.glob("*.json"))
+        baseline = load_notes(paths)
+        print(f"{len(paths)} files")
+        for workers in args.workers:
+            assert load_notes(paths, workers, args.processes) == baseline
+            cold = bench(paths, workers, args.processes, cold=True)
+            warm = min(bench(paths, workers, args.processes, cold=False) for _ in range(3))
+            print(
+                f"io_workers={workers:>3} parse_processes={args.processes} | "
+                f"cold {cold * 1000:8.1f} ms | warm {warm * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
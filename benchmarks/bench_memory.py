@@ -0,0 +1,88 @@
+"""Peak RSS of loading and trimming a large window, eager vs. lazy notes.
+
+"eager" reads every note in the window up front, as a glob scan does.
+"lazy" takes the window from the note catalog, trims on the recorded text
+lengths, and reads only the notes that survive. Each mode runs in a fresh
+subprocess so the peak RSS figures are independent.
+
+Usage:
+  python -m benchmarks.bench_memory                      # 100k notes
+  python -m benchmarks.bench_memory --count 20000 --context-days 500
+"""
+
+import argparse
+import datetime as dt
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from summarizer.catalog import NoteCatalog
+from summarizer.file_ops import find_notes, load_texts, trim_notes
+from summarizer.prompts import build_prompt
+
+from .corpus import generate, last_day
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def child(mode: str, root: Path, db: Path, day: dt.date, context_days: int,
+          max_chars: int) -> None:
+    t = time.perf_counter()
+    catalog = NoteCatalog(root, db_path=db) if mode == "lazy" else None
+    notes = find_notes(root, day, day, context_days, catalog=catalog, io_workers=8)
+    kept = trim_notes(notes, max_chars)
+    load_texts(kept, io_workers=8)
+    prompt = build_prompt(kept, day, day, context_days)
+    elapsed = time.perf_counter() - t
+    print(f"{len(notes)} {len(kept)} {len(prompt)} {elapsed:.3f} {peak_rss_mb():.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--words", type=int, default=200)
+    parser.add_argument("--context-days", type=int, default=2000)
+    parser.add_argument("--max-chars", type=int, default=120_000)
+    parser.add_argument("--corpus-root", type=Path,
+                        default=Path(tempfile.gettempdir()) / "summarizer-bench")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "DB"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    root = args.corpus_root / f"corpus_{args.count}_{args.words}w"
+    day = last_day(args.count)
+    if args.child:
+        mode, db = args.child
+        child(mode, root, Path(db), day, args.context_days, args.max_chars)
+        return
+
+    generate(root, args.count, args.words)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "catalog.sqlite3"
+        with NoteCatalog(root, db_path=db) as catalog:
+            catalog.refresh()
+        print(f"{args.count} notes, {args.context_days}-day window, "
+              f"--max-chars {args.max_chars}")
+        for mode in ("eager", "lazy"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_memory",
+                 "--count", str(args.count), "--words", str(args.words),
+                 "--context-days", str(args.context_days),
+                 "--max-chars", str(args.max_chars),
+                 "--corpus-root", str(args.corpus_root),
+                 "--child", mode, str(db)],
+                capture_output=True, text=True, check=True,
+            ).stdout.split()
+            window, kept, prompt, elapsed, rss = out
+            print(f"{mode:>6}: {window} notes in window, {kept} kept, "
+                  f"{float(elapsed) * 1000:8.1f} ms, peak RSS {rss} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Time transcript parsing per JSON backend and check they all agree.
+
+Every backend in `summarizer.file_ops.JSON_BACKENDS` that is installed is run
+over transcripts of realistic lengths, and over a set of odd inputs, and its
+output is compared with the original `json.loads` implementation. Timing is
+the best of --repeat runs; peak memory is the tracemalloc peak of one parse.
+
+Usage:
+  python -m benchmarks.bench_parsing
+  python -m benchmarks.bench_parsing --minutes 5 60 600 --repeat 10
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from typing import List, Optional, Tuple, Union
+
+from summarizer.file_ops import JSON_BACKENDS, json_backends, parse_note
+
+from .corpus import _segments
+
+WORDS_PER_MINUTE = 150
+
+ODD_INPUTS = [
+    b"[]", b" [ ] ", b"{}", b'"text"', b"null", b"[1, 2, 3]",
+    b'[{"text": "  a  "}, {"text": 5}, {"text": null}, "text", [{"text": "b"}]]',
+    b'[{"start": NaN, "text": "nan start"}]',
+    b'[{"text": "\\ud800 lone surrogate"}]',
+    b'[{"text": "dup"}, {"text": "first", "text": "last"}]',
+    b'\xef\xbb\xbf[{"text": "utf-8 bom"}]',
+    '[{"text": "utf-16"}]'.encode("utf-16"),
+    b'[{"text": "  "}, {"text": ""}]',
+    b'[{"text": "caf\xc3\xa9 \\u00e9\\n line"}]',
+    b'[{"text": "trailing"},]', b'[{"text": "x"}] extra', b'[{"text": "x"}',
+    b"", b"not json",
+]
+
+
+def reference_parse(name: str, raw: Union[str, bytes]) -> Optional[Tuple[str, str]]:
+    """parse_note as it was before backends were added."""
+    blobs = json.loads(raw)
+    texts: List[str] = []
+    if isinstance(blobs, list):
+        for obj in blobs:
+            if isinstance(obj, dict) and isinstance(obj.get("text"), str):
+                texts.append(obj["text"].strip())
+    content = "\n\n".join(t for t in texts if t)
+    return (name, content) if content else None
+
+
+def outcome(fn, raw: bytes) -> object:
+    try:
+        return fn(raw)
+    except Exception as e:
+        return type(e).__name__ if not isinstance(e, ValueError) else "ValueError"
+
+
+def check(samples: List[bytes]) -> None:
+    for raw in samples:
+        expected = outcome(lambda r: reference_parse("n", r), raw)
+        for backend in json_backends():
+            got = outcome(lambda r: parse_note("n", r, backend), raw)
+            if got != expected:
+                raise SystemExit(
+                    f"{backend} differs on {raw[:60]!r}: {got!r} != {expected!r}"
+                )
+        if outcome(lambda r: parse_note("n", r), raw) != expected:
+            raise SystemExit(f"parse_note differs on {raw[:60]!r}")
+
+
+def transcript(minutes: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    return json.dumps(_segments(rng, minutes * WORDS_PER_MINUTE)).encode()
+
+
+def best_of(fn, raw: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn(raw)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def peak_mb(fn, raw: bytes) -> float:
+    tracemalloc.start()
+    fn(raw)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=int, nargs="+", default=[5, 60, 180, 1200],
+                        help="Transcript lengths to time, in minutes of speech")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [transcript(m) for m in args.minutes]
+    check(ODD_INPUTS + samples)
+    print(f"backends: {', '.join(json_backends())} "
+          f"(of {', '.join(JSON_BACKENDS)}); all match the reference parser")
+
+    rows = [("reference", lambda r: reference_parse("n", r))]
+    rows += [(b, lambda r, b=b: parse_note("n", r, b)) for b in json_backends()]
+    rows.append(("default", lambda r: parse_note("n", r)))
+    for minutes, raw in zip(args.minutes, samples):
+        print(f"\n{minutes} min, {len(raw) / 1e6:.2f} MB")
+        for name, fn in rows:
+            secs = best_of(fn, raw, args.repeat)
+            print(f"  {name:>10}: {secs * 1000:8.2f} ms  {len(raw) / 1e6 / secs:7.1f} MB/s"
+                  f"  peak {peak_mb(fn, raw):6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Throughput and 429s against a local stub provider that enforces limits.
+
+The stub server (`StubProvider`) accepts POST /v1/complete and admits at
+most rpm/60 requests and tpm/60 tokens in each one-second window, like a
+provider that quantizes its per-minute limits. Requests over the limit get
+a 429 with `retry-after-ms` and OpenAI-style `x-ratelimit-*` headers.
+
+The same burst of concurrent requests is sent three ways:
+
+  unmanaged   no retries; every 429 is a failure
+  reactive    the scheduler with no configured limits, retrying 429s
+              after the wait their headers ask for
+  scheduled   the scheduler configured with the stub's limits
+
+Usage:
+  python -m benchmarks.bench_ratelimit
+  python -m benchmarks.bench_ratelimit --requests 200 --concurrency 32 --rpm 1200
+"""
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from summarizer.models import Usage
+from summarizer.ratelimit import Scheduler
+
+OUTPUT_TOKENS = 50
+
+
+class StubProvider(ThreadingHTTPServer):
+    """A completion endpoint with per-second request and token windows."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, rpm: int, tpm: int, latency: float) -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.rpm, self.tpm, self.latency = rpm, tpm, latency
+        self.lock = threading.Lock()
+        self.window = 0
+        self.used_requests = self.used_tokens = 0
+        self.served = self.rejected = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/complete"
+
+    def admit(self, tokens: int) -> Optional[Dict[str, str]]:
+        """None if admitted, otherwise the headers of a 429."""
+        with self.lock:
+            now = time.time()
+            if int(now) != self.window:
+                self.window, self.used_requests, self.used_tokens = int(now), 0, 0
+            req_left = self.rpm // 60 - self.used_requests
+            tok_left = self.tpm // 60 - self.used_tokens
+            if req_left >= 1 and tok_left >= tokens:
+                self.used_requests += 1
+                self.used_tokens += tokens
+                self.served += 1
+                return None
+            self.rejected += 1
+            reset_ms = int((self.window + 1 - now) * 1000) + 1
+            return {
+                "retry-after-ms": str(reset_ms),
+                "x-ratelimit-remaining-requests": str(max(req_left, 0)),
+                "x-ratelimit-remaining-tokens": str(max(tok_left, 0)),
+                "x-ratelimit-reset-requests": f"{reset_ms}ms",
+                "x-ratelimit-reset-tokens": f"{reset_ms}ms",
+            }
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        server: StubProvider = self.server
+        prompt = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["prompt"]
+        tokens = len(prompt) // 4 + OUTPUT_TOKENS
+        limited = server.admit(tokens)
+        if limited is None:
+            time.sleep(server.latency)
+            status, payload = 200, {"text": "ok", "input_tokens": len(prompt) // 4,
+                                    "output_tokens": OUTPUT_TOKENS}
+        else:
+            status, payload = 429, {"error": "rate limited"}
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        for name, value in (limited or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubClient:
+    """An LLMClient for StubProvider; a 429 raises urllib's HTTPError."""
+
+    def __init__(self, url: str, scheduler: Optional[Scheduler]) -> None:
+        self.provider = "stub"
+        self.model = "stub"
+        self.last_usage: Optional[Usage] = None
+        self._url = url
+        self._scheduler = scheduler
+
+    def _post(self, prompt: str) -> str:
+        req = urllib.request.Request(
+            self._url, data=json.dumps({"prompt": prompt}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(req) as resp:
+            reply = json.loads(resp.read())
+        self.last_usage = Usage(reply["input_tokens"], reply["output_tokens"])
+        return reply["text"]
+
+    def complete(self, prompt: str) -> str:
+        if self._scheduler is None:
+            return self._post(prompt)
+        limiter = self._scheduler.limiter(self.provider, self.model)
+        return limiter.call(self._post, prompt, lambda: self.last_usage)
+
+
+def scheduler(config: Optional[str]) -> Scheduler:
+    sched = Scheduler()
+    if config is not None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "rate_limits.toml"
+            path.write_text(config)
+            sched.configure(path)
+    return sched
+
+
+def run(label: str, client: StubClient, server: StubProvider, prompt: str,
+        n: int, concurrency: int) -> None:
+    server.served = server.rejected = 0
+    failures = 0
+
+    def one(_: int) -> bool:
+        try:
+            client.complete(prompt)
+            return True
+        except urllib.error.HTTPError:
+            return False
+
+    time.sleep(1.0)   # start in a fresh window
+    t = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        failures = sum(1 for ok in pool.map(one, range(n)) if not ok)
+    elapsed = time.perf_counter() - t
+    print(f"  {label:>10}: {elapsed:6.2f} s  {(n - failures) / elapsed:6.1f} ok/s  "
+          f"429s: {server.rejected:4d}  failed: {failures}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=120)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rpm", type=int, default=1200)
+    parser.add_argument("--tpm", type=int, default=3_000_000)
+    parser.add_argument("--prompt-chars", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Stub response time in seconds")
+    args = parser.parse_args()
+
+    server = StubProvider(args.rpm, args.tpm, args.latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    prompt = "x" * args.prompt_chars
+    ideal = max(args.requests / (args.rpm / 60),
+                args.requests * (args.prompt_chars // 4 + OUTPUT_TOKENS) / (args.tpm / 60))
+    print(f"{args.requests} requests x {args.concurrency} concurrent; stub allows "
+          f"{args.rpm} rpm, {args.tpm} tpm (ideal ~{ideal:.1f} s)")
+    modes: Dict[str, Callable[[], Optional[Scheduler]]] = {
+        "unmanaged": lambda: None,
+        "reactive": lambda: scheduler(None),
+        "scheduled": lambda: scheduler(f"[stub]\nrpm = {args.rpm}\ntpm = {args.tpm}\n"),
+    }
+    for label, make in modes.items():
+        run(label, StubClient(server.url, make()), server, prompt,
+            args.requests, args.concurrency)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Time BM25 index builds, incremental updates and relevance queries.
+
+The shared corpus generator draws from a few dozen words, which is a worst
+case for an inverted index, so this benchmark writes its own notes with a
+Zipf-distributed vocabulary and a handful of recurring project names, closer
+to real dictation.
+
+Usage:
+  python -m benchmarks.bench_relevance              # 5k and 20k notes
+  python -m benchmarks.bench_relevance --sizes 50000
+"""
+
+import argparse
+import datetime as dt
+import itertools
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from summarizer.catalog import NoteCatalog
+from summarizer.relevance import BM25Index
+
+START = dt.date(2020, 1, 1)
+NOTES_PER_DAY = 8
+
+
+def write_corpus(root: Path, count: int, words: int = 300, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(30_000)]
+    cum = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocab))))
+    projects = [f"project{i}" for i in range(200)]
+    root.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        day, slot = divmod(i, NOTES_PER_DAY)
+        when = dt.datetime.combine(START, dt.time(8)) + dt.timedelta(
+            days=day, minutes=60 * slot
+        )
+        topic = rng.sample(projects, 2)
+        body: List[str] = rng.choices(vocab, cum_weights=cum, k=words)
+        body += topic * 3
+        rng.shuffle(body)
+        name = f"Global ({when.strftime('%Y-%m-%d %H.%M.%S')}).json"
+        (root / name).write_text(json.dumps([{"text": " ".join(body)}]))
+
+
+def run(count: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "notes"
+        write_corpus(root, count)
+        catalog = NoteCatalog(root, db_path=Path(tmp) / "catalog.sqlite3")
+        catalog.refresh()
+        index = BM25Index(catalog)
+        t = time.perf_counter()
+        index.update()
+        build = time.perf_counter() - t
+
+        t = time.perf_counter()
+        index.update()
+        noop = time.perf_counter() - t
+
+        # A new day's recordings arrive.
+        write_corpus(Path(tmp) / "extra", NOTES_PER_DAY, seed=1)
+        for p in (Path(tmp) / "extra").iterdir():
+            p.rename(root / p.name.replace("2020", "2099"))
+        catalog.refresh()
+        t = time.perf_counter()
+        index.update()
+        incremental = time.perf_counter() - t
+
+        day = START + dt.timedelta(days=count // NOTES_PER_DAY - 1)
+        query = " ".join(
+            p.read_text() for p, _ in catalog.query(day, day)
+        )
+        best = float("inf")
+        for _ in range(repeat):
+            t = time.perf_counter()
+            found = index.search(query, since=day - dt.timedelta(days=365), before=day)
+            best = min(best, time.perf_counter() - t)
+        index.close()
+        catalog.close()
+
+    print(
+        f"{count:>7} notes | build {build:6.1f} s | no-op update {noop * 1000:6.2f} ms"
+        f" | +{NOTES_PER_DAY} notes {incremental * 1000:7.1f} ms"
+        f" | search {best * 1000:6.2f} ms ({len(found)} hits)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5_000, 20_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for count in args.sizes:
+        run(count, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Synthetic MacWhisper-style transcript corpus generator.
+
+Writes `Name (YYYY-MM-DD HH.MM.SS).json` files containing a list of segment
+objects (`start`, `end`, `text`), like MacWhisper exports. Output is
+deterministic for a given seed so benchmark runs are comparable.
+
+  python -m benchmarks.corpus /tmp/corpus --count 10000 --words 400
+"""
+
+import argparse
+import datetime as dt
+import json
+import random
+from pathlib import Path
+from typing import List
+
+SUBJECTS = [
+    "the ingestion pipeline", "the feature store migration", "the billing report",
+    "the onboarding flow", "the search ranking experiment", "the release checklist",
+    "the on-call runbook", "the data quality dashboard", "the quarterly planning doc",
+    "the API rate limiter", "the model training job", "the design review",
+]
+VERBS = [
+    "Worked on", "Finished", "Started looking into", "Fixed a bug in",
+    "Reviewed", "Paired with Sam on", "Shipped", "Wrote tests for",
+    "Updated", "Still need to follow up on", "Blocked on", "Refactored",
+]
+TAILS = [
+    "and it looks good.", "but the numbers still look off.", "so that is done.",
+    "and need to circle back tomorrow.", "after the sync with the team.",
+    "which should unblock the next milestone.", "and left comments in the doc.",
+    "with a few open questions.",
+]
+NAMES = ["Global", "Meeting", "Standup", "Voice Memo"]
+
+MARKER = ".corpus-params"
+
+
+def _segments(rng: random.Random, words: int) -> List[dict]:
+    segments: List[dict] = []
+    t = 0.0
+    count = 0
+    while count < words:
+        sentence = f"{rng.choice(VERBS)} {rng.choice(SUBJECTS)} {rng.choice(TAILS)}"
+        count += len(sentence.split())
+        segments.append({"start": round(t, 2), "end": round(t + 4.2, 2), "text": " " + sentence})
+        t += 4.2
+    return segments
+
+
+def generate(
+    root: Path,
+    count: int,
+    words: int = 400,
+    notes_per_day: int = 8,
+    start: dt.date = dt.date(2020, 1, 1),
+    seed: int = 0,
+    variants: int = 64,
+) -> Path:
+    """Write `count` transcripts into root and return it.
+
+    Notes are spread evenly over the working day, `notes_per_day` per day.
+    Payloads cycle through `variants` pre-rendered bodies to keep generation of
+    very large corpora fast. An existing corpus with the same parameters is
+    reused as-is.
+    """
+    params = {
+        "count": count, "words": words, "notes_per_day": notes_per_day,
+        "start": start.isoformat(), "seed": seed, "variants": variants,
+    }
+    marker = root / MARKER
+    if marker.exists() and json.loads(marker.read_text()) == params:
+        return root
+    root.mkdir(parents=True, exist_ok=True)
+
+    rng = random.Random(seed)
+    # Vary note length +/-50% around the requested mean.
+    payloads = [
+        json.dumps(_segments(rng, max(1, int(words * rng.uniform(0.5, 1.5)))))
+        for _ in range(variants)
+    ]
+    step = dt.timedelta(minutes=(10 * 60) // max(notes_per_day, 1))
+    for i in range(count):
+        day, slot = divmod(i, notes_per_day)
+        when = dt.datetime.combine(start, dt.time(8)) + dt.timedelta(days=day) + slot * step
+        name = f"{NAMES[i % len(NAMES)]} ({when.strftime('%Y-%m-%d %H.%M.%S')}).json"
+        (root / name).write_text(payloads[i % variants], encoding="utf-8")
+    marker.write_text(json.dumps(params))
+    return root
+
+
+def last_day(count: int, notes_per_day: int = 8, start: dt.date = dt.date(2020, 1, 1)) -> dt.date:
+    """Date of the last note written by generate() with these parameters."""
+    return start + dt.timedelta(days=(count - 1) // notes_per_day)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic transcript corpus")
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--words", type=int, default=400, help="Mean words per note")
+    parser.add_argument("--notes-per-day", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate(args.root, args.count, args.words, args.notes_per_day, seed=args.seed)
+    print(f"Wrote {args.count} transcripts to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Offline stand-in for an LLMClient with configurable latency."""
+
+import asyncio
+import random
+import re
+import time
+from typing import Iterator, Optional
+
+from summarizer.models import Usage
+
+NOTE_ID = re.compile(r"^# ID: (.+?)  \[", re.MULTILINE)
+
+
+class FakeClient:
+    """Returns a plausible Markdown summary citing the prompt's note IDs.
+
+    `latency` is the mean response time in seconds; `jitter` adds uniform
+    noise of +/- that many seconds. A `stall_rate` fraction of calls take
+    `stall` seconds instead, and a `fail_rate` fraction raise. No network
+    access is needed.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: int = 0,
+        stall_rate: float = 0.0,
+        stall: float = 0.0,
+        fail_rate: float = 0.0,
+        model: str = "fake",
+    ) -> None:
+        self.provider = "fake"
+        self.model = model
+        self.temperature: Optional[float] = None
+        self.system_prompt: Optional[str] = None
+        self.last_usage: Optional[Usage] = None
+        self.calls = 0
+        self._latency = latency
+        self._jitter = jitter
+        self._stall_rate = stall_rate
+        self._stall = stall
+        self._fail_rate = fail_rate
+        self._rng = random.Random(seed)
+
+    def _delay(self) -> float:
+        if self._rng.random() < self._stall_rate:
+            return self._stall
+        return max(0.0, self._latency + self._rng.uniform(-self._jitter, self._jitter))
+
+    def _maybe_fail(self) -> None:
+        if self._rng.random() < self._fail_rate:
+            raise RuntimeError("simulated provider error")
+
+    def _respond(self, prompt: str) -> str:
+        self.calls += 1
+        ids = NOTE_ID.findall(prompt)
+        bullets = "\n".join(f"- Worked on item {i + 1} ({nid})" for i, nid in enumerate(ids[:10]))
+        text = (
+            "## Daily Summary\nProgress across several tasks.\n\n"
+            f"### Tasks Completed\n{bullets}\n\n### Remaining Action Items\n- Follow up\n"
+        )
+        self.last_usage = Usage(input_tokens=len(prompt) // 4, output_tokens=len(text) // 4)
+        return text
+
+    def complete(self, prompt: str) -> str:
+        time.sleep(self._delay())
+        self._maybe_fail()
+        return self._respond(prompt)
+
+    async def acomplete(self, prompt: str) -> str:
+        await asyncio.sleep(self._delay())
+        self._maybe_fail()
+        return self._respond(prompt)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        text = self.complete(prompt)
+        for line in text.splitlines(keepends=True):
+            yield line
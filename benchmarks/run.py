@@ -0,0 +1,141 @@
+"""Reproducible pipeline benchmarks with machine-readable output.
+
+Times each stage of find_notes -> dedup_notes -> trim_notes -> build_prompt ->
+complete on synthetic corpora and writes JSON that can be diffed between
+commits:
+
+  python -m benchmarks.run --sizes 1000 10000 100000 --out bench.json
+  python -m benchmarks.run --sizes 1000000 --corpus-root /data/corpora --repeat 1
+
+Corpora are generated under --corpus-root (reused across runs when the
+parameters match). The end-to-end stage uses FakeClient, so no network is
+needed; --latency sets its simulated response time.
+"""
+
+import argparse
+import datetime as dt
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from summarizer.catalog import NoteCatalog
+from summarizer.dedup import dedup_notes
+from summarizer.file_ops import find_notes, load_notes, scan_notes, trim_notes
+from summarizer.prompts import build_prompt
+
+from .corpus import generate, last_day
+from .fake_client import FakeClient
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def bench_size(
+    corpus_root: Path, count: int, args: argparse.Namespace
+) -> List[Dict[str, object]]:
+    root = generate(corpus_root / f"corpus_{count}_{args.words}w", count, args.words)
+    end = start = last_day(count)
+    context_start = start - dt.timedelta(days=args.context_days)
+    results: List[Dict[str, object]] = []
+
+    def record(stage: str, seconds: float, **extra: object) -> None:
+        results.append({"stage": stage, "files": count, "seconds": seconds, **extra})
+        print(f"{count:>8} {stage:<22} {seconds * 1000:10.2f} ms", file=sys.stderr)
+
+    window = scan_notes(root, context_start, end)
+    record("scan_glob", best_of(lambda: scan_notes(root, context_start, end), args.repeat),
+           matched=len(window))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = NoteCatalog(root, db_path=Path(tmp) / "catalog.sqlite3")
+        t = time.perf_counter()
+        catalog.rebuild()
+        record("catalog_build", time.perf_counter() - t)
+        record("scan_catalog", best_of(
+            lambda: (catalog.refresh(), catalog.query(context_start, end)), args.repeat
+        ))
+
+        paths = [p for p, _ in window]
+        record("load_serial", best_of(lambda: load_notes(paths), args.repeat),
+               bytes=sum(p.stat().st_size for p in paths))
+        record("load_threads", best_of(lambda: load_notes(paths, io_workers=8), args.repeat))
+
+        notes = find_notes(root, start, end, args.context_days, catalog=catalog)
+        chars = sum(len(n.text) for n in notes)
+        budget = chars // 2  # force trimming to do real work
+        record("dedup", best_of(lambda: dedup_notes(notes), args.repeat),
+               notes=len(notes), notes_out=len(dedup_notes(notes)))
+        record("trim", best_of(lambda: trim_notes(notes, budget), args.repeat), notes=len(notes))
+        kept = trim_notes(notes, budget)
+        record("build_prompt", best_of(
+            lambda: build_prompt(kept, start, end, args.context_days), args.repeat
+        ), prompt_chars=len(build_prompt(kept, start, end, args.context_days)))
+
+        client = FakeClient(latency=args.latency)
+
+        def end_to_end() -> None:
+            found = find_notes(root, start, end, args.context_days, catalog=catalog)
+            prompt = build_prompt(trim_notes(found, budget), start, end, args.context_days)
+            client.complete(prompt)
+
+        record("end_to_end", best_of(end_to_end, args.repeat), llm_latency=args.latency)
+        catalog.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the summarizer pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000])
+    parser.add_argument("--words", type=int, default=400, help="Mean words per note")
+    parser.add_argument("--context-days", type=int, default=14)
+    parser.add_argument("--latency", type=float, default=0.0, help="FakeClient latency (s)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--corpus-root", type=Path, default=Path(tempfile.gettempdir()) / "summarizer-bench")
+    parser.add_argument("--out", type=Path, default=None, help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    results: List[Dict[str, object]] = []
+    for count in args.sizes:
+        results.extend(bench_size(args.corpus_root, count, args))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": dt.datetime.now().isoformat(timespec="seconds"),
+            "words": args.words,
+            "context_days": args.context_days,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
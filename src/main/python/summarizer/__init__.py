@@ -1,10 +1,18 @@
 """Summarizer package for processing transcript notes into task-grouped reports.
 
 This package provides functionality to:
-- Parse JSON transcript files with timestamped filenames
-- Summarize notes using various LLM providers (OpenAI, Gemini)
-- Generate task-grouped Markdown reports
-- Support both single-day and multi-day summaries
+- Parse JSON transcript files with timestamped filenames, through a SQLite
+  note catalog
+- Summarize notes using various LLM providers (OpenAI, Gemini, Claude), or
+  the offline `simulated` and `replay` providers
+- Generate task-grouped Markdown reports, streamed as they are written
+- Support single-day and multi-day summaries, map-reduce for windows over
+  the prompt budget, and cached day/week/month rollups
+- Refine summaries interactively, with structured edits and prefetched
+  canned refinements
+- Backfill many periods at once (`summarizer batch`), sync new transcripts
+  in (`summarizer watch`), keep clients warm in a local server
+  (`summarizer serve`) and report on past runs (`summarizer stats`)
 
 Usage examples:
   # single day (defaults to local timezone of the machine)
@@ -18,12 +26,21 @@ Usage examples:
   # interactive mode for refinement
   summarizer 2025-09-05 --interactive --max-iterations 3
 
+  # every day of a month, concurrently
+  summarizer batch 2025-09-01:2025-09-30 --per-day --concurrency 8
+
+  # latency, throughput and cost of past runs
+  summarizer stats --weekly
+
 Provider/API keys:
   - OpenAI (ChatGPT): set environment variable OPENAI_API_KEY (or pass \
     --api-key)
     pip install openai
   - Google Gemini: set environment variable GOOGLE_API_KEY (or pass --api-key)
     pip install google-generativeai
+  - Anthropic Claude: set environment variable ANTHROPIC_API_KEY (or pass \
+    --api-key)
+    pip install anthropic
 
 Notes directory:
   - The script scans for files whose names contain an ISO date of the form
@@ -45,12 +62,33 @@ Implementation notes:
     vendor.
   - Context window: by default, the model sees all notes within the selected
     dates PLUS up to N days of prior context (default 14) to help stitch
-    multi-day tasks.
+    multi-day tasks. Context that does not fit --max-chars or --max-tokens
+    is dropped oldest-first, or compressed with --context-strategy compress;
+    --context-select relevance picks it by similarity instead of recency.
+  - LLM responses are cached on disk, provider calls go through per-model
+    rate limits, and --hedge adds backup providers for slow requests.
+  - Each run is appended to a JSONL ledger read by `summarizer stats`.
 """
 
 __version__ = "0.1.0"
 
-from .cli import main
-from .feedback import interactive_refinement_loop, get_user_feedback, refine_summary
-
 __all__ = ["main", "interactive_refinement_loop", "get_user_feedback", "refine_summary"]
+
+# Public names resolve lazily so that importing the package (or running
+# `summarizer --help`) doesn't import every submodule up front.
+_LAZY = {
+    "main": ".cli",
+    "interactive_refinement_loop": ".feedback",
+    "get_user_feedback": ".feedback",
+    "refine_summary": ".feedback",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        import importlib
+
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
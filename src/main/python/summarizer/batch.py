@@ -0,0 +1,218 @@
+"""Batch mode: summarize every day or week of a range concurrently.
+
+Notes for the whole range (plus context) are scanned once, a prompt is built
+per period with `build_prompt`, and completions run through the async
+provider clients under a concurrency limit. Each summary is written to
+`summaries/summary_<period>.md` as soon as it finishes; a failed period is
+reported without aborting the rest.
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .budget import TokenCounter
+from .cli import (
+    add_common_arguments,
+    build_client,
+    finish_profiling,
+    fit_notes,
+    ledger_record,
+    load_window_notes,
+    parse_date_or_range,
+    report_rate_limits,
+    start_profiling,
+)
+from .file_ops import load_texts, save_summary
+from .ledger import append_record, usage_fields
+from .llm_clients import LLMClient, acomplete, call_usage
+from .models import Note
+from .profiling import span
+from .prompts import build_prompt
+
+
+def split_periods(
+    start: dt.date, end: dt.date, per_week: bool = False
+) -> List[Tuple[dt.date, dt.date]]:
+    """Split [start, end] into single days, or Monday-Sunday weeks clipped to the range."""
+    periods: List[Tuple[dt.date, dt.date]] = []
+    day = start
+    while day <= end:
+        if per_week:
+            last = min(day + dt.timedelta(days=6 - day.weekday()), end)
+        else:
+            last = day
+        periods.append((day, last))
+        day = last + dt.timedelta(days=1)
+    return periods
+
+
+def notes_for_period(
+    notes: Sequence[Note], start: dt.date, end: dt.date, context_days: int
+) -> List[Note]:
+    """Select a period's notes from a larger window, re-flagging IN-RANGE ones."""
+    context_start = start - dt.timedelta(days=context_days)
+    selected: List[Note] = []
+    for n in notes:
+        d = n.when.date()
+        if context_start <= d <= end:
+            in_range = start <= d <= end
+            if n.in_range != in_range:
+                n = n.replace(in_range=in_range)
+            selected.append(n)
+    return selected
+
+
+async def _run_period(
+    client: LLMClient,
+    prompt: str,
+    start: dt.date,
+    end: dt.date,
+    out_dir: Path,
+    limit: asyncio.Semaphore,
+    record: Optional[Dict[str, Any]] = None,
+    ledger: Optional[Path] = None,
+) -> bool:
+    label = start.isoformat() if start == end else f"{start} → {end}"
+    async with limit:
+        t0 = time.perf_counter()
+        try:
+            summary = await acomplete(client, prompt)
+        except Exception as e:
+            print(f"FAILED {label}: {e}", file=sys.stderr)
+            if record is not None:
+                append_record(ledger, record | {
+                    "status": "error", "latency_s": round(time.perf_counter() - t0, 3),
+                    "error": str(e),
+                })
+            return False
+        usage = call_usage()
+    if record is not None:
+        append_record(ledger, record | usage_fields(usage) | {
+            "status": "ok", "latency_s": round(time.perf_counter() - t0, 3),
+        })
+    out_path = save_summary(summary, out_dir, start, end)
+    print(f"Saved {label} ({time.perf_counter() - t0:.1f}s): {out_path}")
+    return True
+
+
+async def run_batch(
+    jobs: Sequence[Tuple[dt.date, dt.date, str]],
+    client: LLMClient,
+    out_dir: Path,
+    concurrency: int,
+    records: Optional[Sequence[Dict[str, Any]]] = None,
+    ledger: Optional[Path] = None,
+) -> int:
+    """Run (start, end, prompt) jobs concurrently; return the number that failed.
+
+    With `records` (one per job, from `ledger_record`), each period's
+    outcome, latency and token usage is appended to `ledger`.
+    """
+    limit = asyncio.Semaphore(max(concurrency, 1))
+    results = await asyncio.gather(*(
+        _run_period(client, prompt, start, end, out_dir, limit,
+                    records[i] if records is not None else None, ledger)
+        for i, (start, end, prompt) in enumerate(jobs)
+    ))
+    return sum(1 for ok in results if not ok)
+
+
+def batch_main(argv: Sequence[str]) -> int:
+    """Entry point for `summarizer batch`."""
+    parser = argparse.ArgumentParser(
+        prog="summarizer batch",
+        description="Summarize every day (or week) of a date range concurrently",
+    )
+    parser.add_argument(
+        "date_range",
+        help="Range (YYYY-MM-DD:YYYY-MM-DD) to split into periods",
+    )
+    period = parser.add_mutually_exclusive_group()
+    period.add_argument(
+        "--per-day",
+        action="store_true",
+        help="Write one summary per day (default)",
+    )
+    period.add_argument(
+        "--per-week",
+        action="store_true",
+        help="Write one summary per Monday-Sunday week",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum concurrent LLM calls (default: 4)",
+    )
+    parser.add_argument(
+        "--out-dir",
+        type=Path,
+        default=Path("summaries"),
+        help="Directory for the summary files (default: ./summaries)",
+    )
+    add_common_arguments(parser)
+    args = parser.parse_args(argv)
+    start_profiling(args)
+    try:
+        with span("run"):
+            return run_batch_command(args)
+    finally:
+        finish_profiling(args)
+
+
+def run_batch_command(args: argparse.Namespace) -> int:
+    """Run a batch as configured by the parsed `summarizer batch` flags."""
+    start, end = parse_date_or_range(args.date_range)
+    all_notes = load_window_notes(args, start, end)
+    counter = TokenCounter(args.provider, args.model)
+
+    periods: List[Tuple[dt.date, dt.date, List[Note]]] = []
+    for p_start, p_end in split_periods(start, end, per_week=args.per_week):
+        notes = notes_for_period(all_notes, p_start, p_end, args.context_days)
+        if not any(n.in_range for n in notes):
+            print(f"Skipping {p_start}: no transcripts in the period.")
+            continue
+        periods.append(
+            (p_start, p_end, fit_notes(notes, args, counter, p_start, p_end))
+        )
+    # Read every kept note once, however many periods it appears in.
+    load_texts(
+        [n for _, _, notes in periods for n in notes],
+        io_workers=args.io_workers,
+        parse_processes=args.parse_processes,
+    )
+    jobs: List[Tuple[dt.date, dt.date, str]] = [
+        (p_start, p_end, build_prompt(
+            notes, start=p_start, end=p_end, context_days=args.context_days
+        ))
+        for p_start, p_end, notes in periods
+    ]
+
+    if not jobs:
+        print("No transcripts found in the specified window.")
+        return 1
+
+    records = None if args.no_ledger else [
+        ledger_record(
+            args, p_start, p_end, "per-week" if args.per_week else "per-day",
+            notes=len(notes), notes_in_range=sum(1 for n in notes if n.in_range),
+            prompt_chars=len(prompt), command="batch",
+        )
+        for (p_start, p_end, notes), (_, _, prompt) in zip(periods, jobs)
+    ]
+    client = build_client(args)
+    print(f"Summarizing {len(jobs)} period(s) with concurrency {args.concurrency}...")
+    failed = asyncio.run(run_batch(
+        jobs, client, args.out_dir, args.concurrency, records, args.ledger
+    ))
+    if failed:
+        print(f"{failed} of {len(jobs)} period(s) failed.", file=sys.stderr)
+    if hasattr(client, "report"):
+        client.report()
+    report_rate_limits()
+    return 1 if failed else 0
@@ -0,0 +1,118 @@
+"""Token-aware prompt budgeting.
+
+Token counts come from an offline tokenizer where one is installed (tiktoken
+for OpenAI models) and from a per-provider characters-per-token estimate
+otherwise. Budgets include the fixed template overhead and the per-note
+header lines emitted by `build_notes_block`.
+"""
+
+import datetime as dt
+import math
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from .models import Note
+from .profiling import span
+from .prompts import build_notes_block, build_prompt, note_header
+
+
+# Average characters per token on English transcripts, calibrated against
+# the providers' own tokenizers. Used when no offline tokenizer is available.
+CHARS_PER_TOKEN = {
+    "openai": 4.0,
+    "gemini": 4.0,
+    "claude": 3.5,
+}
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+PROVIDER_ALIASES = {
+    "chatgpt": "openai",
+    "gpt": "openai",
+    "google": "gemini",
+    "anthropic": "claude",
+}
+
+
+def _tiktoken_encoder(model: str) -> Optional[Callable[[str], List[int]]]:
+    try:
+        import tiktoken  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency
+        return None
+    try:
+        enc = tiktoken.encoding_for_model(model)
+    except KeyError:
+        enc = tiktoken.get_encoding("o200k_base")
+    return lambda text: enc.encode(text, disallowed_special=())
+
+
+class TokenCounter:
+    """Count or estimate tokens for a provider/model pair."""
+
+    def __init__(self, provider: str, model: str) -> None:
+        p = provider.lower()
+        self.provider = PROVIDER_ALIASES.get(p, p)
+        self.model = model
+        self.chars_per_token = CHARS_PER_TOKEN.get(
+            self.provider, DEFAULT_CHARS_PER_TOKEN
+        )
+        self._encode = (
+            _tiktoken_encoder(model) if self.provider == "openai" else None
+        )
+
+    @property
+    def exact(self) -> bool:
+        """True when counts come from a real tokenizer rather than an estimate."""
+        return self._encode is not None
+
+    @property
+    def method(self) -> str:
+        if self._encode is not None:
+            return "tiktoken"
+        return f"estimate ({self.chars_per_token:g} chars/token)"
+
+    def count(self, text: str) -> int:
+        if self._encode is not None:
+            return len(self._encode(text))
+        return math.ceil(len(text) / self.chars_per_token)
+
+
+def prompt_overhead(
+    counter: TokenCounter, start: dt.date, end: dt.date, context_days: int
+) -> int:
+    """Tokens used by the prompt template itself, with no notes."""
+    return counter.count(build_prompt([], start, end, context_days))
+
+
+def note_tokens(counter: TokenCounter, note: Note) -> int:
+    """Tokens for one rendered note block, including its ID header line.
+
+    Estimates use the note's known length, so unread notes stay unread.
+    """
+    if not counter.exact:
+        chars = len(note_header(note)) + note.length + 1
+        return math.ceil(chars / counter.chars_per_token) + 1
+    return counter.count(build_notes_block([note])) + 1  # +1 for the join newline
+
+
+def fit_notes_to_tokens(
+    notes: Sequence[Note],
+    max_tokens: int,
+    counter: TokenCounter,
+    overhead: int = 0,
+) -> Tuple[List[Note], int]:
+    """Keep IN-RANGE notes and as many recent CONTEXT notes as fit max_tokens.
+
+    Each note is tokenized once and the oldest CONTEXT notes are dropped in a
+    single pass over running totals. Returns the kept notes and the estimated
+    prompt size in tokens.
+    """
+    with span("budget", notes_in=len(notes), tokenizer=counter.method) as stats:
+        costs = {id(n): note_tokens(counter, n) for n in notes}
+        total = overhead + sum(costs.values())
+        in_range = [n for n in notes if n.in_range]
+        context = sorted((n for n in notes if not n.in_range), key=lambda n: n.when)
+        drop = 0
+        while drop < len(context) and total > max_tokens:
+            total -= costs[id(context[drop])]
+            drop += 1
+        stats.update(notes_out=len(notes) - drop, prompt_tokens=total)
+    return in_range + context[drop:], total
@@ -0,0 +1,219 @@
+"""Disk-backed response cache for LLM clients.
+
+Entries are keyed on provider, model, temperature, system prompt and a hash of
+the prompt, and stored one `<sha256>.json` file per entry. Reads bump the file
+mtime so eviction can drop least-recently-used entries once the cache exceeds
+its size budget; entries older than `max_age` are treated as misses and
+removed. Eviction only ever touches entry files, so other files in the
+directory are left alone.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from .llm_clients import LLMClient, acomplete, call_usage, record_usage, stream_completion
+from .models import Usage
+from .paths import DEFAULT_RESPONSE_CACHE_DIR
+from .profiling import span
+
+
+DEFAULT_CACHE_DIR = DEFAULT_RESPONSE_CACHE_DIR
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 3600.0
+EVICT_INTERVAL = 3600.0   # seconds between sweeps for expired entries
+
+ENTRY_NAME = re.compile(r"[0-9a-f]{64}\.json")
+
+
+def cache_key(client: LLMClient, prompt: str) -> str:
+    """Stable key for a (client settings, prompt) pair."""
+    parts = {
+        "provider": getattr(client, "provider", type(client).__name__),
+        "model": getattr(client, "model", None),
+        "temperature": getattr(client, "temperature", None),
+        "system_prompt": getattr(client, "system_prompt", None),
+        "prompt_sha256": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+    }
+    blob = json.dumps(parts, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+class ResponseCache:
+    """Directory of cached completions with size- and age-based LRU eviction."""
+
+    def __init__(
+        self,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: float = DEFAULT_MAX_AGE,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Bytes of entries, kept up to date by put() between full scans.
+        self._total: Optional[int] = None
+        self._swept = 0.0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        with span("cache.lookup") as stats:
+            response = self._get(key)
+            stats["hit"] = int(response is not None)
+        return response
+
+    def _get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("created", 0) > self.max_age:
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)  # mark as recently used
+        return entry.get("response")
+
+    def put(self, key: str, response: str) -> None:
+        path = self._path(key)
+        data = json.dumps({"created": time.time(), "response": response}).encode("utf-8")
+        # A temp file of its own, so concurrent writers of one key never share
+        # one; its name never matches ENTRY_NAME.
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, prefix=f".{key}.", suffix=".tmp", delete=False
+        ) as f:
+            f.write(data)
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        try:
+            os.replace(f.name, path)
+        except OSError:
+            os.unlink(f.name)
+            raise
+        with self._lock:
+            if self._total is not None:
+                self._total += len(data) - replaced
+            due = (
+                self._total is None or self._total > self.max_bytes
+                or time.time() - self._swept > EVICT_INTERVAL
+            )
+        if due:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """(mtime, size, path) of every cache entry, least recently used first."""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for e in it:
+                if not ENTRY_NAME.fullmatch(e.name):
+                    continue
+                try:
+                    st = e.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, Path(e.path)))
+        entries.sort()
+        return entries
+
+    def evict(self) -> int:
+        """Remove expired entries, then least-recently-used ones over budget.
+
+        Runs from put() when the tracked size goes over budget, and at most
+        once per EVICT_INTERVAL otherwise.
+        """
+        now = time.time()
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if total <= self.max_bytes and now - mtime <= self.max_age:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        with self._lock:
+            self._total, self._swept = total, now
+        return removed
+
+
+class CachedClient:
+    """Wrap any LLMClient so identical requests are answered from disk."""
+
+    def __init__(self, client: LLMClient, cache: ResponseCache) -> None:
+        self._client = client
+        self._cache = cache
+        self.hits = 0
+        self.misses = 0
+        self.provider = getattr(client, "provider", type(client).__name__)
+        self.model = getattr(client, "model", None)
+        self.temperature = getattr(client, "temperature", None)
+        self.system_prompt = getattr(client, "system_prompt", None)
+        self.last_usage: Optional[Usage] = None
+
+    def complete(self, prompt: str) -> str:
+        key = cache_key(self._client, prompt)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            record_usage(self, None)
+            return cached
+        self.misses += 1
+        response = self._client.complete(prompt)
+        record_usage(self, call_usage())
+        if response:
+            self._cache.put(key, response)
+        return response
+
+    async def acomplete(self, prompt: str) -> str:
+        key = cache_key(self._client, prompt)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            record_usage(self, None)
+            return cached
+        self.misses += 1
+        response = await acomplete(self._client, prompt)
+        record_usage(self, call_usage())
+        if response:
+            self._cache.put(key, response)
+        return response
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        key = cache_key(self._client, prompt)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            record_usage(self, None)
+            yield cached
+            return
+        self.misses += 1
+        chunks: List[str] = []
+        for chunk in stream_completion(self._client, prompt):
+            chunks.append(chunk)
+            yield chunk
+        record_usage(self, call_usage())
+        response = "".join(chunks)
+        if response:
+            self._cache.put(key, response)
+
+    def report(self) -> None:
+        print(
+            f"Response cache: {self.hits} hit(s), {self.misses} miss(es) "
+            f"[{self._cache.cache_dir}]",
+            file=sys.stderr,
+        )
+        if hasattr(self._client, "report"):
+            self._client.report()
@@ -0,0 +1,263 @@
+"""Persistent on-disk catalog of transcript files.
+
+The catalog maps each transcript filename to its parsed timestamp, size,
+mtime and extracted text length, so that date-window lookups become an
+indexed SQLite query instead of a glob + regex over the whole directory.
+
+The catalog refreshes incrementally: the directory is only rescanned when its
+mtime changes (files added, removed or renamed), and only files whose size or
+mtime changed are re-parsed. Editing a file in place does not change the
+directory's mtime, so lookups for a date range first `verify()` the files in
+that range with one stat each. Every change to the entries bumps a
+`generation` counter, so indexes built from the catalog can tell cheaply
+whether they are still current.
+"""
+
+import datetime as dt
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .file_ops import load_note, parse_filename_dt
+from .paths import DEFAULT_CACHE_ROOT
+from .profiling import span
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS notes (
+    name     TEXT PRIMARY KEY,
+    ts       TEXT NOT NULL,      -- ISO 'YYYY-MM-DD HH:MM:SS', sorts lexically
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    text_len INTEGER NOT NULL    -- 0 when the file has no usable text
+);
+CREATE INDEX IF NOT EXISTS notes_ts ON notes (ts);
+"""
+
+
+def default_catalog_path(input_dir: Path) -> Path:
+    """Catalog location for a transcript directory (one DB per directory)."""
+    digest = hashlib.sha1(str(input_dir.resolve()).encode("utf-8")).hexdigest()
+    return DEFAULT_CACHE_ROOT / "catalog" / f"{digest[:16]}.sqlite3"
+
+
+class NoteCatalog:
+    """SQLite-backed index of the JSON transcripts in one directory.
+
+    With `shared=True` one catalog can serve several threads; its methods
+    are serialized with a lock.
+    """
+
+    def __init__(
+        self, input_dir: Path, db_path: Optional[Path] = None, shared: bool = False
+    ) -> None:
+        if not input_dir.is_dir():
+            # Checked before the database is created for a folder that isn't there.
+            raise SystemExit(f"Input directory not found: {input_dir}")
+        self.input_dir = input_dir
+        self.db_path = db_path or default_catalog_path(input_dir)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=not shared)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "NoteCatalog":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def _bump_generation(self) -> None:
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('generation', '1') "
+            "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def rebuild(self) -> int:
+        """Drop all entries and rescan the directory from scratch."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM notes")
+            # The generation survives, so it never repeats a value already seen.
+            self._conn.execute("DELETE FROM meta WHERE key != 'generation'")
+            self._bump_generation()
+        return self.refresh(force=True)
+
+    def refresh(self, force: bool = False) -> int:
+        """Bring the catalog in sync with the directory.
+
+        Returns the number of entries added, updated or removed. When the
+        directory mtime matches the one recorded at the last refresh the scan
+        is skipped entirely.
+        """
+        with self._lock, span("catalog.refresh") as stats:
+            changed = self._refresh(force)
+            stats["entries_changed"] = changed
+        return changed
+
+    def _refresh(self, force: bool) -> int:
+        dir_mtime = str(os.stat(self.input_dir).st_mtime_ns)
+        if not force and self._get_meta("dir_mtime_ns") == dir_mtime:
+            return 0
+
+        known = {
+            name: (size, mtime_ns)
+            for name, size, mtime_ns in self._conn.execute(
+                "SELECT name, size, mtime_ns FROM notes"
+            )
+        }
+        seen: set[str] = set()
+        upserts: List[Tuple[str, str, int, int, int]] = []
+        with os.scandir(self.input_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                when = parse_filename_dt(entry.name)
+                if not when:
+                    continue
+                seen.add(entry.name)
+                st = entry.stat()
+                if known.get(entry.name) == (st.st_size, st.st_mtime_ns):
+                    continue
+                upserts.append(self._row(entry.name, when, st))
+
+        removed = [(name,) for name in known.keys() - seen]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO notes VALUES (?, ?, ?, ?, ?)", upserts
+            )
+            self._conn.executemany("DELETE FROM notes WHERE name = ?", removed)
+            if upserts or removed:
+                self._bump_generation()
+            self._set_meta("dir_mtime_ns", dir_mtime)
+        return len(upserts) + len(removed)
+
+    def verify(self, start: dt.date, end: dt.date) -> int:
+        """Re-read cataloged files dated within [start, end] that changed in place.
+
+        Returns the number of entries updated or removed.
+        """
+        with self._lock, span("catalog.verify") as stats:
+            rows = self._conn.execute(
+                "SELECT name, ts, size, mtime_ns FROM notes WHERE ts >= ? AND ts < ?",
+                (start.isoformat(), (end + dt.timedelta(days=1)).isoformat()),
+            ).fetchall()
+            upserts: List[Tuple[str, str, int, int, int]] = []
+            removed: List[Tuple[str]] = []
+            for name, ts, size, mtime_ns in rows:
+                try:
+                    st = os.stat(self.input_dir / name)
+                except FileNotFoundError:
+                    removed.append((name,))
+                    continue
+                if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                    upserts.append(self._row(name, dt.datetime.fromisoformat(ts), st))
+            if upserts or removed:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO notes VALUES (?, ?, ?, ?, ?)", upserts
+                    )
+                    self._conn.executemany("DELETE FROM notes WHERE name = ?", removed)
+                    self._bump_generation()
+            stats.update(files_checked=len(rows), entries_changed=len(upserts) + len(removed))
+        return len(upserts) + len(removed)
+
+    def upsert(self, path: Path, dir_mtime_before: Optional[int] = None) -> bool:
+        """Add or update a single file without rescanning the directory.
+
+        If the caller knows the directory mtime from just before it wrote
+        `path`, and the catalog was in sync at that point, the recorded mtime
+        is advanced as well so the next refresh() can still skip the scan.
+        Returns False if the filename carries no timestamp.
+        """
+        when = parse_filename_dt(path.name)
+        if not when:
+            return False
+        row = self._row(path.name, when, path.stat())
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO notes VALUES (?, ?, ?, ?, ?)", row
+            )
+            self._bump_generation()
+            if (
+                dir_mtime_before is not None
+                and self._get_meta("dir_mtime_ns") == str(dir_mtime_before)
+            ):
+                self._set_meta(
+                    "dir_mtime_ns", str(os.stat(self.input_dir).st_mtime_ns)
+                )
+        return True
+
+    def _row(
+        self, name: str, when: dt.datetime, st: os.stat_result
+    ) -> Tuple[str, str, int, int, int]:
+        loaded = load_note(self.input_dir / name)
+        text_len = len(loaded[1]) if loaded else 0
+        return (
+            name, when.isoformat(sep=" "), st.st_size, st.st_mtime_ns, text_len
+        )
+
+    def day_fingerprints(self, start: dt.date, end: dt.date) -> Dict[dt.date, str]:
+        """Hash of each day's transcripts (name, size, mtime) within [start, end].
+
+        Days without usable transcripts are left out.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT substr(ts, 1, 10), name, size, mtime_ns FROM notes "
+                "WHERE ts >= ? AND ts < ? AND text_len > 0 ORDER BY ts, name",
+                (start.isoformat(), (end + dt.timedelta(days=1)).isoformat()),
+            ).fetchall()
+        files: Dict[str, List[str]] = {}
+        for day, name, size, mtime_ns in rows:
+            files.setdefault(day, []).append(f"{name}\0{size}\0{mtime_ns}")
+        return {
+            dt.date.fromisoformat(day):
+                hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+            for day, lines in files.items()
+        }
+
+    def query(
+        self, start: dt.date, end: dt.date
+    ) -> List[Tuple[Path, dt.datetime]]:
+        """Return (path, when) for notes dated within [start, end], by filename."""
+        return [(path, when) for path, when, _ in self.query_lengths(start, end)]
+
+    def query_lengths(
+        self, start: dt.date, end: dt.date
+    ) -> List[Tuple[Path, dt.datetime, int]]:
+        """Like query(), with each note's text length as a third element."""
+        lo = start.isoformat()
+        hi = (end + dt.timedelta(days=1)).isoformat()
+        with self._lock, span("catalog.query") as stats:
+            rows = self._conn.execute(
+                "SELECT name, ts, text_len FROM notes "
+                "WHERE ts >= ? AND ts < ? AND text_len > 0 ORDER BY name",
+                (lo, hi),
+            )
+            found = [
+                (self.input_dir / name, dt.datetime.fromisoformat(ts), text_len)
+                for name, ts, text_len in rows
+            ]
+            stats["files_matched"] = len(found)
+        return found
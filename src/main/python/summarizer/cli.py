@@ -2,13 +2,28 @@
 
 import argparse
 import datetime as dt
+import sys
+import time
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import (
+    TYPE_CHECKING, Any, ContextManager, Dict, Iterable, List, Optional, Sequence,
+    Tuple,
+)
 
-from .file_ops import find_notes, trim_notes
-from .llm_clients import make_client
-from .prompts import build_prompt
-from .feedback import interactive_refinement_loop
+from .paths import (
+    DEFAULT_LATENCY_FILE, DEFAULT_LEDGER_FILE, DEFAULT_RATE_LIMITS_FILE,
+    DEFAULT_RESPONSE_CACHE_DIR,
+)
+from .profiling import PROFILER, span
+
+# Everything else is imported where it is used, so `--help` and early exits
+# don't pay for the whole package (and provider SDKs load only on first call).
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .budget import TokenCounter
+    from .catalog import NoteCatalog
+    from .llm_clients import LLMClient
+    from .models import Note
+    from .rollups import RollupStore, Rollups
 
 
 def parse_date_or_range(spec: str) -> tuple[dt.date, dt.date]:
@@ -24,16 +39,39 @@ def parse_date_or_range(spec: str) -> tuple[dt.date, dt.date]:
     return start, end
 
 
-def main(argv: Optional[Sequence[str]] = None) -> int:
-    """Main CLI entry point."""
-    parser = argparse.ArgumentParser(
-        description=("Summarize JSON transcripts into a task-grouped Markdown "
-                     "report with optional interactive refinement")
-    )
-    parser.add_argument(
-        "date_or_range",
-        help="Date (YYYY-MM-DD) or range (YYYY-MM-DD:YYYY-MM-DD)",
-    )
+def render_stream(chunks: Iterable[str]) -> Tuple[str, Optional[float], float]:
+    """Print chunks as they arrive; return (text, time to first token, total)."""
+    t0 = time.perf_counter()
+    ttft: Optional[float] = None
+    parts: list[str] = []
+    for chunk in chunks:
+        if ttft is None:
+            ttft = time.perf_counter() - t0
+        parts.append(chunk)
+        print(chunk, end="", flush=True)
+    print()
+    return "".join(parts), ttft, time.perf_counter() - t0
+
+
+def print_dry_run(
+    notes: Sequence["Note"], prompt: Optional[str], counter: "TokenCounter"
+) -> None:
+    """Print the note counts and estimated prompt size for --dry-run."""
+    in_range = sum(1 for n in notes if n.in_range)
+    print(f"Notes: {len(notes)} ({in_range} in range, "
+          f"{len(notes) - in_range} context)")
+    if prompt is None:
+        chars = sum(n.length for n in notes)
+        print(f"Map-reduce input: {chars:,} chars, "
+              f"~{counter.count(' '.join(n.text for n in notes)):,} tokens")
+    else:
+        print(f"Prompt: {len(prompt):,} chars, "
+              f"~{counter.count(prompt):,} tokens")
+    print(f"Tokenizer: {counter.provider}/{counter.model} via {counter.method}")
+
+
+def add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options shared by the summarize and batch commands."""
     parser.add_argument(
         "--input-dir",
         type=Path,
@@ -43,7 +81,8 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
     parser.add_argument(
         "--provider",
         default="openai",
-        help="LLM provider: openai | gemini",
+        help=("LLM provider: openai | gemini | claude, or offline: simulated | "
+              "replay (--model is then the simulation settings or fixture file)"),
     )
     parser.add_argument(
         "--model",
@@ -55,6 +94,49 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         default=None,
         help="Optional API key (otherwise read from env var)",
     )
+    parser.add_argument(
+        "--record",
+        type=Path,
+        default=None,
+        metavar="FIXTURE",
+        help=("Append every LLM request/response to this JSONL fixture for "
+              "--provider replay (turns off the response cache, so every "
+              "prompt reaches the provider and is recorded)"),
+    )
+    parser.add_argument(
+        "--hedge",
+        action="append",
+        default=None,
+        metavar="PROVIDER:MODEL",
+        help=("Backup provider, asked too when the previous one is slow and "
+              "instead when it fails; repeat to build an ordered list"),
+    )
+    parser.add_argument(
+        "--hedge-percentile",
+        type=float,
+        default=95.0,
+        help=("Hedge once a provider is slower than this percentile of its "
+              "recent latencies (default: 95)"),
+    )
+    parser.add_argument(
+        "--hedge-delay",
+        type=float,
+        default=10.0,
+        help="Hedge delay in seconds until latencies are recorded (default: 10)",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help="Retries per provider with --hedge, with jittered backoff (default: 2)",
+    )
+    parser.add_argument(
+        "--rate-limits",
+        type=Path,
+        default=DEFAULT_RATE_LIMITS_FILE,
+        help=("TOML file of per-provider/model request and token limits "
+              f"(default: {DEFAULT_RATE_LIMITS_FILE}, if it exists)"),
+    )
     parser.add_argument(
         "--context-days",
         type=int,
@@ -67,6 +149,447 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         default=120_000,
         help="Soft limit on prompt size; older CONTEXT notes are dropped first",
     )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=None,
+        help=("Token budget for the whole prompt, estimated for --provider/"
+              "--model; overrides --max-chars when set"),
+    )
+    parser.add_argument(
+        "--context-strategy",
+        choices=["drop-oldest", "compress"],
+        default="drop-oldest",
+        help=("How to fit CONTEXT notes into the budget: drop the oldest whole "
+              "(default) or keep each note's most salient sentences"),
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Collapse near-duplicate transcripts before budgeting",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=0.8,
+        help="Word-shingle Jaccard similarity treated as a duplicate (default: 0.8)",
+    )
+    parser.add_argument(
+        "--io-workers",
+        type=int,
+        default=8,
+        help="Threads used to read transcript files (default: 8; 1 = serial)",
+    )
+    parser.add_argument(
+        "--parse-processes",
+        type=int,
+        default=0,
+        help="Worker processes for JSON parsing (default: 0 = parse in-process)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the LLM instead of reusing cached responses",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_RESPONSE_CACHE_DIR,
+        help=("Directory for cached LLM responses "
+              f"(default: {DEFAULT_RESPONSE_CACHE_DIR})"),
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Glob the input directory instead of using the note catalog",
+    )
+    parser.add_argument(
+        "--rebuild-index",
+        action="store_true",
+        help="Discard and rebuild the note catalog for --input-dir",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a per-stage timing breakdown to stderr when done",
+    )
+    parser.add_argument(
+        "--trace-out",
+        type=Path,
+        default=None,
+        help="Write a Chrome trace (chrome://tracing, Perfetto) of the run here",
+    )
+    parser.add_argument(
+        "--ledger",
+        type=Path,
+        default=DEFAULT_LEDGER_FILE,
+        help=("Append a record of each run to this JSONL ledger, read by "
+              f"'summarizer stats' (default: {DEFAULT_LEDGER_FILE})"),
+    )
+    parser.add_argument(
+        "--no-ledger",
+        action="store_true",
+        help="Don't record this run in the ledger",
+    )
+
+
+def start_profiling(args: argparse.Namespace) -> None:
+    if args.profile or args.trace_out:
+        PROFILER.enable()
+
+
+def finish_profiling(args: argparse.Namespace) -> None:
+    """Report what --profile/--trace-out asked for."""
+    if args.profile:
+        PROFILER.print_table(sys.stderr)
+    if args.trace_out:
+        PROFILER.write_trace(args.trace_out)
+        print(f"Trace written to {args.trace_out}", file=sys.stderr)
+
+
+def open_catalog(
+    args: argparse.Namespace, catalog: Optional["NoteCatalog"] = None
+) -> ContextManager[Optional["NoteCatalog"]]:
+    """Use `catalog` if given, else open the --input-dir catalog for the block.
+
+    Yields None with --no-index. --rebuild-index only applies to catalogs
+    opened here.
+    """
+    from contextlib import nullcontext
+
+    if catalog is not None or args.no_index:
+        return nullcontext(catalog)
+    from .catalog import NoteCatalog
+
+    opened = NoteCatalog(args.input_dir)
+    if args.rebuild_index:
+        opened.rebuild()
+    return opened
+
+
+def load_window_notes(
+    args: argparse.Namespace,
+    start: dt.date,
+    end: dt.date,
+    catalog: Optional["NoteCatalog"] = None,
+) -> List["Note"]:
+    """Load notes for [start - context_days, end] as configured by the CLI flags.
+
+    With --dedup, near-duplicate notes are collapsed before any budgeting.
+    """
+    from .file_ops import find_notes
+
+    with open_catalog(args, catalog) as catalog:
+        notes = find_notes(
+            args.input_dir, start, end, context_days=args.context_days,
+            catalog=catalog,
+            io_workers=args.io_workers,
+            parse_processes=args.parse_processes,
+        )
+    return dedup_if_requested(args, notes)
+
+
+def load_note_texts(args: argparse.Namespace, notes: Sequence["Note"]) -> None:
+    """Read the text of notes that are still unread, using the I/O flags."""
+    from .file_ops import load_texts
+
+    load_texts(
+        notes, io_workers=args.io_workers, parse_processes=args.parse_processes
+    )
+
+
+def dedup_if_requested(
+    args: argparse.Namespace, notes: List["Note"]
+) -> List["Note"]:
+    if not args.dedup:
+        return notes
+    from .budget import TokenCounter
+    from .dedup import dedup_notes
+
+    load_note_texts(args, notes)
+    return dedup_notes(
+        notes, args.dedup_threshold, TokenCounter(args.provider, args.model)
+    )
+
+
+def load_relevant_notes(
+    args: argparse.Namespace,
+    start: dt.date,
+    end: dt.date,
+    catalog: Optional["NoteCatalog"] = None,
+) -> List["Note"]:
+    """Load the window's notes plus the earlier notes most relevant to them.
+
+    Candidates from the --relevance-lookback period are ranked with the BM25
+    index and added best-first while they fit the --max-chars/--max-tokens
+    budget (in tokens, counting note headers and the prompt template). Any
+    budget left over goes to the usual --context-days window, newest first.
+    The result already fits, so it is not trimmed oldest-first afterwards.
+    """
+    if args.no_index:
+        raise SystemExit(
+            "--context-select relevance needs the note catalog; drop --no-index."
+        )
+    from .budget import TokenCounter, note_tokens, prompt_overhead
+    from .file_ops import find_notes, load_notes
+    from .models import Note
+    from .relevance import BM25Index, fill_budget
+
+    with open_catalog(args, catalog) as catalog:
+        window = find_notes(
+            args.input_dir, start, end, context_days=args.context_days,
+            catalog=catalog,
+            io_workers=args.io_workers,
+            parse_processes=args.parse_processes,
+        )
+        in_range = [n for n in window if n.in_range]
+        if not in_range:
+            return []
+        load_note_texts(args, in_range)
+        with BM25Index(catalog, io_workers=args.io_workers) as index:
+            index.update()
+            ranked = index.search(
+                "\n".join(n.text for n in in_range),
+                since=start - dt.timedelta(days=args.relevance_lookback),
+                before=start,
+            )
+
+    loaded = load_notes(
+        [path for path, _, _ in ranked],
+        io_workers=args.io_workers,
+        parse_processes=args.parse_processes,
+    )
+    context = [
+        Note(id=note[0], when=when, text=note[1], in_range=False, path=path)
+        for (path, when, _), note in zip(ranked, loaded)
+        if note
+    ]
+    ranked_ids = {n.id for n in context}
+    context += sorted(
+        (n for n in window if not n.in_range and n.id not in ranked_ids),
+        key=lambda n: n.when,
+        reverse=True,
+    )
+    notes = dedup_if_requested(args, in_range + context)
+
+    in_range = [n for n in notes if n.in_range]
+    context = [n for n in notes if not n.in_range]
+    if args.max_tokens is None:
+        budget = args.max_chars - sum(n.length for n in in_range)
+        return in_range + fill_budget(context, budget)
+    counter = TokenCounter(args.provider, args.model)
+    if counter.exact:
+        load_note_texts(args, notes)
+    # The prompt labels its window by the oldest note, at most the lookback.
+    overhead = prompt_overhead(
+        counter, start, end, max(args.context_days, args.relevance_lookback)
+    )
+    budget = args.max_tokens - overhead - sum(note_tokens(counter, n) for n in in_range)
+    return in_range + fill_budget(context, budget, lambda n: note_tokens(counter, n))
+
+
+def fit_notes(
+    notes: List["Note"],
+    args: argparse.Namespace,
+    counter: "TokenCounter",
+    start: dt.date,
+    end: dt.date,
+) -> List["Note"]:
+    """Apply the --max-tokens or --max-chars budget to notes.
+
+    With --context-strategy compress, CONTEXT notes are first shrunk to fit;
+    whatever still overflows is dropped oldest-first as usual. Only
+    compression and exact token counts need the note text; otherwise the
+    budget is applied to note lengths alone.
+    """
+    from .budget import fit_notes_to_tokens, note_tokens, prompt_overhead
+    from .file_ops import trim_notes
+
+    compress = args.context_strategy == "compress"
+    if compress or (args.max_tokens is not None and counter.exact):
+        load_note_texts(args, notes)
+    if args.max_tokens is not None:
+        overhead = prompt_overhead(counter, start, end, args.context_days)
+        if compress:
+            from .compress import compress_notes
+
+            # Turn the token budget into a char budget at the notes' own ratio.
+            tokens = sum(note_tokens(counter, n) for n in notes)
+            chars = sum(n.length for n in notes)
+            if tokens:
+                budget = (args.max_tokens - overhead) / tokens
+                notes = compress_notes(notes, int(chars * budget))
+        notes, _ = fit_notes_to_tokens(
+            notes, args.max_tokens, counter, overhead=overhead
+        )
+        return notes
+    if compress:
+        from .compress import compress_notes
+
+        notes = compress_notes(notes, args.max_chars)
+    # Fit notes to a simple char budget to avoid over-long prompts.
+    return trim_notes(notes, args.max_chars)
+
+
+def char_budget(
+    args: argparse.Namespace, start: dt.date, end: dt.date, context_days: int
+) -> int:
+    """Note text per prompt: --max-chars, or what fits --max-tokens after the template."""
+    if args.max_tokens is None:
+        return args.max_chars
+    from .budget import TokenCounter, prompt_overhead
+
+    counter = TokenCounter(args.provider, args.model)
+    overhead = prompt_overhead(counter, start, end, context_days)
+    return max(int((args.max_tokens - overhead) * counter.chars_per_token), 1)
+
+
+def build_client(args: argparse.Namespace) -> "LLMClient":
+    """Create the provider client, with any --hedge backups and the response cache.
+
+    --record turns the cache off: a cache hit never reaches the recorder,
+    and a fixture must hold every prompt a replay will send.
+    """
+    from .cache import CachedClient, ResponseCache
+    from .llm_clients import SCHEDULER, make_client
+
+    if args.rate_limits != DEFAULT_RATE_LIMITS_FILE and not args.rate_limits.exists():
+        raise SystemExit(f"Rate limit config not found: {args.rate_limits}")
+    SCHEDULER.configure(args.rate_limits)
+    with span("client.create", provider=args.provider):
+        client = make_client(args.provider, args.model, args.api_key)
+    if args.record:
+        from .offline import RecordingClient
+
+        client = RecordingClient(client, args.record)
+    if args.hedge:
+        from .hedging import HedgedClient, LatencyHistory, parse_target
+
+        backups = []
+        for spec in args.hedge:
+            provider, model = parse_target(spec)
+            with span("client.create", provider=provider):
+                backups.append(make_client(provider, model, None))
+        client = HedgedClient(
+            [client] + backups,
+            LatencyHistory(DEFAULT_LATENCY_FILE),
+            hedge_percentile=args.hedge_percentile,
+            initial_delay=args.hedge_delay,
+            retries=args.retries,
+        )
+    if not args.no_cache and not args.record:
+        client = CachedClient(client, ResponseCache(args.cache_dir))
+    return client
+
+
+def ledger_record(
+    args: argparse.Namespace,
+    start: dt.date,
+    end: dt.date,
+    mode: str,
+    notes: int,
+    notes_in_range: int,
+    prompt_chars: int,
+    command: str = "summarize",
+) -> Dict[str, Any]:
+    """The ledger fields that describe a run before its summary is generated."""
+    return {
+        "command": command,
+        "mode": mode,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "provider": args.provider,
+        "model": args.model,
+        "notes": notes,
+        "notes_in_range": notes_in_range,
+        "prompt_chars": prompt_chars,
+    }
+
+
+def record_run(
+    args: argparse.Namespace,
+    client: "LLMClient",
+    record: Dict[str, Any],
+    before: Tuple[Any, ...],
+    **fields: Any,
+) -> None:
+    """Append a run to the ledger, with the provider calls made since `before`."""
+    if args.no_ledger:
+        return
+    from .ledger import append_record
+    from .llm_clients import TALLY
+
+    record = record | TALLY.since(before) | fields
+    if hasattr(client, "hits"):
+        record["cache_hits"] = client.hits
+    append_record(args.ledger, record)
+
+
+def report_rate_limits() -> None:
+    """Print rate-limit waits and 429s, if the run had any."""
+    if "summarizer.llm_clients" in sys.modules:
+        from .llm_clients import SCHEDULER
+
+        SCHEDULER.report()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """The argument parser for the summarize command."""
+    parser = argparse.ArgumentParser(
+        description=("Summarize JSON transcripts into a task-grouped Markdown "
+                     "report with optional interactive refinement. Run "
+                     "'summarizer batch --help' to summarize many periods at once, "
+                     "'summarizer watch --help' to sync new transcripts in, "
+                     "'summarizer serve --help' to keep clients warm in a server, or "
+                     "'summarizer stats --help' to report on past runs.")
+    )
+    parser.add_argument(
+        "date_or_range",
+        help="Date (YYYY-MM-DD) or range (YYYY-MM-DD:YYYY-MM-DD)",
+    )
+    add_common_arguments(parser)
+    parser.add_argument(
+        "--context-select",
+        choices=["window", "relevance"],
+        default="window",
+        help=("Pick CONTEXT notes by date (the --context-days window, default) "
+              "or by BM25 relevance to the target window's notes"),
+    )
+    parser.add_argument(
+        "--relevance-lookback",
+        type=int,
+        default=365,
+        help="Days searched for relevant CONTEXT notes (default: 365)",
+    )
+    parser.add_argument(
+        "--rollups",
+        action="store_true",
+        help=("Answer from persistent day/week/month rollups: only days whose "
+              "transcripts changed are re-summarized, then the cached rollups "
+              "covering the range are merged"),
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report the estimated prompt size and exit without calling the LLM",
+    )
+    parser.add_argument(
+        "--map-reduce",
+        action="store_true",
+        help=("Instead of dropping CONTEXT notes over --max-chars, summarize "
+              "budget-sized chunks concurrently and merge the results"),
+    )
+    parser.add_argument(
+        "--fan-out",
+        type=int,
+        default=4,
+        help="Concurrent chunk summaries in --map-reduce mode (default: 4)",
+    )
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Wait for the full response instead of printing it as it arrives",
+    )
     parser.add_argument(
         "--interactive",
         action="store_true",
@@ -78,37 +601,221 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         default=5,
         help="Maximum number of refinement iterations (default: 5)",
     )
+    parser.add_argument(
+        "--refine-mode",
+        choices=["auto", "edit", "rewrite"],
+        default="auto",
+        help=("How --interactive refinements are made: 'edit' asks for "
+              "structured edits applied locally, 'rewrite' regenerates the "
+              "whole summary, 'auto' (default) rewrites only for more/less detail"),
+    )
+    parser.add_argument(
+        "--max-speculative",
+        type=int,
+        default=2,
+        help=("With --interactive, canned refinements (more/less detail) to "
+              "prefetch at once while you read (default: 2)"),
+    )
+    parser.add_argument(
+        "--no-speculate",
+        action="store_true",
+        help="Don't prefetch refinements in --interactive mode (saves LLM calls)",
+    )
+    parser.add_argument(
+        "--server",
+        default=None,
+        metavar="ADDRESS",
+        help=("Ask a running 'summarizer serve' to generate the summary: "
+              "'unix' for its default socket, unix:/path/to/socket, or "
+              "http://HOST:PORT for one started with --tcp"),
+    )
+    return parser
 
-    args = parser.parse_args(argv)
 
-    start, end = parse_date_or_range(args.date_or_range)
-    notes = find_notes(
-        args.input_dir, start, end, context_days=args.context_days
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Main CLI entry point."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "batch":
+        from .batch import batch_main
+        return batch_main(argv[1:])
+    if argv and argv[0] == "watch":
+        from .watcher import watch_main
+        return watch_main(argv[1:])
+    if argv and argv[0] == "serve":
+        from .server import serve_main
+        return serve_main(argv[1:])
+    if argv and argv[0] == "stats":
+        from .ledger import stats_main
+        return stats_main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+    if args.server and not args.dry_run:
+        from .remote import summarize_remote
+        return summarize_remote(args)
+    start_profiling(args)
+    try:
+        with span("run"):
+            return summarize(args)
+    finally:
+        finish_profiling(args)
+
+
+def prepare_summary(
+    args: argparse.Namespace,
+    start: dt.date,
+    end: dt.date,
+    catalog: Optional["NoteCatalog"] = None,
+) -> Tuple[List["Note"], Optional[str]]:
+    """Select, fit and read the notes for [start, end] and build the prompt.
+
+    Returns (notes, prompt); the prompt is None with --map-reduce, and notes
+    is empty when the window has no transcripts.
+    """
+    if args.context_select == "relevance":
+        notes = load_relevant_notes(args, start, end, catalog)
+        # Label the prompt's context window by the oldest note selected.
+        oldest = min((n.when.date() for n in notes), default=start)
+        args.context_days = max(args.context_days, (start - oldest).days)
+    else:
+        notes = load_window_notes(args, start, end, catalog)
+    if not notes:
+        return [], None
+
+    from .prompts import build_prompt
+
+    if args.map_reduce:
+        load_note_texts(args, notes)
+        return notes, None
+    if args.context_select != "relevance":   # relevance selection fits already
+        from .budget import TokenCounter
+
+        counter = TokenCounter(args.provider, args.model)
+        notes = fit_notes(notes, args, counter, start, end)
+    load_note_texts(args, notes)
+    return notes, build_prompt(
+        notes, start=start, end=end, context_days=args.context_days
+    )
+
+
+def complete_summary(
+    args: argparse.Namespace,
+    client: "LLMClient",
+    notes: Sequence["Note"],
+    prompt: Optional[str],
+    start: dt.date,
+    end: dt.date,
+) -> str:
+    """Generate the summary for a prepared prompt (or map-reduce over notes)."""
+    if prompt is not None:
+        return client.complete(prompt)
+    from .mapreduce import summarize_map_reduce
+
+    return summarize_map_reduce(
+        notes, client, start=start, end=end,
+        context_days=args.context_days,
+        max_chars=char_budget(args, start, end, args.context_days),
+        fan_out=args.fan_out,
     )
 
+
+def summarize(args: argparse.Namespace) -> int:
+    """Summarize one date or range as configured by the parsed CLI flags."""
+    start, end = parse_date_or_range(args.date_or_range)
+    if args.rollups:
+        return summarize_rollups(args, start, end)
+    notes, prompt = prepare_summary(args, start, end)
     if not notes:
         print("No transcripts found in the specified window.")
         return 1
 
-    # Fit notes to a simple char budget to avoid over-long prompts.
-    notes = trim_notes(notes, args.max_chars)
+    from .budget import TokenCounter
+    from .llm_clients import stream_completion
 
-    prompt = build_prompt(
-        notes, start=start, end=end, context_days=args.context_days
+    if args.dry_run:
+        print_dry_run(notes, prompt, TokenCounter(args.provider, args.model))
+        return 0
+
+    client = build_client(args)
+    from .llm_clients import TALLY
+
+    record = ledger_record(
+        args, start, end, "single" if prompt is not None else "map-reduce",
+        notes=len(notes), notes_in_range=sum(1 for n in notes if n.in_range),
+        prompt_chars=len(prompt) if prompt is not None else sum(n.length for n in notes),
+    )
+    before = TALLY.snapshot()
+    streamed = False
+    t0 = time.perf_counter()
+    ttft: Optional[float] = None
+    try:
+        with span("summary.generate"):
+            if prompt is None or args.interactive or args.no_stream:
+                initial_summary = complete_summary(
+                    args, client, notes, prompt, start, end
+                )
+            else:
+                initial_summary, ttft, _ = render_stream(
+                    stream_completion(client, prompt)
+                )
+                streamed = True
+    except Exception as e:
+        record_run(args, client, record, before, status="error",
+                   latency_s=round(time.perf_counter() - t0, 3), error=str(e))
+        raise
+    total = time.perf_counter() - t0
+    record.update(status="ok", latency_s=round(total, 3),
+                  ttft_s=round(ttft, 3) if ttft is not None else None)
+    print(
+        f"Latency: {total:.2f}s total"
+        + (f", {ttft:.2f}s to first token" if ttft is not None else ""),
+        file=sys.stderr,
     )
+    usage = getattr(client, "last_usage", None)
+    if usage is not None:
+        print(f"Tokens: {usage.describe()}", file=sys.stderr)
+
+    return deliver_summary(
+        args, client, initial_summary, streamed, start, end, record, before
+    )
+
+
+def deliver_summary(
+    args: argparse.Namespace,
+    client: "LLMClient",
+    initial_summary: str,
+    streamed: bool,
+    start: dt.date,
+    end: dt.date,
+    record: Optional[Dict[str, Any]] = None,
+    before: Optional[Tuple[Any, ...]] = None,
+) -> int:
+    """Refine (with --interactive), print and offer to save a finished summary.
 
-    client = make_client(args.provider, args.model, args.api_key)
-    initial_summary = client.complete(prompt)
+    With a ledger `record` (and the TALLY snapshot taken before generation),
+    the run is appended to the ledger once refinement is over and any
+    discarded prefetches have finished, so their tokens are counted.
+    Without a ledger they are abandoned to their daemon threads.
+    """
+    from concurrent.futures import Future, wait
 
+    from .feedback import interactive_refinement_loop
+    from .file_ops import save_summary
+
+    refinement: Dict[str, int] = {"refinements": 0}
+    unfinished: List[Future] = []
     # Use interactive refinement if requested
     if args.interactive:
         print("Initial summary generated. Starting interactive refinement...")
         summary_md = interactive_refinement_loop(
-            initial_summary, client, max_iterations=args.max_iterations
+            initial_summary, client, max_iterations=args.max_iterations,
+            max_speculative=0 if args.no_speculate else args.max_speculative,
+            refine_mode=args.refine_mode, stats=refinement, unfinished=unfinished,
         )
     else:
         summary_md = initial_summary
-        print(summary_md)
+        if not streamed:
+            print(summary_md)
 
     # Offer to save
     try:
@@ -118,15 +825,71 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
     except EOFError:
         choice = "n"
     if choice == "y":
-        out_dir = Path("summaries")
-        out_dir.mkdir(parents=True, exist_ok=True)
-        suffix = (
-            start.isoformat()
-            if start == end
-            else f"{start.isoformat()}_to_{end.isoformat()}"
-        )
-        out_path = out_dir / f"summary_{suffix}.md"
-        out_path.write_text(summary_md, encoding="utf-8")
+        out_path = save_summary(summary_md, Path("summaries"), start, end)
         print(f"Saved: {out_path.resolve()}")
+    if record is not None and before is not None and not args.no_ledger:
+        wait(unfinished)
+        record_run(args, client, record, before, **refinement)
+
+    if hasattr(client, "report"):
+        client.report()
+    report_rate_limits()
 
     return 0
+
+
+def make_rollups(
+    args: argparse.Namespace,
+    catalog: "NoteCatalog",
+    store: "RollupStore",
+    start: dt.date,
+    end: dt.date,
+) -> "Rollups":
+    from .rollups import Rollups, settings_key
+
+    return Rollups(
+        catalog, store, settings_key(args.provider, args.model),
+        max_chars=char_budget(args, start, end, 0), fan_out=args.fan_out,
+        io_workers=args.io_workers,
+    )
+
+
+def summarize_rollups(args: argparse.Namespace, start: dt.date, end: dt.date) -> int:
+    """Summarize a range from the rollup store, generating stale rollups first."""
+    if args.no_index:
+        raise SystemExit("--rollups needs the note catalog; drop --no-index.")
+    from .rollups import RollupStore
+
+    with open_catalog(args) as catalog, RollupStore(catalog) as store:
+        rollups = make_rollups(args, catalog, store, start, end)
+        if args.dry_run:
+            units, stale = rollups.plan(start, end)
+            print(f"Rollups covering the range: {len(units)} "
+                  f"({', '.join(u[0] for u in units) or 'none'})")
+            print(f"Rollups to generate: {len(stale)}")
+            return 0 if units else 1
+
+        client = build_client(args)
+        from .llm_clients import TALLY
+
+        found = catalog.query_lengths(start, end)
+        record = ledger_record(
+            args, start, end, "rollups", notes=len(found), notes_in_range=len(found),
+            prompt_chars=sum(length for _, _, length in found),
+        )
+        before = TALLY.snapshot()
+        t0 = time.perf_counter()
+        try:
+            with span("summary.generate"):
+                summary = rollups.summarize(client, start, end)
+        except Exception as e:
+            record_run(args, client, record, before, status="error",
+                       latency_s=round(time.perf_counter() - t0, 3), error=str(e))
+            raise
+        if summary is None:
+            print("No transcripts found in the specified window.")
+            return 1
+        total = time.perf_counter() - t0
+        print(f"Latency: {total:.2f}s total", file=sys.stderr)
+        record.update(status="ok", latency_s=round(total, 3), ttft_s=None)
+    return deliver_summary(args, client, summary, False, start, end, record, before)
@@ -0,0 +1,125 @@
+"""Extractive compression of CONTEXT notes.
+
+Instead of dropping the oldest CONTEXT notes whole, every CONTEXT note is
+shrunk to its most salient sentences, in proportion to the budget that is
+left once the IN-RANGE notes (always kept verbatim) are accounted for.
+
+Sentences are scored with TF-IDF computed over the notes in the window: a
+sentence scores highly when it contains words that are rare across notes.
+Words that also appear in the IN-RANGE notes get extra weight, so context
+that mentions the same projects as the target window survives compression.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+from .models import Note
+from .profiling import span
+
+
+IN_RANGE_BOOST = 1.0    # extra weight for words that also occur in IN-RANGE notes
+GAP = " … "              # marks sentences left out between two kept ones
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z0-9']{3,}")
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE.split(text.strip()) if s]
+
+
+def _idf(docs: Sequence[List[List[str]]]) -> Dict[str, float]:
+    df: Counter = Counter()
+    for sentences in docs:
+        df.update({w for words in sentences for w in words})
+    n = len(docs)
+    return {w: math.log((1 + n) / (1 + c)) + 1.0 for w, c in df.items()}
+
+
+def _select(
+    sentences: List[str], scores: List[float], target: int
+) -> str:
+    """Highest-scoring sentences within `target` chars, in original order."""
+    order = sorted(range(len(sentences)), key=lambda i: -scores[i])
+    kept: List[int] = []
+    size = 0
+    for i in order:
+        cost = len(sentences[i]) + len(GAP)
+        if size + cost > target:
+            continue
+        kept.append(i)
+        size += cost
+    kept.sort()
+    parts: List[str] = []
+    for prev, i in zip([None] + kept, kept):
+        if prev is not None:
+            parts.append(" " if i == prev + 1 else GAP)
+        parts.append(sentences[i])
+    return "".join(parts)
+
+
+def compress_note_texts(
+    notes: Sequence[Note], ratio: float
+) -> List[Tuple[Note, str]]:
+    """Return (note, compressed text) for each CONTEXT note, shrunk to ~ratio of its size."""
+    tokenized: List[List[List[str]]] = []
+    split: List[List[str]] = []
+    for n in notes:
+        sentences = split_sentences(n.text)
+        split.append(sentences)
+        tokenized.append([_WORD.findall(s.lower()) for s in sentences])
+    idf = _idf(tokenized)
+    target_words = {
+        w for n, sents in zip(notes, tokenized) if n.in_range
+        for words in sents for w in words
+    }
+    weight = {
+        w: v * (1 + IN_RANGE_BOOST) if w in target_words else v
+        for w, v in idf.items()
+    }
+
+    out: List[Tuple[Note, str]] = []
+    for n, sentences, sents_words in zip(notes, split, tokenized):
+        if n.in_range:
+            continue
+        scores = [
+            sum(weight[w] for w in set(words)) / math.sqrt(len(words) or 1)
+            for words in sents_words
+        ]
+        out.append((n, _select(sentences, scores, int(n.length * ratio))))
+    return out
+
+
+def compress_notes(notes: List[Note], max_chars: int) -> List[Note]:
+    """Shrink CONTEXT notes so the total note text fits max_chars.
+
+    IN-RANGE notes are kept verbatim. Each CONTEXT note keeps its most salient
+    sentences, in proportion to the budget left for context; notes with no
+    sentence short enough to fit are dropped.
+    """
+    with span("compress", notes_in=len(notes)) as stats:
+        total = sum(n.length for n in notes)
+        if total <= max_chars:
+            stats.update(notes_out=len(notes), chars=total)
+            return notes
+        in_range = [n for n in notes if n.in_range]
+        context_chars = total - sum(n.length for n in in_range)
+        if context_chars == 0:
+            # Nothing to compress; the caller trims IN-RANGE notes itself.
+            stats.update(notes_out=len(notes), chars=total)
+            return notes
+        ratio = max(max_chars - (total - context_chars), 0) / context_chars
+        compressed = [
+            n.replace(text=text)
+            for n, text in compress_note_texts(notes, ratio)
+            if text
+        ]
+        kept = in_range + compressed
+        stats.update(
+            notes_out=len(kept),
+            chars=sum(n.length for n in kept),
+            ratio=round(ratio, 3),
+        )
+        return kept
@@ -0,0 +1,175 @@
+"""Near-duplicate note detection with shingling and MinHash/LSH.
+
+MacWhisper often saves the same dictation twice, or a re-dictation that is
+almost identical. Each note is reduced to a set of hashed word shingles and a
+one-permutation MinHash signature. Signatures are bucketed by LSH bands, so
+only notes that share a band are compared, which keeps the work close to
+linear in the number of notes. Candidates are confirmed with the exact
+Jaccard similarity of their shingle sets, and confirmed pairs are grouped
+with union-find.
+
+Each group is collapsed into its longest note, whose ID lists every member
+("a.json, b.json") so citations of any of them still resolve.
+"""
+
+import hashlib
+import re
+import sys
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from .models import Note
+from .profiling import span
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .budget import TokenCounter
+
+
+SHINGLE_WORDS = 5
+NUM_BINS = 64
+BANDS = 16          # 16 bands x 4 rows: pairs above ~0.5 similarity collide
+ROWS = NUM_BINS // BANDS
+DEFAULT_THRESHOLD = 0.8
+
+_WORD = re.compile(r"\w+")
+_EMPTY = 1 << 64          # sentinel above any bin value
+
+
+def _hash(words: Sequence[str]) -> int:
+    """A 64-bit hash of a shingle that is the same in every process.
+
+    Python's built-in str hash is randomized per process, which would let
+    dedup groups, and so the prompt and its cache key, differ between runs.
+    """
+    digest = hashlib.blake2b(" ".join(words).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def shingles(text: str, k: int = SHINGLE_WORDS) -> FrozenSet[int]:
+    """Hashed k-word shingles of the lowercased text."""
+    words = _WORD.findall(text.lower())
+    if len(words) < k:
+        return frozenset([_hash(words)]) if words else frozenset()
+    return frozenset(map(_hash, zip(*(words[i:] for i in range(k)))))
+
+
+def signature(shingle_set: FrozenSet[int]) -> Tuple[int, ...]:
+    """One-permutation MinHash: the minimum hash in each of NUM_BINS bins.
+
+    Empty bins borrow the value of the next non-empty bin (rotation
+    densification), so similar sets still agree bin by bin.
+    """
+    bins = [_EMPTY] * NUM_BINS
+    for h in shingle_set:
+        b = h % NUM_BINS
+        v = h // NUM_BINS
+        if v < bins[b]:
+            bins[b] = v
+    if _EMPTY in bins and shingle_set:
+        filled = [i for i, v in enumerate(bins) if v != _EMPTY]
+        for i in range(NUM_BINS):
+            if bins[i] == _EMPTY:
+                # Nearest filled bin to the right, with the distance mixed in.
+                j = next((f for f in filled if f > i), filled[0])
+                bins[i] = bins[j] + ((j - i) % NUM_BINS) * _EMPTY
+    return tuple(bins)
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def duplicate_groups(
+    notes: Sequence[Note], threshold: float = DEFAULT_THRESHOLD
+) -> List[List[int]]:
+    """Return groups (as indexes into notes) of two or more near-duplicates."""
+    sets = [shingles(n.text) for n in notes]
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+    for i, s in enumerate(sets):
+        if not s:
+            continue
+        sig = signature(s)
+        for band in range(BANDS):
+            buckets[band, sig[band * ROWS:(band + 1) * ROWS]].append(i)
+
+    parent = list(range(len(notes)))
+    for members in buckets.values():
+        # Compare each member with one representative per group seen so far
+        # in this bucket, so a bucket of exact copies costs linear time.
+        reps: List[int] = []
+        for i in members:
+            root = _find(parent, i)
+            if any(_find(parent, r) == root for r in reps):
+                continue
+            for r in reps:
+                if jaccard(sets[r], sets[i]) >= threshold:
+                    parent[root] = _find(parent, r)
+                    break
+            else:
+                reps.append(i)
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for i in range(len(notes)):
+        groups[_find(parent, i)].append(i)
+    return [g for g in groups.values() if len(g) > 1]
+
+
+def merge_group(group: Sequence[Note]) -> Note:
+    """Collapse near-duplicates into the longest one, citing every member's ID."""
+    keep = max(group, key=lambda n: n.length)
+    members = sorted(group, key=lambda n: n.when)
+    return Note(
+        id=", ".join(n.id for n in members),
+        when=keep.when,
+        text=keep.text,
+        in_range=any(n.in_range for n in group),
+    )
+
+
+def dedup_notes(
+    notes: Sequence[Note],
+    threshold: float = DEFAULT_THRESHOLD,
+    counter: Optional["TokenCounter"] = None,
+) -> List[Note]:
+    """Collapse near-duplicate notes and report the characters (and tokens) saved."""
+    with span("dedup", notes_in=len(notes)) as stats:
+        groups = duplicate_groups(notes, threshold)
+        if not groups:
+            stats["notes_out"] = len(notes)
+            return list(notes)
+        merged: Dict[int, Note] = {}
+        dropped = set()
+        saved_chars = saved_tokens = 0
+        for g in groups:
+            note = merge_group([notes[i] for i in g])
+            merged[g[0]] = note
+            dropped.update(g[1:])
+            for i in g:
+                saved_chars += len(notes[i].text)
+                if counter is not None:
+                    saved_tokens += counter.count(notes[i].text)
+            saved_chars -= len(note.text)
+            if counter is not None:
+                saved_tokens -= counter.count(note.text)
+        out = [
+            merged.get(i, n) for i, n in enumerate(notes) if i not in dropped
+        ]
+        stats.update(notes_out=len(out), chars_saved=saved_chars)
+
+    message = (
+        f"Dedup: merged {sum(len(g) for g in groups)} notes into {len(groups)}, "
+        f"saving {saved_chars:,} chars"
+    )
+    if counter is not None:
+        message += f" (~{saved_tokens:,} tokens)"
+    print(message + ".", file=sys.stderr)
+    return out
@@ -0,0 +1,221 @@
+"""Structured edits to a Markdown summary, for edit-based refinement.
+
+Rewriting the whole summary for a one-bullet correction costs as many output
+tokens as the summary is long. Instead the model can be shown the summary
+with numbered bullets and asked for a short JSON list of edits:
+
+  {"op": "replace", "bullet": 3, "text": "..."}
+  {"op": "remove", "bullet": 5}
+  {"op": "add", "section": "Remaining Action Items", "text": "...", "after": 4}
+  {"op": "blurb", "text": "..."}
+
+The edits are applied to a parsed `Summary` and rendered back to Markdown.
+`EditError` is raised when they cannot be applied safely. That covers
+unknown bullets or sections, conflicting edits, note IDs that appear
+nowhere in the original summary, and bullets that would lose their
+citations.
+"""
+
+import dataclasses
+import json
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .mapreduce import cited_ids
+
+
+# A cited note ID: a filename ending in .json, which may contain one
+# parenthesized part such as "Global (2025-09-05 13.42.00).json".
+NOTE_ID = re.compile(r"[\w.\-]+(?: [\w.\-]+)*(?: ?\([^()\n]*\))?\.json")
+FENCE = re.compile(r"^```\w*\n|\n?```\s*$")
+
+
+class EditError(ValueError):
+    """The model's edits could not be applied to the summary."""
+
+
+@dataclasses.dataclass
+class Section:
+    heading: str            # e.g. "Tasks Completed", without the ###
+    items: List[str]        # bullet texts, without the leading "- "
+
+
+@dataclasses.dataclass
+class Summary:
+    preamble: List[str]     # title line and blurb, as lines
+    sections: List[Section]
+
+    def bullets(self) -> List[Tuple[Section, int]]:
+        """Every bullet as (section, index), in the order they are numbered."""
+        return [(s, i) for s in self.sections for i in range(len(s.items))]
+
+
+def parse_summary(markdown: str) -> Summary:
+    """Split a summary into its preamble and '###' sections of bullets.
+
+    Lines under a heading that do not start a bullet continue the previous
+    one (or become a bullet of their own if there is none).
+    """
+    preamble: List[str] = []
+    sections: List[Section] = []
+    for line in markdown.strip().splitlines():
+        if line.startswith("### "):
+            sections.append(Section(line[4:].strip(), []))
+        elif not sections:
+            preamble.append(line)
+        elif line.lstrip().startswith(("- ", "* ")):
+            sections[-1].items.append(line.lstrip()[2:].strip())
+        elif line.strip():
+            items = sections[-1].items
+            if items:
+                items[-1] += " " + line.strip()
+            else:
+                items.append(line.strip())
+    while preamble and not preamble[-1].strip():
+        preamble.pop()
+    return Summary(preamble, sections)
+
+
+def render_summary(summary: Summary) -> str:
+    parts = ["\n".join(summary.preamble)] if summary.preamble else []
+    for s in summary.sections:
+        parts.append("\n".join([f"### {s.heading}"] + [f"- {t}" for t in s.items]))
+    return "\n\n".join(parts) + "\n"
+
+
+def numbered(summary: Summary) -> str:
+    """The summary with each bullet prefixed by the number edits refer to."""
+    parts = ["\n".join(summary.preamble)] if summary.preamble else []
+    n = 0
+    for s in summary.sections:
+        lines = [f"### {s.heading}"]
+        for t in s.items:
+            n += 1
+            lines.append(f"[{n}] - {t}")
+        parts.append("\n".join(lines))
+    return "\n\n".join(parts)
+
+
+def note_ids(text: str) -> Set[str]:
+    return {m.group(0).strip() for m in NOTE_ID.finditer(text)}
+
+
+def parse_edits(response: str) -> List[Dict[str, Any]]:
+    """The list of edits in a model response (bare JSON or a fenced block)."""
+    try:
+        data = json.loads(FENCE.sub("", response.strip()))
+    except ValueError as e:
+        raise EditError(f"response is not JSON: {e}")
+    if isinstance(data, dict):
+        data = data.get("edits")
+    if not isinstance(data, list) or not all(isinstance(e, dict) for e in data):
+        raise EditError("expected a list of edit objects")
+    if not data:
+        raise EditError("no edits returned")
+    return data
+
+
+def _text(edit: Dict[str, Any]) -> str:
+    text = edit.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise EditError(f"edit without text: {edit}")
+    text = text.strip()
+    return text[2:].strip() if text.startswith(("- ", "* ")) else text
+
+
+def _bullet(edit: Dict[str, Any], count: int) -> int:
+    n = edit.get("bullet")
+    if not isinstance(n, int) or not 1 <= n <= count:
+        raise EditError(f"no bullet {n!r} (the summary has {count})")
+    return n
+
+
+def _section(summary: Summary, name: Any) -> Section:
+    wanted = str(name or "").strip().lstrip("#").strip().lower()
+    for s in summary.sections:
+        if s.heading.lower() == wanted:
+            return s
+    raise EditError(f"no section {name!r}")
+
+
+def apply_edits(markdown: str, edits: List[Dict[str, Any]]) -> str:
+    """Apply edits to a summary and return the new Markdown.
+
+    Bullet numbers refer to the original summary, so the order of the edits
+    does not matter. Raises EditError if they cannot be applied safely.
+    """
+    summary = parse_summary(markdown)
+    bullets = summary.bullets()
+    originals = [s.items[i] for s, i in bullets]
+    original_preamble = list(summary.preamble)
+    known = note_ids(markdown)
+    replaced: Dict[int, str] = {}
+    removed: Set[int] = set()
+    added: List[Tuple[Section, Optional[int], str]] = []
+    blurb: Optional[str] = None
+
+    for edit in edits:
+        op = edit.get("op")
+        if op in ("replace", "remove"):
+            n = _bullet(edit, len(bullets))
+            if n in replaced or n in removed:
+                raise EditError(f"bullet {n} is edited twice")
+            if op == "replace":
+                replaced[n] = _text(edit)
+            else:
+                removed.add(n)
+        elif op == "add":
+            after = edit.get("after")
+            if after is not None:
+                after = _bullet({"bullet": after}, len(bullets))
+            added.append((_section(summary, edit.get("section")), after, _text(edit)))
+        elif op == "blurb":
+            if blurb is not None:
+                raise EditError("blurb is edited twice")
+            blurb = _text(edit)
+        else:
+            raise EditError(f"unknown edit op {op!r}")
+
+    new_texts = list(replaced.values()) + [t for _, _, t in added]
+    if blurb is not None:
+        new_texts.append(blurb)
+    for text in new_texts:
+        # A match may pick up words before the ID; it is known if it ends with one.
+        unknown = {m for m in note_ids(text) if not any(m.endswith(k) for k in known)}
+        if unknown:
+            raise EditError(f"cites note IDs not in the summary: {', '.join(sorted(unknown))}")
+    for _, _, text in added:
+        if not note_ids(text):
+            raise EditError(f"added bullet cites no note IDs: {text!r}")
+
+    # Rebuild each section: kept and replaced bullets in place, additions
+    # after their anchor bullet (or at the end of the section).
+    after_bullet: Dict[int, List[str]] = {}
+    at_end: Dict[int, List[str]] = {}
+    for section, after, text in added:
+        if after is not None and bullets[after - 1][0] is section:
+            after_bullet.setdefault(after, []).append(text)
+        else:
+            at_end.setdefault(id(section), []).append(text)
+    n = 0
+    for section in summary.sections:
+        items: List[str] = []
+        for text in section.items:
+            n += 1
+            if n not in removed:
+                items.append(replaced.get(n, text))
+            items.extend(after_bullet.get(n, []))
+        section.items = items + at_end.get(id(section), [])
+    if blurb is not None:
+        summary.preamble = summary.preamble[:1] + [blurb]
+
+    # IDs cited only by removed bullets may go; every other citation must survive.
+    required = note_ids("\n".join(
+        (original_preamble if blurb is None else [])
+        + [t for n, t in enumerate(originals, 1) if n not in removed]
+    ))
+    result = render_summary(summary)
+    lost = required - cited_ids(result, required)
+    if lost:
+        raise EditError(f"edits drop citations of {', '.join(sorted(lost))}")
+    return result
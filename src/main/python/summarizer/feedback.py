@@ -1,20 +1,25 @@
-"""Interactive feedback system for summary refinement."""
+"""Interactive feedback system for summary refinement.
 
-from typing import Optional
+While a summary is on screen, the canned "More detail" and "Less detail"
+refinements are requested in the background, so picking either of them
+returns at once. Prefetches the user does not pick are discarded; they are
+still billed, so the caller can wait for them before writing the ledger.
+Nothing is prefetched on the last iteration allowed.
+"""
 
-from .llm_clients import LLMClient
+import sys
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+from .llm_clients import LLMClient, run_in_thread
+from .profiling import span
 
 
 FEEDBACK_TEMPLATE = """
 You are refining a summary based on user feedback.
 
-ORIGINAL SUMMARY:
-{original_summary}
-
-USER FEEDBACK:
-{user_feedback}
-
-Please revise the summary based on the feedback. Maintain the same markdown format and structure, but incorporate the requested changes.
+Revise the summary below based on the feedback. Maintain the same markdown
+format and structure, but incorporate the requested changes.
 
 If the user asks for:
 - More detail: Add more specific information from the notes
@@ -23,8 +28,49 @@ If the user asks for:
 - Different focus: Adjust emphasis based on the feedback
 
 Return the revised summary in the same format as the original.
+
+ORIGINAL SUMMARY:
+{original_summary}
+
+USER FEEDBACK:
+{user_feedback}
+""".strip()
+
+EDIT_TEMPLATE = """
+You are refining a summary based on user feedback by editing it in place.
+
+The summary below has its bullets numbered [1], [2], ... Do not rewrite it.
+Reply with ONLY a JSON object listing the smallest set of edits that
+addresses the feedback:
+
+{{"edits": [
+  {{"op": "replace", "bullet": <number>, "text": "<new bullet text>"}},
+  {{"op": "remove", "bullet": <number>}},
+  {{"op": "add", "section": "<section heading>", "text": "<bullet text>", "after": <number, optional>}},
+  {{"op": "blurb", "text": "<new 2-3 sentence summary>"}}
+]}}
+
+Rules:
+- Bullet numbers refer to the summary as shown; edits are applied together.
+- Section headings are the ones shown, without the ###.
+- Bullet texts have no leading "- " and end with the note IDs they rely on
+  in parentheses. Keep every note ID of a bullet you replace, and use only
+  note IDs that already appear in the summary.
+
+SUMMARY:
+{numbered_summary}
+
+USER FEEDBACK:
+{user_feedback}
 """.strip()
 
+MORE_DETAIL = (
+    "Please add more detail and specific information to the summary. "
+    "Include more context and specifics from the notes."
+)
+LESS_DETAIL = "Please make the summary more concise. Keep the key information " "but reduce verbosity."
+CANNED_FEEDBACK = [MORE_DETAIL, LESS_DETAIL]   # in the order worth prefetching
+
 
 def get_user_feedback() -> Optional[str]:
     """Get feedback from the user interactively."""
@@ -44,12 +90,9 @@ def get_user_feedback() -> Optional[str]:
         return None
 
     if choice == "1":
-        return (
-            "Please add more detail and specific information to the summary. "
-            "Include more context and specifics from the notes."
-        )
+        return MORE_DETAIL
     elif choice == "2":
-        return "Please make the summary more concise. Keep the key information " "but reduce verbosity."
+        return LESS_DETAIL
     elif choice == "3":
         try:
             corrections = input("What needs to be corrected? ").strip()
@@ -80,28 +123,136 @@ def get_user_feedback() -> Optional[str]:
     return None
 
 
-def refine_summary(original_summary: str, user_feedback: str, client: LLMClient) -> str:
-    """Refine a summary based on user feedback."""
-    prompt = FEEDBACK_TEMPLATE.format(original_summary=original_summary, user_feedback=user_feedback)
-    return client.complete(prompt)
+def refine_summary(
+    original_summary: str, user_feedback: str, client: LLMClient, mode: str = "rewrite"
+) -> str:
+    """Refine a summary based on user feedback.
+
+    `mode` is "rewrite" (the model returns the whole revised summary),
+    "edit" (the model returns structured edits that are applied locally,
+    rewriting instead if they cannot be) or "auto" (rewrite for the canned
+    more/less detail options, which change every bullet, and edit
+    otherwise). Clients with their own `refine(summary, feedback)` method
+    (such as the thin client for `summarizer serve`) are asked to do it
+    themselves.
+    """
+    remote = getattr(client, "refine", None)
+    if remote is not None:
+        return remote(original_summary, user_feedback)
+    if mode == "auto":
+        mode = "rewrite" if user_feedback in CANNED_FEEDBACK else "edit"
+    if mode == "edit":
+        from .edits import EditError
+
+        try:
+            return edit_summary(original_summary, user_feedback, client)
+        except EditError as e:
+            print(f"Could not apply the suggested edits ({e}); rewriting the summary.",
+                  file=sys.stderr)
+    with span("refine", mode="rewrite"):
+        prompt = FEEDBACK_TEMPLATE.format(original_summary=original_summary, user_feedback=user_feedback)
+        return client.complete(prompt)
+
+
+def edit_summary(original_summary: str, user_feedback: str, client: LLMClient) -> str:
+    """Ask for structured edits and apply them; raises EditError if they don't apply."""
+    from .edits import apply_edits, numbered, parse_edits, parse_summary
+
+    with span("refine", mode="edit") as stats:
+        prompt = EDIT_TEMPLATE.format(
+            numbered_summary=numbered(parse_summary(original_summary)),
+            user_feedback=user_feedback,
+        )
+        edits = parse_edits(client.complete(prompt))
+        stats["edits"] = len(edits)
+        return apply_edits(original_summary, edits)
+
+
+class Prefetcher:
+    """Speculative refinements of the summary on screen.
 
+    At most `max_speculative` calls run at once, counting discarded ones
+    that have not finished. Blocking client calls cannot be interrupted, so
+    a discarded prefetch runs to completion on a daemon thread and its
+    answer is dropped.
+    """
 
-def interactive_refinement_loop(initial_summary: str, client: LLMClient, max_iterations: int = 5) -> str:
-    """Run an interactive loop for summary refinement."""
+    def __init__(self, client: LLMClient, max_speculative: int = 2, mode: str = "rewrite") -> None:
+        self.client = client
+        self.max_speculative = max_speculative
+        self.mode = mode
+        self._pending: Dict[str, Future] = {}
+        self._running: List[Future] = []
+        self.used = 0
+        self.wasted = 0
+
+    def start(self, summary: str) -> None:
+        """Prefetch the canned refinements of `summary`."""
+        self._running = [f for f in self._running if not f.done()]
+        for feedback in CANNED_FEEDBACK:
+            if len(self._running) >= self.max_speculative:
+                break
+            fut = run_in_thread(self._refine, summary, feedback)
+            self._pending[feedback] = fut
+            self._running.append(fut)
+
+    def _refine(self, summary: str, feedback: str) -> str:
+        with span("refine.speculative"):
+            return refine_summary(summary, feedback, self.client, self.mode)
+
+    def take(self, feedback: str) -> Optional[Future]:
+        """The prefetch for `feedback`, if any; all other prefetches are discarded."""
+        fut = self._pending.pop(feedback, None)
+        self.discard()
+        if fut is not None:
+            self.used += 1
+        return fut
+
+    def discard(self) -> None:
+        self.wasted += len(self._pending)
+        self._pending.clear()
+
+    def unfinished(self) -> List[Future]:
+        """Prefetches, used or discarded, that are still running."""
+        return [f for f in self._running if not f.done()]
+
+
+def interactive_refinement_loop(
+    initial_summary: str,
+    client: LLMClient,
+    max_iterations: int = 5,
+    max_speculative: int = 2,
+    refine_mode: str = "rewrite",
+    stats: Optional[Dict[str, int]] = None,
+    unfinished: Optional[List[Future]] = None,
+) -> str:
+    """Run an interactive loop for summary refinement.
+
+    `max_speculative` caps concurrent prefetches of the canned refinements;
+    0 turns speculation off. `refine_mode` is passed to refine_summary. If
+    given, `stats` receives the number of refinements and prefetches used
+    and discarded, and `unfinished` the prefetches still running at the end.
+    """
     current_summary = initial_summary
     iteration = 0
+    prefetcher = (
+        Prefetcher(client, max_speculative, refine_mode) if max_speculative > 0 else None
+    )
 
     while iteration < max_iterations:
         print(f"\n--- ITERATION {iteration + 1} ---")
         print(current_summary)
 
+        if prefetcher is not None and iteration + 1 < max_iterations:
+            prefetcher.start(current_summary)
         feedback = get_user_feedback()
         if feedback is None:  # User chose "Done"
             break
 
+        prefetched = prefetcher.take(feedback) if prefetcher is not None else None
         print("\nRefining summary based on your feedback...")
         try:
-            current_summary = refine_summary(current_summary, feedback, client)
+            current_summary = _refined(current_summary, feedback, client, refine_mode, prefetched)
             iteration += 1
         except Exception as e:
             print(f"Error refining summary: {e}")
@@ -110,5 +261,28 @@ def interactive_refinement_loop(initial_summary: str, client: LLMClient, max_ite
 
     if iteration >= max_iterations:
         print(f"\nReached maximum iterations ({max_iterations}). " f"Using current summary.")
+    if prefetcher is not None:
+        prefetcher.discard()
+        if prefetcher.used or prefetcher.wasted:
+            print(f"Prefetched refinements: {prefetcher.used} used, "
+                  f"{prefetcher.wasted} discarded", file=sys.stderr)
+        if unfinished is not None:
+            unfinished.extend(prefetcher.unfinished())
+    if stats is not None:
+        stats["refinements"] = iteration
+        if prefetcher is not None:
+            stats.update(prefetch_used=prefetcher.used, prefetch_wasted=prefetcher.wasted)
 
     return current_summary
+
+
+def _refined(
+    summary: str, feedback: str, client: LLMClient, mode: str, prefetched: Optional[Future]
+) -> str:
+    """The prefetched refinement, or a fresh one if there is none or it failed."""
+    if prefetched is not None:
+        try:
+            return prefetched.result()
+        except Exception:
+            pass
+    return refine_summary(summary, feedback, client, mode)
@@ -4,10 +4,17 @@ import datetime as dt
 import json
 import re
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import (
+    TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple, Union,
+)
 
 from .models import Note
+from .profiling import span
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .catalog import NoteCatalog
 
 
 FILENAME_TS = re.compile(r"\((\d{4}-\d{2}-\d{2}) (\d{2})\.(\d{2})\.(\d{2})\)")
@@ -24,6 +31,166 @@ def parse_filename_dt(filename: str) -> Optional[dt.datetime]:
     )
 
 
+def _warn_unreadable(path: Path, e: BaseException) -> None:
+    print(
+        f"Warning: failed to read {path.name}: {e}",
+        file=sys.stderr
+    )
+
+
+STREAM_THRESHOLD = 8 * 1024 * 1024   # bytes; larger files are parsed segment by segment
+
+_WS = re.compile(r"[ \t\n\r]*")
+_WS_CHARS = " \t\n\r"
+
+
+def _texts(blobs: object) -> List[str]:
+    if not isinstance(blobs, list):
+        return []
+    return [
+        obj["text"] for obj in blobs
+        if isinstance(obj, dict) and isinstance(obj.get("text"), str)
+    ]
+
+
+def _as_str(raw: Union[str, bytes]) -> str:
+    # Same decoding json.loads applies to bytes.
+    if isinstance(raw, str):
+        return raw
+    return raw.decode(json.detect_encoding(raw), "surrogatepass")
+
+
+def _texts_stdlib(raw: Union[str, bytes]) -> List[str]:
+    return _texts(json.loads(raw))
+
+
+def _texts_stream(raw: Union[str, bytes]) -> List[str]:
+    """Decode a top-level JSON list one item at a time.
+
+    Only one segment object is alive at a time, so a multi-hour transcript
+    never becomes a full object tree. Anything that is not a plain list is
+    handed to json.loads, which gives the same result or error as before.
+    """
+    s = _as_str(raw)
+    idx = _WS.match(s).end()
+    if not s.startswith("[", idx):
+        return _texts_stdlib(s)
+    scan = json.JSONDecoder().scan_once
+    skip = _WS.match
+    texts: List[str] = []
+    idx = skip(s, idx + 1).end()
+    if s.startswith("]", idx):
+        idx += 1
+    else:
+        try:
+            while True:
+                obj, idx = scan(s, idx)
+                if type(obj) is dict and isinstance(obj.get("text"), str):
+                    texts.append(obj["text"])
+                c = s[idx:idx + 1]
+                if c in _WS_CHARS:
+                    idx = skip(s, idx).end()
+                    c = s[idx:idx + 1]
+                if c == ",":
+                    idx += 1
+                    if s[idx:idx + 1] in _WS_CHARS:
+                        idx = skip(s, idx).end()
+                elif c == "]":
+                    idx += 1
+                    break
+                else:
+                    return _texts_stdlib(s)  # malformed: raise json's own error
+        except StopIteration:
+            return _texts_stdlib(s)
+    if skip(s, idx).end() != len(s):
+        return _texts_stdlib(s)
+    return texts
+
+
+def _texts_orjson(raw: Union[str, bytes]) -> List[str]:
+    import orjson
+
+    return _texts(orjson.loads(raw))
+
+
+_msgspec_decoder = None
+
+
+def _texts_msgspec(raw: Union[str, bytes]) -> List[str]:
+    """Decode straight into `text` fields; other keys are skipped, not built."""
+    global _msgspec_decoder
+    import msgspec
+
+    if _msgspec_decoder is None:
+        class Segment(msgspec.Struct):
+            text: Any = None
+
+        _msgspec_decoder = msgspec.json.Decoder(List[Segment])
+    return [
+        seg.text for seg in _msgspec_decoder.decode(raw)
+        if isinstance(seg.text, str)
+    ]
+
+
+JSON_BACKENDS: Dict[str, Callable[[Union[str, bytes]], List[str]]] = {
+    "msgspec": _texts_msgspec,
+    "orjson": _texts_orjson,
+    "stdlib": _texts_stdlib,
+    "stream": _texts_stream,
+}
+_available: Optional[List[str]] = None
+
+
+def json_backends() -> List[str]:
+    """Names of the usable JSON_BACKENDS, fastest first."""
+    global _available
+    if _available is None:
+        import importlib.util
+
+        _available = [
+            name for name in JSON_BACKENDS
+            if name in ("stdlib", "stream")
+            or importlib.util.find_spec(name) is not None
+        ]
+    return _available
+
+
+def _pick_backend(size: int) -> str:
+    backends = json_backends()
+    if size > STREAM_THRESHOLD:
+        # orjson would build the whole object tree; msgspec never does.
+        return "msgspec" if "msgspec" in backends else "stream"
+    return backends[0]
+
+
+def note_texts(raw: Union[str, bytes], backend: Optional[str] = None) -> List[str]:
+    """The `text` fields of a transcript's JSON list, in order.
+
+    Uses msgspec or orjson when installed. Input a fast parser rejects but
+    the stdlib accepts (NaN, lone surrogates, items that are not objects) is
+    re-parsed with the stdlib, so results never depend on what is installed.
+    """
+    name = backend or _pick_backend(len(raw))
+    if name in ("stdlib", "stream"):
+        return JSON_BACKENDS[name](raw)
+    try:
+        return JSON_BACKENDS[name](raw)
+    except Exception:
+        return _texts_stdlib(raw)
+
+
+def parse_note(
+    name: str, raw: Union[str, bytes], backend: Optional[str] = None
+) -> Optional[Tuple[str, str]]:
+    """Return (id, text) from raw JSON by concatenating all 'text' fields.
+
+    Raises on malformed JSON; callers decide how to report it.
+    """
+    texts = map(str.strip, note_texts(raw, backend))
+    content = "\n\n".join(t for t in texts if t)
+    return (name, content) if content else None
+
+
 def load_note(path: Path) -> Optional[Tuple[str, str]]:
     """Return (id, text) by concatenating all 'text' fields found in the JSON list.
 
@@ -31,20 +198,114 @@ def load_note(path: Path) -> Optional[Tuple[str, str]]:
     items are ignored.
     """
     try:
-        blobs = json.loads(path.read_text(encoding="utf-8"))
+        return parse_note(path.name, path.read_bytes())
     except Exception as e:  # pragma: no cover - IO path
-        print(
-            f"Warning: failed to read {path.name}: {e}",
-            file=sys.stderr
-        )
+        _warn_unreadable(path, e)
+        return None
+
+
+def _read_bytes(path: Path) -> Tuple[Optional[bytes], Optional[BaseException]]:
+    try:
+        return path.read_bytes(), None
+    except Exception as e:  # pragma: no cover - IO path
+        return None, e
+
+
+def load_notes(
+    paths: Sequence[Path],
+    io_workers: int = 1,
+    parse_processes: int = 0,
+) -> List[Optional[Tuple[str, str]]]:
+    """Load many notes, reading with a thread pool and optionally parsing in processes.
+
+    Results line up with `paths`, and failures are reported in path order with
+    the same warning as `load_note`, so output matches the serial path.
+    """
+    with span("load", files=len(paths), io_workers=io_workers) as stats:
+        if io_workers <= 1:
+            reads = [_read_bytes(p) for p in paths]
+        else:
+            with ThreadPoolExecutor(max_workers=io_workers) as io_pool:
+                reads = list(io_pool.map(_read_bytes, paths))
+        stats["bytes_read"] = sum(len(raw) for raw, _ in reads if raw)
+
+    with span("parse", files=len(paths), processes=parse_processes):
+        if parse_processes > 0:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(parse_processes, mp_context=ctx) as cpu_pool:
+                parsed: List[Optional[Future]] = [
+                    cpu_pool.submit(parse_note, p.name, raw) if raw is not None else None
+                    for p, (raw, _) in zip(paths, reads)
+                ]
+                return [
+                    _collect(p, fut, err)
+                    for p, fut, (_, err) in zip(paths, parsed, reads)
+                ]
+
+        results: List[Optional[Tuple[str, str]]] = []
+        for path, (raw, err) in zip(paths, reads):
+            if err is not None or raw is None:
+                _warn_unreadable(path, err or ValueError("no data"))
+                results.append(None)
+                continue
+            try:
+                results.append(parse_note(path.name, raw))
+            except Exception as e:
+                _warn_unreadable(path, e)
+                results.append(None)
+        return results
+
+
+def _collect(
+    path: Path, fut: Optional[Future], err: Optional[BaseException]
+) -> Optional[Tuple[str, str]]:
+    if fut is None:
+        _warn_unreadable(path, err or ValueError("no data"))
+        return None
+    try:
+        return fut.result()
+    except Exception as e:
+        _warn_unreadable(path, e)
         return None
-    texts: List[str] = []
-    if isinstance(blobs, list):
-        for obj in blobs:
-            if isinstance(obj, dict) and isinstance(obj.get("text"), str):
-                texts.append(obj["text"].strip())
-    content = "\n\n".join(t for t in texts if t)
-    return (path.name, content) if content else None
+
+
+def scan_notes(
+    input_dir: Path, start: dt.date, end: dt.date
+) -> List[Tuple[Path, dt.datetime]]:
+    """Glob input_dir and return (path, when) for files dated within [start, end]."""
+    found: List[Tuple[Path, dt.datetime]] = []
+    with span("scan.glob") as stats:
+        paths = sorted(input_dir.glob("*.json"))
+        for path in paths:
+            when = parse_filename_dt(path.name)
+            if not when:
+                continue
+            if not (start <= when.date() <= end):
+                continue
+            found.append((path, when))
+        stats.update(files_scanned=len(paths), files_matched=len(found))
+    return found
+
+
+def summary_path(out_dir: Path, start: dt.date, end: dt.date) -> Path:
+    """Path of the Markdown file for a summary of [start, end]."""
+    suffix = (
+        start.isoformat()
+        if start == end
+        else f"{start.isoformat()}_to_{end.isoformat()}"
+    )
+    return out_dir / f"summary_{suffix}.md"
+
+
+def save_summary(text: str, out_dir: Path, start: dt.date, end: dt.date) -> Path:
+    """Write a summary to `out_dir` and return its path."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = summary_path(out_dir, start, end)
+    out_path.write_text(text, encoding="utf-8")
+    return out_path
 
 
 def find_notes(
@@ -52,41 +313,88 @@ def find_notes(
     start: dt.date,
     end: dt.date,
     context_days: int = 14,
+    catalog: Optional["NoteCatalog"] = None,
+    io_workers: int = 1,
+    parse_processes: int = 0,
 ) -> List[Note]:
-    """Scan input_dir for JSON transcripts within [start - context_days, end]."""
+    """Scan input_dir for JSON transcripts within [start - context_days, end].
+
+    When a catalog is given the candidate files come from its date index and
+    the notes are returned unread, with the text lengths the catalog
+    recorded; call `load_texts` on the ones you keep. Without a catalog every
+    file is read here. `io_workers`/`parse_processes` are passed through to
+    `load_notes`.
+    """
     context_start = start - dt.timedelta(days=context_days)
-    notes: List[Note] = []
+    if catalog is not None:
+        catalog.refresh()
+        catalog.verify(context_start, end)
+        return [
+            Note(
+                id=path.name, when=when, in_range=(start <= when.date() <= end),
+                path=path, length=length,
+            )
+            for path, when, length in catalog.query_lengths(context_start, end)
+        ]
 
-    for path in sorted(input_dir.glob("*.json")):
-        when = parse_filename_dt(path.name)
-        if not when:
-            continue
-        d = when.date()
-        if not (context_start <= d <= end):
-            continue
-        loaded = load_note(path)
+    candidates = scan_notes(input_dir, context_start, end)
+    loaded_notes = load_notes(
+        [path for path, _ in candidates],
+        io_workers=io_workers,
+        parse_processes=parse_processes,
+    )
+    notes: List[Note] = []
+    for (path, when), loaded in zip(candidates, loaded_notes):
         if not loaded:
             continue
         nid, text = loaded
+        d = when.date()
         notes.append(
-            Note(id=nid, when=when, text=text, in_range=(start <= d <= end))
+            Note(id=nid, when=when, text=text, in_range=(start <= d <= end),
+                 path=path)
         )
 
     return notes
 
 
+def load_texts(
+    notes: Sequence[Note], io_workers: int = 1, parse_processes: int = 0
+) -> None:
+    """Read the text of every note not loaded yet, in one batch via `load_notes`.
+
+    Each file is read once even if several notes (e.g. copies made with
+    `Note.replace`) point at it.
+    """
+    pending: Dict[Path, List[Note]] = {}
+    for n in notes:
+        if not n.loaded:
+            pending.setdefault(n.path, []).append(n)
+    if not pending:
+        return
+    loaded = load_notes(
+        list(pending), io_workers=io_workers, parse_processes=parse_processes
+    )
+    for group, note in zip(pending.values(), loaded):
+        for n in group:
+            n.cache_text(note[1] if note else "")
+
+
 def trim_notes(notes: List[Note], max_chars: int) -> List[Note]:
     """Fit notes to a simple char budget to avoid over-long prompts.
     
     Prefer keeping IN-RANGE notes; drop oldest CONTEXT notes first.
     """
-    if sum(len(n.text) for n in notes) <= max_chars:
-        return notes
-    in_range = [n for n in notes if n.in_range]
-    context = [n for n in notes if not n.in_range]
-    context.sort(key=lambda n: n.when)  # oldest first
-    while context and (
-        sum(len(n.text) for n in in_range + context) > max_chars
-    ):
-        context.pop(0)  # drop oldest context
-    return in_range + context
+    with span("trim", notes_in=len(notes)) as stats:
+        total = sum(n.length for n in notes)
+        if total <= max_chars:
+            stats.update(notes_out=len(notes), chars=total)
+            return notes
+        in_range = [n for n in notes if n.in_range]
+        context = [n for n in notes if not n.in_range]
+        context.sort(key=lambda n: n.when)  # oldest first
+        drop = 0
+        while drop < len(context) and total > max_chars:
+            total -= context[drop].length  # drop oldest context
+            drop += 1
+        stats.update(notes_out=len(notes) - drop, chars=total)
+        return in_range + context[drop:]
@@ -0,0 +1,283 @@
+"""Hedged requests and fallback across providers.
+
+`HedgedClient` wraps an ordered list of provider clients. The first one is
+asked first. If it has not answered within the hedge delay (a percentile of
+its recent latencies, recorded across runs), the next one is asked as well,
+and whichever answers first wins. A provider that fails is retried with
+exponential backoff and full jitter; once its retries are used up, the next
+provider takes over immediately.
+
+With `acomplete` the losing requests are cancelled. Blocking `complete`
+calls run in threads that cannot be interrupted, so there the losers are
+abandoned: their answers are discarded, but their latency is still recorded.
+Each call's winner and the reason it won are kept in `outcomes`.
+"""
+
+import asyncio
+import dataclasses
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .llm_clients import LLMClient, acomplete, call_usage, record_usage, run_in_thread
+from .models import Usage
+from .profiling import span
+
+
+MIN_SAMPLES = 5         # latencies needed before the percentile is trusted
+MAX_SAMPLES = 50        # latencies kept per provider/model
+
+
+def parse_target(spec: str) -> Tuple[str, str]:
+    """Split 'PROVIDER:MODEL' as given to --hedge."""
+    provider, sep, model = spec.partition(":")
+    if not sep or not provider or not model:
+        raise SystemExit(f"--hedge expects PROVIDER:MODEL, got {spec!r}")
+    return provider, model
+
+
+def client_name(client: LLMClient) -> str:
+    return f"{getattr(client, 'provider', type(client).__name__)}/" \
+           f"{getattr(client, 'model', None)}"
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty sequence."""
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+class LatencyHistory:
+    """Recent successful latencies per provider/model, optionally kept on disk."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+        if path is not None:
+            try:
+                self._samples = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                pass
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(name, [])
+            samples.append(round(seconds, 3))
+            del samples[:-MAX_SAMPLES]
+            if self.path is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(self._samples), encoding="utf-8")
+                os.replace(tmp, self.path)
+
+    def percentile(self, name: str, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = list(self._samples.get(name, ()))
+        if len(samples) < MIN_SAMPLES:
+            return None
+        return percentile(samples, pct)
+
+
+@dataclasses.dataclass
+class Outcome:
+    winner: str             # provider/model that answered
+    reason: str             # why it was asked: primary, hedge or fallback
+    seconds: float
+    launched: int           # providers asked
+    errors: List[str]
+
+
+class HedgedClient:
+    """Ask providers in order, hedging slow ones and falling back on failures.
+
+    `initial_delay` is the hedge delay for a provider with fewer than
+    MIN_SAMPLES recorded latencies.
+    """
+
+    def __init__(
+        self,
+        clients: Sequence[LLMClient],
+        history: Optional[LatencyHistory] = None,
+        hedge_percentile: float = 95.0,
+        initial_delay: float = 10.0,
+        retries: int = 2,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if not clients:
+            raise ValueError("HedgedClient needs at least one client")
+        self.clients = list(clients)
+        self.history = history or LatencyHistory()
+        self.hedge_percentile = hedge_percentile
+        self.initial_delay = initial_delay
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._rng = rng or random.Random()
+        self.outcomes: List[Outcome] = []
+        primary = self.clients[0]
+        self.provider = "hedged"
+        self.model = ",".join(client_name(c) for c in self.clients)
+        self.temperature = getattr(primary, "temperature", None)
+        self.system_prompt = getattr(primary, "system_prompt", None)
+        self.last_usage = None
+
+    def hedge_delay(self, client: LLMClient) -> float:
+        """How long to wait on `client` before asking the next provider too."""
+        observed = self.history.percentile(client_name(client), self.hedge_percentile)
+        return self.initial_delay if observed is None else observed
+
+    def _backoff_delay(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(cap, base * 2^attempt)].
+        return self._rng.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _attempts(self, client: LLMClient, prompt: str) -> Tuple[str, Optional[Usage]]:
+        """The result of `client`, retried with backoff, and that call's usage
+        (read in the worker thread, where it was recorded)."""
+        for attempt in range(self.retries + 1):
+            t0 = time.perf_counter()
+            try:
+                result = client.complete(prompt)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self._backoff_delay(attempt))
+                continue
+            self.history.record(client_name(client), time.perf_counter() - t0)
+            return result, call_usage()
+        raise AssertionError("unreachable")
+
+    async def _aattempts(
+        self, client: LLMClient, prompt: str
+    ) -> Tuple[str, Optional[Usage]]:
+        for attempt in range(self.retries + 1):
+            t0 = time.perf_counter()
+            try:
+                result = await acomplete(client, prompt)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(self._backoff_delay(attempt))
+                continue
+            self.history.record(client_name(client), time.perf_counter() - t0)
+            return result, call_usage()
+        raise AssertionError("unreachable")
+
+    def _launch_reason(self, i: int, hedged: bool) -> str:
+        if i == 0:
+            return "primary"
+        previous = client_name(self.clients[i - 1])
+        if hedged:
+            return f"hedge: {previous} slower than {self.hedge_delay(self.clients[i - 1]):.1f}s"
+        return f"fallback: {previous} failed"
+
+    def _finish(
+        self, i: int, reasons: List[str], t0: float, errors: List[str],
+        stats: Dict[str, object], usage: Optional[Usage],
+    ) -> None:
+        winner = self.clients[i]
+        outcome = Outcome(
+            client_name(winner), reasons[i], time.perf_counter() - t0,
+            len(reasons), errors,
+        )
+        self.outcomes.append(outcome)
+        record_usage(self, usage)
+        stats.update(winner=outcome.winner, reason=outcome.reason,
+                     launched=outcome.launched)
+
+    def complete(self, prompt: str) -> str:
+        with span("hedge.complete") as stats:
+            t0 = time.perf_counter()
+            running: Dict[Future, int] = {}
+            reasons: List[str] = []
+            errors: List[str] = []
+
+            def launch(hedged: bool) -> None:
+                i = len(reasons)
+                reasons.append(self._launch_reason(i, hedged))
+                running[run_in_thread(self._attempts, self.clients[i], prompt)] = i
+
+            # Losers keep running in their threads; their answers are dropped.
+            launch(hedged=False)
+            while running:
+                more = len(reasons) < len(self.clients)
+                timeout = self.hedge_delay(self.clients[len(reasons) - 1]) if more else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    launch(hedged=True)
+                    continue
+                for fut in done:
+                    i = running.pop(fut)
+                    try:
+                        result, usage = fut.result()
+                    except Exception as e:
+                        errors.append(f"{client_name(self.clients[i])}: {e}")
+                        continue
+                    self._finish(i, reasons, t0, errors, stats, usage)
+                    return result
+                if not running and len(reasons) < len(self.clients):
+                    launch(hedged=False)
+            raise RuntimeError("All providers failed: " + "; ".join(errors))
+
+    async def acomplete(self, prompt: str) -> str:
+        with span("hedge.acomplete") as stats:
+            t0 = time.perf_counter()
+            running: Dict["asyncio.Task[Tuple[str, Optional[Usage]]]", int] = {}
+            reasons: List[str] = []
+            errors: List[str] = []
+
+            def launch(hedged: bool) -> None:
+                i = len(reasons)
+                reasons.append(self._launch_reason(i, hedged))
+                coro: Awaitable[Tuple[str, Optional[Usage]]] = self._aattempts(self.clients[i], prompt)
+                running[asyncio.ensure_future(coro)] = i
+
+            try:
+                launch(hedged=False)
+                while running:
+                    more = len(reasons) < len(self.clients)
+                    timeout = self.hedge_delay(self.clients[len(reasons) - 1]) if more else None
+                    done, _ = await asyncio.wait(
+                        running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not done:
+                        launch(hedged=True)
+                        continue
+                    for task in done:
+                        i = running.pop(task)
+                        try:
+                            result, usage = task.result()
+                        except Exception as e:
+                            errors.append(f"{client_name(self.clients[i])}: {e}")
+                            continue
+                        self._finish(i, reasons, t0, errors, stats, usage)
+                        return result
+                    if not running and len(reasons) < len(self.clients):
+                        launch(hedged=False)
+                raise RuntimeError("All providers failed: " + "; ".join(errors))
+            finally:
+                for task in running:
+                    task.cancel()
+
+    def report(self) -> None:
+        wins: Dict[Tuple[str, str], int] = {}
+        for o in self.outcomes:
+            kind = o.reason.split(":", 1)[0]
+            wins[(o.winner, kind)] = wins.get((o.winner, kind), 0) + 1
+        if wins:
+            print(
+                "Hedging: " + ", ".join(
+                    f"{winner} won {n} ({kind})" for (winner, kind), n in sorted(wins.items())
+                ),
+                file=sys.stderr,
+            )
@@ -0,0 +1,280 @@
+"""A persistent ledger of runs, and the `summarizer stats` report.
+
+Every summary run appends one JSON line to the ledger with its date range,
+note counts, prompt size, provider/model, latency, token usage, LLM calls,
+cache hits and refinement iterations (batch mode writes one line per
+period). Token totals come from `UsageTally`, which sees every provider call
+made through a client's traced methods; answers from the response cache
+are not billed and are not counted.
+
+`summarizer stats` reads the ledger and reports latency percentiles,
+throughput and estimated cost per provider/model, overall and per week.
+"""
+
+import argparse
+import datetime as dt
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .models import Usage
+from .paths import DEFAULT_LEDGER_FILE
+
+
+# USD per million tokens: (input, cached input, cache write, output). Model
+# names match by longest prefix. Prices change; override them with --prices.
+PRICES: Dict[str, Tuple[float, float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.15, 0.60),
+    "gpt-4o": (2.50, 1.25, 2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 0.40, 1.60),
+    "gpt-4.1": (2.00, 0.50, 2.00, 8.00),
+    "gemini-1.5-flash": (0.075, 0.01875, 0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 0.3125, 1.25, 5.00),
+    "gemini-2.0-flash": (0.10, 0.025, 0.10, 0.40),
+    "claude-3-5-haiku": (0.80, 0.08, 1.00, 4.00),
+    "claude-3-5-sonnet": (3.00, 0.30, 3.75, 15.00),
+    "claude-sonnet-4": (3.00, 0.30, 3.75, 15.00),
+}
+
+
+class UsageTally:
+    """Running totals of provider calls and their token usage."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.seconds = 0.0
+        self.usage = Usage()
+
+    def add(self, usage: Optional[Usage], seconds: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.seconds += seconds
+            if usage is not None:
+                self.usage = Usage(
+                    self.usage.input_tokens + usage.input_tokens,
+                    self.usage.output_tokens + usage.output_tokens,
+                    self.usage.cached_input_tokens + usage.cached_input_tokens,
+                    self.usage.cache_write_tokens + usage.cache_write_tokens,
+                )
+
+    def snapshot(self) -> Tuple[int, float, Usage]:
+        with self._lock:
+            return self.calls, self.seconds, self.usage
+
+    def since(self, before: Tuple[int, float, Usage]) -> Dict[str, Any]:
+        """Ledger fields for the calls made after `before` was taken."""
+        calls, seconds, usage = self.snapshot()
+        return usage_fields(usage, before[2]) | {
+            "llm_calls": calls - before[0],
+            "llm_seconds": round(seconds - before[1], 3),
+        }
+
+
+def usage_fields(usage: Optional[Usage], minus: Optional[Usage] = None) -> Dict[str, int]:
+    usage = usage or Usage()
+    minus = minus or Usage()
+    return {
+        "input_tokens": usage.input_tokens - minus.input_tokens,
+        "output_tokens": usage.output_tokens - minus.output_tokens,
+        "cached_input_tokens": usage.cached_input_tokens - minus.cached_input_tokens,
+        "cache_write_tokens": usage.cache_write_tokens - minus.cache_write_tokens,
+    }
+
+
+def append_record(path: Optional[Path], record: Dict[str, Any]) -> None:
+    """Append one run to the ledger; a ledger that can't be written only warns."""
+    if path is None:
+        return
+    record = {"ts": dt.datetime.now().isoformat(timespec="seconds")} | record
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"Warning: could not write run ledger {path}: {e}", file=sys.stderr)
+
+
+def read_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """Ledger records, skipping lines that are not valid JSON objects."""
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict):
+            yield record
+
+
+def load_prices(path: Optional[Path]) -> Dict[str, Tuple[float, float, float, float]]:
+    """PRICES, updated from a TOML file of [model] input/cached/cache_write/output."""
+    prices = dict(PRICES)
+    if path is None:
+        return prices
+    import tomllib
+
+    try:
+        table = tomllib.loads(path.read_text(encoding="utf-8"))
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise SystemExit(f"Invalid prices file {path}: {e}")
+    for model, p in table.items():
+        inp = float(p.get("input", 0.0))
+        prices[model] = (
+            inp, float(p.get("cached", inp)), float(p.get("cache_write", inp)),
+            float(p.get("output", 0.0)),
+        )
+    return prices
+
+
+def cost(record: Dict[str, Any], prices: Dict[str, Tuple[float, float, float, float]]) -> Optional[float]:
+    """Estimated USD for a record, or None if its model has no price."""
+    model = str(record.get("model") or "")
+    matches = [m for m in prices if model.startswith(m)]
+    if not matches:
+        return None
+    inp, cached, write, out = prices[max(matches, key=len)]
+    cached_tokens = record.get("cached_input_tokens", 0)
+    write_tokens = record.get("cache_write_tokens", 0)
+    uncached = record.get("input_tokens", 0) - cached_tokens - write_tokens
+    return (
+        uncached * inp + cached_tokens * cached + write_tokens * write
+        + record.get("output_tokens", 0) * out
+    ) / 1e6
+
+
+def _row(records: Sequence[Dict[str, Any]], prices: Dict[str, Tuple[float, float, float, float]]) -> Dict[str, Any]:
+    from .hedging import percentile
+
+    ok = [r for r in records if r.get("status") == "ok"]
+    latencies = [r["latency_s"] for r in ok if r.get("latency_s") is not None]
+    ttfts = [r["ttft_s"] for r in ok if r.get("ttft_s") is not None]
+    busy = sum(latencies)
+    # Token throughput is over the time spent in provider calls, which also
+    # covers refinements and map-reduce's concurrent calls.
+    llm_busy = sum(r.get("llm_seconds") or r.get("latency_s") or 0.0 for r in ok)
+    costs = [c for c in (cost(r, prices) for r in records) if c is not None]
+
+    def pct(values: List[float], p: float) -> Optional[float]:
+        return round(percentile(values, p), 2) if values else None
+
+    return {
+        "runs": len(records),
+        "errors": len(records) - len(ok),
+        "p50_s": pct(latencies, 50),
+        "p90_s": pct(latencies, 90),
+        "p99_s": pct(latencies, 99),
+        "ttft_p50_s": pct(ttfts, 50),
+        "notes_per_s": round(sum(r.get("notes", 0) for r in ok) / busy, 1) if busy else None,
+        "out_tokens_per_s": (
+            round(sum(r.get("output_tokens", 0) for r in ok) / llm_busy, 1) if llm_busy else None
+        ),
+        "input_tokens": sum(r.get("input_tokens", 0) for r in records),
+        "output_tokens": sum(r.get("output_tokens", 0) for r in records),
+        "cost_usd": round(sum(costs), 4) if costs else None,
+        "cost_per_run_usd": round(sum(costs) / len(costs), 4) if costs else None,
+    }
+
+
+def _week(ts: Any) -> str:
+    """The ISO week of a record's timestamp, or "undated" without a valid one."""
+    try:
+        year, week, _ = dt.datetime.fromisoformat(str(ts)).isocalendar()
+    except ValueError:
+        return "undated"
+    return f"{year}-W{week:02d}"
+
+
+def _group(records: Iterable[Dict[str, Any]], by_week: bool) -> Dict[Tuple[str, ...], List[Dict[str, Any]]]:
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for r in records:
+        key: Tuple[str, ...] = (f"{r.get('provider')}/{r.get('model')}",)
+        if by_week:
+            key += (_week(r.get("ts")),)
+        groups.setdefault(key, []).append(r)
+    return dict(sorted(groups.items()))
+
+
+def _fmt(value: Any, suffix: str = "") -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:g}{suffix}"
+    return f"{value:,}{suffix}"
+
+
+def print_table(title: str, rows: Dict[Tuple[str, ...], Dict[str, Any]]) -> None:
+    columns = [
+        ("runs", "runs", ""), ("errors", "err", ""), ("p50_s", "p50", "s"),
+        ("p90_s", "p90", "s"), ("p99_s", "p99", "s"), ("ttft_p50_s", "ttft", "s"),
+        ("notes_per_s", "notes/s", ""), ("out_tokens_per_s", "out tok/s", ""),
+        ("input_tokens", "in tok", ""), ("output_tokens", "out tok", ""),
+        ("cost_usd", "cost $", ""), ("cost_per_run_usd", "$/run", ""),
+    ]
+    table = [[" ".join(key)] + [_fmt(row[c], s) for c, _, s in columns] for key, row in rows.items()]
+    header = [title] + [h for _, h, _ in columns]
+    widths = [max(len(str(x)) for x in col) for col in zip(header, *table)]
+    print("  ".join(h.ljust(w) if i == 0 else h.rjust(w) for i, (h, w) in enumerate(zip(header, widths))))
+    for line in table:
+        print("  ".join(c.ljust(w) if i == 0 else c.rjust(w) for i, (c, w) in enumerate(zip(line, widths))))
+
+
+def stats_main(argv: Sequence[str]) -> int:
+    """Entry point for `summarizer stats`."""
+    parser = argparse.ArgumentParser(
+        prog="summarizer stats",
+        description="Report latency, throughput and cost from the run ledger",
+    )
+    parser.add_argument("--ledger", type=Path, default=DEFAULT_LEDGER_FILE,
+                        help=f"Ledger file (default: {DEFAULT_LEDGER_FILE})")
+    parser.add_argument("--since", default=None, metavar="YYYY-MM-DD",
+                        help="Only runs on or after this date")
+    parser.add_argument("--provider", default=None, help="Only this provider")
+    parser.add_argument("--model", default=None, help="Only this model")
+    parser.add_argument("--weekly", action="store_true",
+                        help="Also break each provider/model down by ISO week")
+    parser.add_argument("--prices", type=Path, default=None,
+                        help=("TOML of USD per million tokens per model "
+                              "([\"gpt-4o-mini\"] input, cached, cache_write, output)"))
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    records = list(read_records(args.ledger))
+    if args.since:
+        records = [r for r in records if str(r.get("ts", "")) >= args.since]
+    if args.provider:
+        records = [r for r in records if r.get("provider") == args.provider]
+    if args.model:
+        records = [r for r in records if r.get("model") == args.model]
+    if not records:
+        print(f"No runs recorded in {args.ledger}.")
+        return 1
+
+    prices = load_prices(args.prices)
+    overall = {k: _row(v, prices) for k, v in _group(records, by_week=False).items()}
+    weekly = (
+        {k: _row(v, prices) for k, v in _group(records, by_week=True).items()}
+        if args.weekly else {}
+    )
+    if args.json:
+        print(json.dumps({
+            "overall": {" ".join(k): v for k, v in overall.items()},
+            "weekly": {" ".join(k): v for k, v in weekly.items()},
+        }, indent=2))
+        return 0
+    dated = sorted(str(r["ts"]) for r in records if _week(r.get("ts")) != "undated")
+    period = f" from {dated[0][:10]} to {dated[-1][:10]}" if dated else ""
+    print(f"{len(records)} run(s){period} ({args.ledger})\n")
+    print_table("provider/model", overall)
+    if weekly:
+        print()
+        print_table("provider/model week", weekly)
+    if any(row["cost_usd"] is None for row in overall.values()):
+        print("\nCost '-': no price for the model; add it with --prices.")
+    return 0
@@ -1,47 +1,292 @@
 """LLM client implementations for different providers."""
 
+import functools
+import importlib.util
 import os
-from typing import Optional, Protocol
+import threading
+import time
+from concurrent.futures import Future
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Protocol
+
+from .ledger import UsageTally
+from .models import Usage
+from .profiling import span
+from .prompts import split_cacheable
+from .ratelimit import Scheduler
+
+
+SYSTEM_PROMPT = "You are a meticulous and concise summarizer."
+TEMPERATURE = 0.2
+
+# Shared by every client in the process, so concurrent summaries (batch mode,
+# the server) queue fairly for each provider/model's rate limits.
+SCHEDULER = Scheduler()
+# Every provider call that returned, for the run ledger.
+TALLY = UsageTally()
+# Usage of the latest call made in this thread or asyncio task. `last_usage`
+# is shared by every call on a client, so concurrent calls overwrite it.
+_CALL_USAGE: ContextVar[Optional[Usage]] = ContextVar("call_usage", default=None)
 
 
 class LLMClient(Protocol):
-    """Minimal interface for a text-completion client."""
+    """Minimal interface for a text-completion client.
+
+    Provider SDKs are imported on the first request rather than at
+    construction, so commands that never reach the network stay fast.
+
+    Clients also expose `provider`, `model`, `temperature` and `system_prompt`
+    attributes describing the request settings (used as cache keys), and
+    `last_usage` with the token usage of the most recent call, if reported.
+    Clients report usage with `record_usage`; callers that may run calls
+    concurrently read their own call's usage with `call_usage`.
+    """
     def complete(self, prompt: str) -> str:  # pragma: no cover - interface
         ...
 
+    def stream(self, prompt: str) -> Iterator[str]:  # pragma: no cover - interface
+        """Yield the completion as text chunks as they arrive."""
+        ...
+
+    async def acomplete(self, prompt: str) -> str:  # pragma: no cover - interface
+        """Async variant of complete(), used by batch mode."""
+        ...
+
+
+def record_usage(client: Any, usage: Optional[Usage]) -> None:
+    """Report the usage of the call `client` just made (None: no billed call)."""
+    client.last_usage = usage
+    _CALL_USAGE.set(usage)
+
+
+def call_usage() -> Optional[Usage]:
+    """Usage of the latest call made in this thread or asyncio task."""
+    return _CALL_USAGE.get()
+
+
+async def acomplete(client: LLMClient, prompt: str) -> str:
+    """Complete asynchronously, running blocking clients in a worker thread."""
+    import asyncio
+
+    native = getattr(client, "acomplete", None)
+    if native is not None:
+        return await native(prompt)
+
+    def run() -> Any:
+        # The thread runs in a copy of this task's context; bring usage back.
+        return client.complete(prompt), call_usage()
+
+    result, usage = await asyncio.to_thread(run)
+    _CALL_USAGE.set(usage)
+    return result
+
+
+def run_in_thread(fn: Callable[..., Any], *args: Any) -> Future:
+    """Run fn in a daemon thread, so an abandoned call never delays exit."""
+    fut: Future = Future()
+
+    def run() -> None:
+        try:
+            fut.set_result(fn(*args))
+        except BaseException as e:
+            fut.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return fut
+
+
+def stream_completion(client: LLMClient, prompt: str) -> Iterator[str]:
+    """Stream from `client`, falling back to a single chunk if it can't stream."""
+    stream = getattr(client, "stream", None)
+    if stream is None:
+        yield client.complete(prompt)
+        return
+    yield from stream(prompt)
+
+
+def _add_usage(stats: Dict[str, object], usage: Optional[Usage]) -> None:
+    if usage is not None:
+        stats.update(
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            cached_input_tokens=usage.cached_input_tokens,
+        )
+
+
+def _traced(stage: str, kind: str = "sync") -> Callable:
+    """Record a profiling span, with prompt size and usage, around a client call,
+    and add the call to TALLY.
+
+    `kind` is "sync", "async" or "stream" (a generator of text chunks).
+    """
+    def wrap(fn: Callable) -> Callable:
+        def counts(self: Any, prompt: str) -> Dict[str, object]:
+            return dict(provider=self.provider, model=self.model,
+                        prompt_chars=len(prompt))
+
+        if kind == "async":
+            async def run_async(self: Any, prompt: str) -> str:
+                t0 = time.perf_counter()
+                _CALL_USAGE.set(None)
+                with span(stage, **counts(self, prompt)) as stats:
+                    result = await fn(self, prompt)
+                    _add_usage(stats, call_usage())
+                TALLY.add(call_usage(), time.perf_counter() - t0)
+                return result
+            return functools.wraps(fn)(run_async)
+
+        if kind == "stream":
+            def run_stream(self: Any, prompt: str) -> Iterator[str]:
+                t0 = time.perf_counter()
+                _CALL_USAGE.set(None)
+                with span(stage, **counts(self, prompt)) as stats:
+                    yield from fn(self, prompt)
+                    _add_usage(stats, call_usage())
+                TALLY.add(call_usage(), time.perf_counter() - t0)
+            return functools.wraps(fn)(run_stream)
+
+        def run(self: Any, prompt: str) -> str:
+            t0 = time.perf_counter()
+            _CALL_USAGE.set(None)
+            with span(stage, **counts(self, prompt)) as stats:
+                result = fn(self, prompt)
+                _add_usage(stats, call_usage())
+            TALLY.add(call_usage(), time.perf_counter() - t0)
+            return result
+        return functools.wraps(fn)(run)
+    return wrap
+
+
+def _scheduled(kind: str = "sync") -> Callable:
+    """Run a client call through SCHEDULER's limiter for its provider/model.
+
+    `kind` is "sync", "async" or "stream", as for `_traced`.
+    """
+    def wrap(fn: Callable) -> Callable:
+        if kind == "async":
+            async def run_async(self: Any, prompt: str) -> str:
+                limiter = SCHEDULER.limiter(self.provider, self.model)
+                return await limiter.acall(
+                    functools.partial(fn, self), prompt, call_usage
+                )
+            return functools.wraps(fn)(run_async)
+
+        if kind == "stream":
+            def run_stream(self: Any, prompt: str) -> Iterator[str]:
+                limiter = SCHEDULER.limiter(self.provider, self.model)
+                yield from limiter.stream(
+                    functools.partial(fn, self), prompt, call_usage
+                )
+            return functools.wraps(fn)(run_stream)
+
+        def run(self: Any, prompt: str) -> str:
+            limiter = SCHEDULER.limiter(self.provider, self.model)
+            return limiter.call(functools.partial(fn, self), prompt, call_usage)
+        return functools.wraps(fn)(run)
+    return wrap
+
+
+def _require(module: str, package: str) -> None:
+    """Fail fast if an SDK is missing, without paying for importing it."""
+    try:
+        found = importlib.util.find_spec(module) is not None
+    except ImportError:  # pragma: no cover - parent package missing
+        found = False
+    if not found:
+        raise RuntimeError(f"Missing dependency: pip install {package}")
+
 
 class OpenAIClient:
     """OpenAI Chat Completions wrapper.
 
+    OpenAI caches long prompt prefixes automatically, so the cache-friendly
+    layout from `build_prompt` is enough; cached tokens are read back from
+    `usage.prompt_tokens_details`.
+
     Requirements:
       pip install openai
       export OPENAI_API_KEY=...  (or pass --api-key)
     """
 
     def __init__(self, model: str, api_key: Optional[str] = None) -> None:
-        try:
-            from openai import OpenAI  # type: ignore
-        except Exception as e:  # pragma: no cover - import error path
-            raise RuntimeError("Missing dependency: pip install openai") from e
-        self._OpenAI = OpenAI
-        self._client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        _require("openai", "openai")
+        self._api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self._sdk_client: Any = None
+        self._aclient: Any = None
         self._model = model
+        self.provider = "openai"
+        self.model = model
+        self.temperature: Optional[float] = TEMPERATURE
+        self.system_prompt: Optional[str] = SYSTEM_PROMPT
+        self.last_usage: Optional[Usage] = None
 
-    def complete(self, prompt: str) -> str:
+    @property
+    def _client(self) -> Any:
+        """The SDK client, imported and constructed on first use."""
+        if self._sdk_client is None:
+            with span("client.import", provider="openai"):
+                try:
+                    from openai import OpenAI  # type: ignore
+                except Exception as e:  # pragma: no cover - import error path
+                    raise RuntimeError("Missing dependency: pip install openai") from e
+            with span("client.init", provider="openai"):
+                self._sdk_client = OpenAI(api_key=self._api_key, max_retries=0)
+        return self._sdk_client
+
+    def _request(self, prompt: str) -> dict:
         # Use Chat Completions for broad compatibility
-        resp = self._client.chat.completions.create(
+        return dict(
             model=self._model,
             messages=[
                 {
                     "role": "system",
-                    "content": "You are a meticulous and concise summarizer."
+                    "content": self.system_prompt,
                 },
                 {"role": "user", "content": prompt},
             ],
-            temperature=0.2,
+            temperature=self.temperature,
         )
+
+    def _record_usage(self, usage: Any) -> None:
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        record_usage(self, Usage(
+            input_tokens=usage.prompt_tokens or 0,
+            output_tokens=usage.completion_tokens or 0,
+            cached_input_tokens=getattr(details, "cached_tokens", 0) or 0,
+        ))
+
+    @_traced("llm.complete")
+    @_scheduled()
+    def complete(self, prompt: str) -> str:
+        resp = self._client.chat.completions.create(**self._request(prompt))
+        self._record_usage(resp.usage)
         return resp.choices[0].message.content or ""
 
+    @_traced("llm.acomplete", kind="async")
+    @_scheduled(kind="async")
+    async def acomplete(self, prompt: str) -> str:
+        if self._aclient is None:
+            from openai import AsyncOpenAI  # type: ignore
+            self._aclient = AsyncOpenAI(api_key=self._api_key, max_retries=0)
+        resp = await self._aclient.chat.completions.create(**self._request(prompt))
+        self._record_usage(resp.usage)
+        return resp.choices[0].message.content or ""
+
+    @_traced("llm.stream", kind="stream")
+    @_scheduled(kind="stream")
+    def stream(self, prompt: str) -> Iterator[str]:
+        resp = self._client.chat.completions.create(
+            **self._request(prompt),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        for chunk in resp:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            self._record_usage(getattr(chunk, "usage", None))
+
 
 class GeminiClient:
     """Google Gemini wrapper.
@@ -52,50 +297,162 @@ class GeminiClient:
     """
 
     def __init__(self, model: str, api_key: Optional[str] = None) -> None:
-        try:
-            import google.generativeai as genai  # type: ignore
-        except Exception as e:  # pragma: no cover - import error
-            raise RuntimeError(
-                "Missing dependency: pip install google-generativeai"
-            ) from e
-        self._genai = genai
-        self._genai.configure(api_key=api_key or os.getenv("GOOGLE_API_KEY"))
-        self._model = genai.GenerativeModel(model)
+        _require("google.generativeai", "google-generativeai")
+        self._api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        self._genai_model: Any = None
+        self.provider = "gemini"
+        self.model = model
+        self.temperature: Optional[float] = None
+        self.system_prompt: Optional[str] = None
+        self.last_usage: Optional[Usage] = None
+
+    @property
+    def _model(self) -> Any:
+        """The GenerativeModel, imported and configured on first use."""
+        if self._genai_model is None:
+            with span("client.import", provider="gemini"):
+                try:
+                    import google.generativeai as genai  # type: ignore
+                except Exception as e:  # pragma: no cover - import error
+                    raise RuntimeError(
+                        "Missing dependency: pip install google-generativeai"
+                    ) from e
+            with span("client.init", provider="gemini"):
+                genai.configure(api_key=self._api_key)
+                self._genai_model = genai.GenerativeModel(self.model)
+        return self._genai_model
+
+    def _record_usage(self, resp: Any) -> None:
+        meta = getattr(resp, "usage_metadata", None)
+        if not meta:
+            return
+        record_usage(self, Usage(
+            input_tokens=getattr(meta, "prompt_token_count", 0) or 0,
+            output_tokens=getattr(meta, "candidates_token_count", 0) or 0,
+            cached_input_tokens=getattr(meta, "cached_content_token_count", 0) or 0,
+        ))
 
+    @_traced("llm.complete")
+    @_scheduled()
     def complete(self, prompt: str) -> str:
         resp = self._model.generate_content(prompt)
+        self._record_usage(resp)
         return getattr(resp, "text", "").strip()
 
+    @_traced("llm.acomplete", kind="async")
+    @_scheduled(kind="async")
+    async def acomplete(self, prompt: str) -> str:
+        resp = await self._model.generate_content_async(prompt)
+        self._record_usage(resp)
+        return getattr(resp, "text", "").strip()
+
+    @_traced("llm.stream", kind="stream")
+    @_scheduled(kind="stream")
+    def stream(self, prompt: str) -> Iterator[str]:
+        for chunk in self._model.generate_content(prompt, stream=True):
+            self._record_usage(chunk)
+            try:
+                text = chunk.text
+            except ValueError:  # chunk without text parts (e.g. safety stop)
+                continue
+            if text:
+                yield text
+
 
 class ClaudeClient:
     """Anthropic Claude wrapper.
 
+    The stable prefix of prompts built by `build_prompt` (everything before
+    CACHE_BREAK) is sent as its own content block with a cache-control marker,
+    so reruns and refinements over the same notes hit Anthropic's prompt cache.
+
     Requirements:
       pip install anthropic
       export ANTHROPIC_API_KEY=...  (or pass --api-key)
     """
 
     def __init__(self, model: str, api_key: Optional[str] = None) -> None:
-        try:
-            from anthropic import Anthropic  # type: ignore
-        except Exception as e:  # pragma: no cover - import error path
-            raise RuntimeError("Missing dependency: pip install anthropic") from e
-        self._Anthropic = Anthropic
-        self._client = Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
+        _require("anthropic", "anthropic")
+        self._api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+        self._sdk_client: Any = None
+        self._aclient: Any = None
         self._model = model
+        self.provider = "claude"
+        self.model = model
+        self.temperature: Optional[float] = TEMPERATURE
+        self.system_prompt: Optional[str] = SYSTEM_PROMPT
+        self.last_usage: Optional[Usage] = None
 
-    def complete(self, prompt: str) -> str:
-        resp = self._client.messages.create(
+    @property
+    def _client(self) -> Any:
+        """The SDK client, imported and constructed on first use."""
+        if self._sdk_client is None:
+            with span("client.import", provider="claude"):
+                try:
+                    from anthropic import Anthropic  # type: ignore
+                except Exception as e:  # pragma: no cover - import error path
+                    raise RuntimeError("Missing dependency: pip install anthropic") from e
+            with span("client.init", provider="claude"):
+                self._sdk_client = Anthropic(api_key=self._api_key, max_retries=0)
+        return self._sdk_client
+
+    def _request(self, prompt: str) -> dict:
+        prefix, rest = split_cacheable(prompt)
+        content: List[dict] = []
+        if prefix:
+            content.append({
+                "type": "text",
+                "text": prefix,
+                "cache_control": {"type": "ephemeral"},
+            })
+        content.append({"type": "text", "text": rest})
+        return dict(
             model=self._model,
             max_tokens=4096,
-            system="You are a meticulous and concise summarizer.",
+            system=self.system_prompt,
             messages=[
-                {"role": "user", "content": prompt}
+                {"role": "user", "content": content}
             ],
-            temperature=0.2,
+            temperature=self.temperature,
         )
+
+    def _record_usage(self, usage: Any) -> None:
+        if usage is None:
+            return
+        cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+        record_usage(self, Usage(
+            # Anthropic reports uncached input separately from cache reads/writes.
+            input_tokens=(usage.input_tokens or 0) + cache_read + cache_write,
+            output_tokens=usage.output_tokens or 0,
+            cached_input_tokens=cache_read,
+            cache_write_tokens=cache_write,
+        ))
+
+    @_traced("llm.complete")
+    @_scheduled()
+    def complete(self, prompt: str) -> str:
+        resp = self._client.messages.create(**self._request(prompt))
+        self._record_usage(resp.usage)
+        return resp.content[0].text if resp.content else ""
+
+    @_traced("llm.acomplete", kind="async")
+    @_scheduled(kind="async")
+    async def acomplete(self, prompt: str) -> str:
+        if self._aclient is None:
+            from anthropic import AsyncAnthropic  # type: ignore
+            self._aclient = AsyncAnthropic(api_key=self._api_key, max_retries=0)
+        resp = await self._aclient.messages.create(**self._request(prompt))
+        self._record_usage(resp.usage)
         return resp.content[0].text if resp.content else ""
 
+    @_traced("llm.stream", kind="stream")
+    @_scheduled(kind="stream")
+    def stream(self, prompt: str) -> Iterator[str]:
+        with self._client.messages.stream(**self._request(prompt)) as resp:
+            yield from resp.text_stream
+            self._record_usage(resp.get_final_message().usage)
+
 
 def make_client(provider: str, model: str, api_key: Optional[str]) -> LLMClient:
     """Factory function to create LLM clients based on provider."""
@@ -106,6 +463,13 @@ def make_client(provider: str, model: str, api_key: Optional[str]) -> LLMClient:
         return GeminiClient(model=model, api_key=api_key)
     if p in {"claude", "anthropic"}:
         return ClaudeClient(model=model, api_key=api_key)
+    if p in {"simulated", "sim"}:
+        from .offline import SimulatedClient
+        return SimulatedClient(model)
+    if p == "replay":
+        from .offline import ReplayClient
+        return ReplayClient(model)
     raise SystemExit(
-        f"Unsupported provider: {provider}. Try 'openai', 'gemini', or 'claude'."
+        f"Unsupported provider: {provider}. Try 'openai', 'gemini', 'claude', "
+        "'simulated' or 'replay'."
     )
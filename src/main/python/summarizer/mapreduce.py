@@ -0,0 +1,171 @@
+"""Map-reduce summarization for note windows that exceed the prompt budget.
+
+Instead of dropping context notes, the notes are split into budget-sized
+chunks that are summarized concurrently (map), and the partial summaries are
+then merged with REDUCE_TEMPLATE (reduce). If the partials themselves do not
+fit the budget they are merged in several rounds; a partial too large to
+share a reduce prompt is split at line boundaries first.
+"""
+
+import datetime as dt
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Sequence, Set
+
+from .llm_clients import LLMClient
+from .models import Note
+from .profiling import span
+from .prompts import build_prompt, build_reduce_prompt
+
+
+def chunk_notes(notes: Sequence[Note], max_chars: int) -> List[List[Note]]:
+    """Split notes, in chronological order, into groups of at most max_chars text.
+
+    A single note larger than the budget gets a chunk of its own.
+    """
+    chunks: List[List[Note]] = []
+    current: List[Note] = []
+    size = 0
+    for n in sorted(notes, key=lambda n: n.when):
+        if current and size + n.length > max_chars:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(n)
+        size += n.length
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def cited_ids(text: str, ids: Iterable[str]) -> Set[str]:
+    """Return the note IDs from `ids` that are cited somewhere in `text`."""
+    return {nid for nid in ids if nid in text}
+
+
+def split_summary(text: str, max_chars: int) -> List[str]:
+    """Split a summary at line boundaries into pieces of at most max_chars.
+
+    Raises SystemExit if a single line is longer than max_chars.
+    """
+    pieces: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in text.splitlines(keepends=True):
+        if len(line) > max_chars:
+            raise SystemExit(
+                f"A partial summary has a {len(line):,}-char line, over the "
+                f"{max_chars:,}-char reduce budget; raise --max-chars or --max-tokens."
+            )
+        if current and size + len(line) > max_chars:
+            pieces.append("".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line)
+    if current:
+        pieces.append("".join(current))
+    return pieces
+
+
+def _reduce(
+    partials: List[str],
+    client: LLMClient,
+    start: dt.date,
+    end: dt.date,
+    context_days: int,
+    max_chars: int,
+    pool: ThreadPoolExecutor,
+) -> str:
+    while True:
+        if len(partials) > 1 and any(len(p) > max_chars // 2 for p in partials):
+            # Halve oversized partials so that at least two share a prompt.
+            partials = [
+                piece for text in partials
+                for piece in (
+                    split_summary(text, max_chars // 2)
+                    if len(text) > max_chars // 2 else [text]
+                )
+            ]
+        # Group partials so each reduce prompt stays within the budget.
+        groups: List[List[str]] = [[]]
+        size = 0
+        for text in partials:
+            if groups[-1] and size + len(text) > max_chars:
+                groups.append([])
+                size = 0
+            groups[-1].append(text)
+            size += len(text)
+        if len(groups) == 1:
+            return client.complete(
+                build_reduce_prompt(partials, start, end, context_days)
+            )
+        before = sum(len(p) for p in partials)
+        partials = list(pool.map(
+            lambda g: client.complete(
+                build_reduce_prompt(g, start, end, context_days)
+            ),
+            groups,
+        ))
+        if sum(len(p) for p in partials) >= before:
+            raise SystemExit(
+                f"Merged summaries are not getting shorter ({before:,} chars) under "
+                f"the {max_chars:,}-char budget; raise --max-chars or --max-tokens."
+            )
+
+
+def reduce_summaries(
+    partials: Sequence[str],
+    client: LLMClient,
+    start: dt.date,
+    end: dt.date,
+    context_days: int,
+    max_chars: int,
+    fan_out: int = 4,
+) -> str:
+    """Merge summaries into one with REDUCE_TEMPLATE, in rounds if over max_chars."""
+    with ThreadPoolExecutor(max_workers=max(fan_out, 1)) as pool:
+        return _reduce(
+            list(partials), client, start, end, context_days, max_chars, pool
+        )
+
+
+def summarize_map_reduce(
+    notes: Sequence[Note],
+    client: LLMClient,
+    start: dt.date,
+    end: dt.date,
+    context_days: int,
+    max_chars: int,
+    fan_out: int = 4,
+) -> str:
+    """Summarize notes in budget-sized chunks concurrently, then merge the results."""
+    with span("mapreduce.chunk", notes=len(notes)) as stats:
+        chunks = chunk_notes(notes, max_chars)
+        stats["chunks"] = len(chunks)
+    if len(chunks) == 1:
+        return client.complete(build_prompt(chunks[0], start, end, context_days))
+
+    print(
+        f"Summarizing {len(notes)} notes in {len(chunks)} chunks "
+        f"(fan-out {fan_out})...",
+        file=sys.stderr,
+    )
+    with ThreadPoolExecutor(max_workers=max(fan_out, 1)) as pool:
+        partials = list(pool.map(
+            lambda chunk: client.complete(
+                build_prompt(chunk, start, end, context_days)
+            ),
+            chunks,
+        ))
+        merged = _reduce(
+            partials, client, start, end, context_days, max_chars, pool
+        )
+
+    ids = [n.id for n in notes]
+    lost = cited_ids("\n".join(partials), ids) - cited_ids(merged, ids)
+    if lost:
+        print(
+            f"Warning: {len(lost)} note ID(s) cited in partial summaries are "
+            "missing from the merged summary.",
+            file=sys.stderr,
+        )
+    return merged
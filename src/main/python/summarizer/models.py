@@ -2,12 +2,99 @@
 
 import dataclasses
 import datetime as dt
+from pathlib import Path
+from typing import Optional, Tuple
 
 
-@dataclasses.dataclass(frozen=True)
 class Note:
-    """A single transcript note extracted from a JSON file."""
-    id: str                 # filename (used as the reference ID)
-    when: dt.datetime       # parsed from the filename (local naive datetime)
-    text: str               # concatenated text from the JSON payload
-    in_range: bool          # True if inside the requested target window
+    """A single transcript note extracted from a JSON file.
+
+    Notes found through the catalog carry only metadata (path and text
+    length); the text is read from `path` on first access and kept. Budgeting
+    and selection work on `length`, so only the notes that end up in a prompt
+    are ever read. Treat notes as immutable and use `replace()` for changes.
+    """
+
+    __slots__ = ("id", "when", "in_range", "path", "length", "_text")
+
+    def __init__(
+        self,
+        id: str,                # filename (used as the reference ID)
+        when: dt.datetime,      # parsed from the filename (local naive datetime)
+        text: Optional[str] = None,     # concatenated text from the JSON payload
+        in_range: bool = False,         # True if inside the requested target window
+        path: Optional[Path] = None,    # where to read the text from, if not given
+        length: Optional[int] = None,   # len(text), known without reading it
+    ) -> None:
+        if text is None and (path is None or length is None):
+            raise ValueError("Note needs either text or both path and length")
+        self.id = id
+        self.when = when
+        self.in_range = in_range
+        self.path = path
+        self.length = len(text) if text is not None else length
+        self._text = text
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            from .file_ops import load_note
+
+            loaded = load_note(self.path)
+            self._text = loaded[1] if loaded else ""
+        return self._text
+
+    @property
+    def loaded(self) -> bool:
+        return self._text is not None
+
+    def cache_text(self, text: str) -> None:
+        """Store text read elsewhere (e.g. by a batched loader)."""
+        self._text = text
+
+    def replace(self, **changes: object) -> "Note":
+        """Return a copy with the given fields changed (like dataclasses.replace)."""
+        fields = {
+            "id": self.id, "when": self.when, "text": self._text,
+            "in_range": self.in_range, "path": self.path, "length": self.length,
+        }
+        if "text" in changes:
+            fields["length"] = None
+        fields.update(changes)
+        return Note(**fields)  # type: ignore[arg-type]
+
+    def _key(self) -> Tuple[object, ...]:
+        # Path-backed notes are identified by their file; others by their text.
+        text = self._text if self.path is None else None
+        return (self.id, self.when, self.in_range, self.path, self.length, text)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Note):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return (
+            f"Note(id={self.id!r}, when={self.when!r}, in_range={self.in_range!r}, "
+            f"length={self.length!r}, loaded={self.loaded!r})"
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class Usage:
+    """Token usage reported by a provider for one completion."""
+    input_tokens: int = 0           # prompt tokens, including cached ones
+    output_tokens: int = 0
+    cached_input_tokens: int = 0    # prompt tokens served from the provider's cache
+    cache_write_tokens: int = 0     # prompt tokens written to the cache (Claude)
+
+    def describe(self) -> str:
+        text = f"{self.input_tokens:,} in"
+        if self.cached_input_tokens:
+            text += f" ({self.cached_input_tokens:,} cached)"
+        if self.cache_write_tokens:
+            text += f" ({self.cache_write_tokens:,} written to cache)"
+        return f"{text}, {self.output_tokens:,} out"
@@ -0,0 +1,324 @@
+"""Offline providers for measuring and regression-testing without a network.
+
+`--provider simulated` answers with plausible Markdown summaries after a
+log-normally distributed delay, and can inject timeouts and 429s. Its
+settings are given as the model, comma-separated:
+
+  --provider simulated --model "median=1.5,sigma=0.6,rate_limit_rate=0.05,seed=7"
+
+`--record FIXTURE` appends every live request/response pair (prompt hash,
+response, latency, stream timing and token usage) to a JSONL fixture, and
+`--provider replay --model FIXTURE` plays them back deterministically with
+the recorded timing (`--model FIXTURE,speed=0` replays instantly).
+"""
+
+import asyncio
+import datetime as dt
+import hashlib
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .llm_clients import (
+    LLMClient,
+    _scheduled,
+    _traced,
+    acomplete,
+    call_usage,
+    record_usage,
+    stream_completion,
+)
+from .models import Usage
+
+
+NOTE_ID_LINE = re.compile(r"^# ID: (.+?)  \[", re.MULTILINE)
+TITLE_LINE = re.compile(r"^Title line: (.+)$", re.MULTILINE)
+FORMAT_TITLE = re.compile(r"^-{8,}\n(#.+)$", re.MULTILINE)   # OUTPUT_FORMAT's title line
+ORIGINAL_SUMMARY = re.compile(r"ORIGINAL SUMMARY:\n(.*?)\n\nUSER FEEDBACK:", re.DOTALL)
+
+
+def parse_spec(spec: str) -> Tuple[str, Dict[str, str]]:
+    """Split 'NAME,key=value,...' into the name and its options."""
+    name, options = "", {}
+    for part in spec.split(","):
+        key, sep, value = part.partition("=")
+        if sep:
+            options[key.strip()] = value.strip()
+        elif part.strip():
+            name = part.strip()
+    return name, options
+
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def _usage_dict(usage: Optional[Usage]) -> Optional[Dict[str, int]]:
+    if usage is None:
+        return None
+    return {
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "cached_input_tokens": usage.cached_input_tokens,
+        "cache_write_tokens": usage.cache_write_tokens,
+    }
+
+
+class SimulatedRateLimit(RuntimeError):
+    """A fake HTTP 429, shaped like the SDKs' errors so the scheduler honours it."""
+
+    status_code = 429
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"simulated 429 (retry after {retry_after:g}s)")
+        self.response = type("Response", (), {"headers": {"retry-after": f"{retry_after:g}"}})()
+
+
+class SimulatedClient:
+    """Markdown summaries citing the prompt's note IDs, with simulated latency.
+
+    Options: median (seconds, default 1.0) and sigma (log-normal spread,
+    default 0.5) of the latency; timeout_rate and timeout (seconds before a
+    TimeoutError, default 30); rate_limit_rate and retry_after (seconds,
+    default 1); seed.
+    """
+
+    def __init__(self, spec: str = "") -> None:
+        _, options = parse_spec(spec)
+        try:
+            self.median = float(options.pop("median", 1.0))
+            self.sigma = float(options.pop("sigma", 0.5))
+            self.timeout_rate = float(options.pop("timeout_rate", 0.0))
+            self.timeout = float(options.pop("timeout", 30.0))
+            self.rate_limit_rate = float(options.pop("rate_limit_rate", 0.0))
+            self.retry_after = float(options.pop("retry_after", 1.0))
+            seed = options.pop("seed", None)
+        except ValueError as e:
+            raise SystemExit(f"Invalid simulated provider option in {spec!r}: {e}")
+        if options:
+            raise SystemExit(f"Unknown simulated provider option(s): {', '.join(options)}")
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.provider = "simulated"
+        self.model = spec or "default"
+        self.temperature: Optional[float] = None
+        self.system_prompt: Optional[str] = None
+        self.last_usage: Optional[Usage] = None
+
+    def _draw(self) -> Tuple[str, float]:
+        """What happens to the next request ("ok", "timeout" or "429") and when."""
+        with self._lock:
+            roll = self._rng.random()
+            latency = self.median * math.exp(self._rng.gauss(0.0, self.sigma))
+        if roll < self.timeout_rate:
+            return "timeout", self.timeout
+        if roll < self.timeout_rate + self.rate_limit_rate:
+            return "429", min(latency, 0.05)
+        return "ok", latency
+
+    def _fail(self, outcome: str) -> None:
+        if outcome == "timeout":
+            raise TimeoutError(f"simulated timeout after {self.timeout:g}s")
+        if outcome == "429":
+            raise SimulatedRateLimit(self.retry_after)
+
+    def _respond(self, prompt: str) -> str:
+        text = simulated_response(prompt)
+        record_usage(self, Usage(input_tokens=len(prompt) // 4, output_tokens=len(text) // 4))
+        return text
+
+    @_traced("llm.complete")
+    @_scheduled()
+    def complete(self, prompt: str) -> str:
+        outcome, delay = self._draw()
+        time.sleep(delay)
+        self._fail(outcome)
+        return self._respond(prompt)
+
+    @_traced("llm.acomplete", kind="async")
+    @_scheduled(kind="async")
+    async def acomplete(self, prompt: str) -> str:
+        outcome, delay = self._draw()
+        await asyncio.sleep(delay)
+        self._fail(outcome)
+        return self._respond(prompt)
+
+    @_traced("llm.stream", kind="stream")
+    @_scheduled(kind="stream")
+    def stream(self, prompt: str) -> Iterator[str]:
+        outcome, delay = self._draw()
+        # About a fifth of the latency is time to first token.
+        time.sleep(delay / 5 if outcome == "ok" else delay)
+        self._fail(outcome)
+        lines = self._respond(prompt).splitlines(keepends=True)
+        for line in lines:
+            time.sleep(delay * 4 / 5 / len(lines))
+            yield line
+
+
+def simulated_response(prompt: str) -> str:
+    """A reply in the shape the prompt asks for."""
+    if "Reply with ONLY a JSON object" in prompt:
+        return json.dumps({"edits": [{"op": "blurb", "text": "Revised per the feedback."}]})
+    original = ORIGINAL_SUMMARY.search(prompt)
+    if original:
+        return original.group(1).strip() + "\n"
+    ids = NOTE_ID_LINE.findall(prompt)
+    if not ids:
+        from .edits import note_ids
+
+        ids = sorted(note_ids(prompt))
+    title = TITLE_LINE.search(prompt) or FORMAT_TITLE.search(prompt)
+    title_line = title.group(1).strip() if title else "## Summary"
+    done = [f"- Made progress on item {i + 1} ({nid})" for i, nid in enumerate(ids[:8])]
+    todo = [f"- Follow up on item {i + 1} ({nid})" for i, nid in enumerate(ids[8:12], 8)]
+    return (
+        f"{title_line}\nProgress across {len(ids)} note(s).\n\n"
+        "### Tasks Completed\n" + ("\n".join(done) or "- None") + "\n\n"
+        "### Remaining Action Items\n" + ("\n".join(todo) or "- None") + "\n"
+    )
+
+
+class RecordingClient:
+    """Pass requests to `client` and append each exchange to a JSONL fixture."""
+
+    def __init__(self, client: LLMClient, fixture: Path) -> None:
+        self._client = client
+        self.fixture = fixture
+        self._lock = threading.Lock()
+        self.provider = getattr(client, "provider", type(client).__name__)
+        self.model = getattr(client, "model", None)
+        self.temperature = getattr(client, "temperature", None)
+        self.system_prompt = getattr(client, "system_prompt", None)
+        self.last_usage: Optional[Usage] = None
+        self.recorded = 0
+
+    def _append(self, prompt: str, response: str, seconds: float,
+                chunks: Optional[List[Tuple[float, str]]] = None) -> None:
+        usage = call_usage()
+        record_usage(self, usage)
+        record: Dict[str, Any] = {
+            "prompt_sha256": prompt_key(prompt),
+            "provider": self.provider,
+            "model": self.model,
+            "prompt_chars": len(prompt),
+            "response": response,
+            "seconds": round(seconds, 4),
+            "usage": _usage_dict(usage),
+            "recorded": dt.datetime.now().isoformat(timespec="seconds"),
+        }
+        if chunks is not None:
+            record["chunks"] = [[round(t, 4), c] for t, c in chunks]
+        with self._lock:
+            self.fixture.parent.mkdir(parents=True, exist_ok=True)
+            with self.fixture.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.recorded += 1
+
+    def complete(self, prompt: str) -> str:
+        t0 = time.perf_counter()
+        response = self._client.complete(prompt)
+        self._append(prompt, response, time.perf_counter() - t0)
+        return response
+
+    async def acomplete(self, prompt: str) -> str:
+        t0 = time.perf_counter()
+        response = await acomplete(self._client, prompt)
+        self._append(prompt, response, time.perf_counter() - t0)
+        return response
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        t0 = time.perf_counter()
+        chunks: List[Tuple[float, str]] = []
+        for chunk in stream_completion(self._client, prompt):
+            chunks.append((time.perf_counter() - t0, chunk))
+            yield chunk
+        self._append(prompt, "".join(c for _, c in chunks), time.perf_counter() - t0, chunks)
+
+    def report(self) -> None:
+        print(f"Recorded {self.recorded} exchange(s) to {self.fixture}", file=sys.stderr)
+        if hasattr(self._client, "report"):
+            self._client.report()
+
+
+class ReplayClient:
+    """Answer from a fixture written by --record, with the recorded timing.
+
+    Requests are matched by prompt hash. A prompt recorded several times gets
+    its recordings in order, wrapping around. `speed` scales the delays
+    (2 = twice as fast, 0 = no delay).
+    """
+
+    def __init__(self, spec: str) -> None:
+        name, options = parse_spec(spec)
+        if not name:
+            raise SystemExit("--provider replay needs the fixture file as --model")
+        self.fixture = Path(name).expanduser()
+        try:
+            self.speed = float(options.get("speed", 1.0))
+            lines = self.fixture.read_text(encoding="utf-8").splitlines()
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"Cannot load replay fixture {spec!r}: {e}")
+        self._records: Dict[str, List[Dict[str, Any]]] = {}
+        for line in lines:
+            if line.strip():
+                record = json.loads(line)
+                self._records.setdefault(record["prompt_sha256"], []).append(record)
+        self._next: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.provider = "replay"
+        self.model = spec
+        self.temperature: Optional[float] = None
+        self.system_prompt: Optional[str] = None
+        self.last_usage: Optional[Usage] = None
+
+    def _record(self, prompt: str) -> Dict[str, Any]:
+        key = prompt_key(prompt)
+        records = self._records.get(key)
+        if not records:
+            raise RuntimeError(
+                f"No recording in {self.fixture} for this prompt (sha256 {key[:12]}); "
+                "record it with --record"
+            )
+        with self._lock:
+            i = self._next.get(key, 0)
+            self._next[key] = i + 1
+        return records[i % len(records)]
+
+    def _respond(self, record: Dict[str, Any]) -> str:
+        """The recorded response; its usage is reported when it arrives."""
+        usage = record.get("usage")
+        record_usage(self, Usage(**usage) if usage else None)
+        return record["response"]
+
+    def _delay(self, seconds: float) -> float:
+        return seconds / self.speed if self.speed > 0 else 0.0
+
+    @_traced("llm.complete")
+    def complete(self, prompt: str) -> str:
+        record = self._record(prompt)
+        time.sleep(self._delay(record["seconds"]))
+        return self._respond(record)
+
+    @_traced("llm.acomplete", kind="async")
+    async def acomplete(self, prompt: str) -> str:
+        record = self._record(prompt)
+        await asyncio.sleep(self._delay(record["seconds"]))
+        return self._respond(record)
+
+    @_traced("llm.stream", kind="stream")
+    def stream(self, prompt: str) -> Iterator[str]:
+        record = self._record(prompt)
+        chunks = record.get("chunks") or [[record["seconds"], record["response"]]]
+        elapsed = 0.0
+        for offset, text in chunks:
+            time.sleep(self._delay(max(0.0, offset - elapsed)))
+            elapsed = offset
+            yield text
+        self._respond(record)
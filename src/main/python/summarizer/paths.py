@@ -0,0 +1,28 @@
+"""Default on-disk locations, kept import-light for fast CLI startup."""
+
+import os
+from pathlib import Path
+
+
+DEFAULT_CACHE_ROOT = (
+    Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "summarizer"
+)
+DEFAULT_RESPONSE_CACHE_DIR = DEFAULT_CACHE_ROOT / "responses"
+DEFAULT_LATENCY_FILE = DEFAULT_CACHE_ROOT / "latency.json"
+
+DEFAULT_CONFIG_ROOT = (
+    Path(os.getenv("XDG_CONFIG_HOME") or Path.home() / ".config") / "summarizer"
+)
+DEFAULT_RATE_LIMITS_FILE = DEFAULT_CONFIG_ROOT / "rate_limits.toml"
+
+DEFAULT_DATA_ROOT = (
+    Path(os.getenv("XDG_DATA_HOME") or Path.home() / ".local" / "share") / "summarizer"
+)
+DEFAULT_LEDGER_FILE = DEFAULT_DATA_ROOT / "ledger.jsonl"
+
+# The `summarizer serve` socket and TCP tokens: per-user runtime state.
+DEFAULT_RUNTIME_ROOT = (
+    Path(os.environ["XDG_RUNTIME_DIR"]) / "summarizer"
+    if os.getenv("XDG_RUNTIME_DIR") else DEFAULT_CACHE_ROOT
+)
+DEFAULT_SERVER_SOCKET = DEFAULT_RUNTIME_ROOT / "server.sock"
@@ -0,0 +1,107 @@
+"""Lightweight per-stage timing for the summarizer pipeline.
+
+Stages wrap themselves in `span(name)`; the yielded dict collects counts
+(files scanned, bytes read, prompt chars, token usage, ...). Recording is off
+unless the CLI enables it with --profile or --trace-out, in which case the
+spans are summarized as a table and/or written as a Chrome trace
+(chrome://tracing, Perfetto).
+"""
+
+import contextlib
+import dataclasses
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, TextIO
+
+
+@dataclasses.dataclass
+class Span:
+    name: str
+    start: float            # perf_counter() seconds
+    duration: float         # seconds
+    thread: int
+    counts: Dict[str, object]
+
+
+class Profiler:
+    """Collects spans; disabled (and nearly free) by default."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.spans: List[Span] = []
+        self._origin = time.perf_counter()
+
+    def enable(self) -> None:
+        self.enabled = True
+        self.spans.clear()
+        self._origin = time.perf_counter()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **counts: object) -> Iterator[Dict[str, object]]:
+        if not self.enabled:
+            yield counts
+            return
+        start = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            self.spans.append(Span(
+                name, start, time.perf_counter() - start,
+                threading.get_ident(), counts,
+            ))
+
+    def print_table(self, file: TextIO) -> None:
+        """Print total time, call count and summed counts per stage."""
+        if not self.spans:
+            return
+        wall = max(s.start + s.duration for s in self.spans) - self._origin
+        rows: Dict[str, List[object]] = {}
+        for s in self.spans:
+            row = rows.setdefault(s.name, [0, 0.0, {}])
+            row[0] += 1
+            row[1] += s.duration
+            for k, v in s.counts.items():
+                if isinstance(v, (int, float)) and not isinstance(v, bool):
+                    row[2][k] = row[2].get(k, 0) + v
+        print(f"\n{'stage':<22}{'calls':>6}{'ms':>11}{'%':>7}  counts", file=file)
+        for name, (calls, total, counts) in sorted(
+            rows.items(), key=lambda kv: -kv[1][1]
+        ):
+            detail = ", ".join(
+                f"{k}={v:,}" if isinstance(v, int) else f"{k}={v:,.3f}"
+                for k, v in counts.items()
+            )
+            print(
+                f"{name:<22}{calls:>6}{total * 1000:>11.1f}"
+                f"{100 * total / wall if wall else 0:>7.1f}  {detail}",
+                file=file,
+            )
+        print(f"{'wall':<22}{'':>6}{wall * 1000:>11.1f}", file=file)
+
+    def write_trace(self, path: Path) -> None:
+        """Write spans in Chrome trace-event JSON format."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": s.name,
+                "cat": s.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": (s.start - self._origin) * 1e6,
+                "dur": s.duration * 1e6,
+                "pid": pid,
+                "tid": s.thread,
+                "args": {k: v for k, v in s.counts.items()},
+            }
+            for s in self.spans
+        ]
+        path.write_text(
+            json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, default=str),
+            encoding="utf-8",
+        )
+
+
+PROFILER = Profiler()
+span = PROFILER.span
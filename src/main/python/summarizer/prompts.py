@@ -1,16 +1,13 @@
 """Prompt construction for LLM summarization."""
 
 import datetime as dt
-from typing import Sequence
+from typing import Sequence, Tuple
 
 from .models import Note
+from .profiling import span
 
 
-SUMMARY_TEMPLATE = """
-You are summarizing transcripts for a knowledge worker.
-
-Summarize the TARGET WINDOW first, but use CONTEXT notes to stitch multi-day efforts.
-
+OUTPUT_FORMAT = """
 STRICTLY FOLLOW THIS MARKDOWN FORMAT (no preamble, no extra headings):
 --------------------------------
 {title_line}
@@ -27,6 +24,23 @@ STRICTLY FOLLOW THIS MARKDOWN FORMAT (no preamble, no extra headings):
 - ...
 
 --------------------------------
+""".strip()
+
+
+# SUMMARY_TEMPLATE is split around CACHE_BREAK so that everything before it
+# (instructions, then CONTEXT notes oldest-first) stays byte-identical across
+# reruns and refinements of the same window, and providers can cache it as a
+# prompt prefix. The volatile title, dates and IN-RANGE notes come last.
+CACHE_BREAK = "==== TARGET WINDOW ===="
+
+TITLE_PLACEHOLDER = "<the exact title line given in the TARGET WINDOW section>"
+
+SUMMARY_PREFIX_TEMPLATE = ("""
+You are summarizing transcripts for a knowledge worker.
+
+Summarize the TARGET WINDOW first, but use CONTEXT notes to stitch multi-day efforts.
+
+""" + OUTPUT_FORMAT + """
 Rules:
 - You should try to capture all tasks discussed in the notes, but don't
   overinflate the summary with too many tiny tasks.
@@ -42,35 +56,121 @@ Rules:
 - Use the exact note IDs shown below (filenames). Do not fabricate IDs.
 - Only include items that appear in the notes.
 
+CONTEXT NOTES (oldest first, each starts with an ID line):
+{context_block}
+""").strip()
+
+
+SUMMARY_SUFFIX_TEMPLATE = """
 TARGET WINDOW: {target_start} to {target_end} (inclusive)
 CONTEXT WINDOW: {context_start} to {target_end} (inclusive)
+Title line: {title_line}
 
-NOTES (each starts with an ID line):
-{notes_block}
+TARGET WINDOW NOTES (each starts with an ID line):
+{target_block}
 """.strip()
 
+SUMMARY_TEMPLATE = (
+    SUMMARY_PREFIX_TEMPLATE + "\n\n" + CACHE_BREAK + "\n" + SUMMARY_SUFFIX_TEMPLATE
+)
+
+
+def note_header(n: Note) -> str:
+    """The ID line that precedes a note's text in build_notes_block."""
+    flag = "[IN-RANGE]" if n.in_range else "[CONTEXT]"
+    return f"\n# ID: {n.id}  {flag}  {n.when.isoformat(sep=' ')}\n"
+
 
 def build_notes_block(notes: Sequence[Note]) -> str:
     """Render notes as compact blocks the LLM can cite back by filename."""
-    lines: list[str] = []
-    for n in notes:
-        flag = "[IN-RANGE]" if n.in_range else "[CONTEXT]"
-        lines.append(f"\n# ID: {n.id}  {flag}  {n.when.isoformat(sep=' ')}\n{n.text}\n")
-    return "\n".join(lines)
+    return "\n".join(f"{note_header(n)}{n.text}\n" for n in notes)
+
+
+def build_prompt_parts(
+    notes: Sequence[Note], start: dt.date, end: dt.date, context_days: int
+) -> Tuple[str, str]:
+    """Build the (stable prefix, volatile suffix) halves of the summary prompt."""
+    context = sorted((n for n in notes if not n.in_range), key=lambda n: n.when)
+    target = [n for n in notes if n.in_range]
+    context_start = start - dt.timedelta(days=context_days)
+    prefix = SUMMARY_PREFIX_TEMPLATE.format(
+        title_line=TITLE_PLACEHOLDER,
+        context_block=build_notes_block(context) if context else "(none)",
+    )
+    suffix = SUMMARY_SUFFIX_TEMPLATE.format(
+        title_line=_title_line(start, end),
+        target_start=start.isoformat(),
+        target_end=end.isoformat(),
+        context_start=context_start.isoformat(),
+        target_block=build_notes_block(target) if target else "(none)",
+    )
+    return prefix, suffix
 
 
 def build_prompt(notes: Sequence[Note], start: dt.date, end: dt.date, context_days: int) -> str:
     """Build the complete prompt for LLM summarization."""
-    title_line = (
+    with span("prompt.build", notes=len(notes)) as stats:
+        prefix, suffix = build_prompt_parts(notes, start, end, context_days)
+        prompt = f"{prefix}\n\n{CACHE_BREAK}\n{suffix}"
+        stats.update(prompt_chars=len(prompt), prefix_chars=len(prefix))
+    return prompt
+
+
+def split_cacheable(prompt: str) -> Tuple[str, str]:
+    """Split a prompt at CACHE_BREAK into (prefix, rest); prefix is '' if absent."""
+    marker = f"\n\n{CACHE_BREAK}\n"
+    i = prompt.find(marker)
+    if i < 0:
+        return "", prompt
+    return prompt[:i], prompt[i + len(marker):]
+
+
+REDUCE_TEMPLATE = ("""
+You are merging partial summaries of transcripts for a knowledge worker. Each
+partial summary covers a different slice of the notes from the same windows;
+together they cover all of the notes.
+
+""" + OUTPUT_FORMAT + """
+Rules:
+- Group by TASK. If several partial summaries mention the same task, output
+  ONE bullet and cite the union of their note IDs.
+- Copy note IDs exactly as they appear in the partial summaries. Do not drop,
+  shorten or fabricate IDs.
+- Consider a task *completed* if ANY partial summary lists it as completed;
+  in that case do not also list it under Remaining Action Items.
+- Focus on the TARGET WINDOW; only keep context-only items when they explain
+  work in the target window.
+- Keep the top blurb short (2-3 sentences) and bullets concise.
+
+TARGET WINDOW: {target_start} to {target_end} (inclusive)
+CONTEXT WINDOW: {context_start} to {target_end} (inclusive)
+
+PARTIAL SUMMARIES:
+{partials_block}
+""").strip()
+
+
+def _title_line(start: dt.date, end: dt.date) -> str:
+    return (
         f"## Daily Summary {start.isoformat()}"
         if start == end
         else f"## Multi-Day Summary {start.isoformat()} → {end.isoformat()}"
     )
+
+
+def build_reduce_prompt(
+    partials: Sequence[str], start: dt.date, end: dt.date, context_days: int
+) -> str:
+    """Build the prompt that merges partial summaries into one report."""
     context_start = start - dt.timedelta(days=context_days)
-    return SUMMARY_TEMPLATE.format(
-        title_line=title_line,
+    partials_block = "\n\n".join(
+        f"# PARTIAL SUMMARY {i}\n{text.strip()}"
+        for i, text in enumerate(partials, 1)
+    )
+    return REDUCE_TEMPLATE.format(
+        title_line=_title_line(start, end),
         target_start=start.isoformat(),
         target_end=end.isoformat(),
         context_start=context_start.isoformat(),
-        notes_block=build_notes_block(notes),
+        partials_block=partials_block,
     )
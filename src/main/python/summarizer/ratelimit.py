@@ -0,0 +1,364 @@
+"""Client-side rate limiting for provider calls.
+
+Each provider/model gets a `Limiter` with token buckets for requests and
+estimated tokens per minute, configured from a TOML file:
+
+  [openai]                 # provider-wide defaults
+  rpm = 500
+  tpm = 200000
+
+  [openai."gpt-4o"]        # per-model overrides
+  rpm = 100
+  max_retries = 5
+
+Callers reserve capacity before each request and sleep until it is theirs.
+Buckets may go into debt, so reservations are granted in arrival order
+(FIFO across threads and tasks) and a request larger than a bucket's burst
+still goes through once the debt ahead of it is repaid. The token estimate
+is settled against the usage the provider reports.
+
+A 429 response blocks the limiter for as long as its `Retry-After`,
+`retry-after-ms` or rate-limit reset headers say (OpenAI's
+`x-ratelimit-reset-*`, Anthropic's `anthropic-ratelimit-*-reset`), or for an
+exponential backoff without them, and the request is retried up to
+`max_retries` times. Other transient failures (408, 409, 5xx and connection
+errors) back off just that request. The provider SDKs are built with their
+own retries turned off, so every retry goes through here. Without a config
+file nothing is throttled up front, but failures are still retried.
+"""
+
+import asyncio
+import datetime as dt
+import email.utils
+import math
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from .budget import CHARS_PER_TOKEN, DEFAULT_CHARS_PER_TOKEN, PROVIDER_ALIASES
+from .models import Usage
+
+
+DEFAULT_MAX_RETRIES = 3
+OUTPUT_TOKENS_ESTIMATE = 1000   # reserved per request until usage is known
+BURST_SECONDS = 1.0             # bucket capacity, in seconds of the rate
+BACKOFF = 1.0                   # first wait after a failure with no headers, doubled per retry
+MAX_WAIT = 300.0
+
+DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class Bucket:
+    """A token bucket refilled at `per_minute / 60` per second."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * BURST_SECONDS, 1.0)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` and return how long to wait for the debt ahead to clear."""
+        self._refill(now)
+        wait = max(0.0, -self.level / self.rate)
+        self.level -= amount
+        return wait
+
+    def adjust(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level - amount)
+
+
+class Limiter:
+    """Request and token buckets, and 429 handling, for one provider/model."""
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
+        self.provider = provider
+        self.model = model
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+        self.chars_per_token = CHARS_PER_TOKEN.get(
+            PROVIDER_ALIASES.get(provider, provider), DEFAULT_CHARS_PER_TOKEN
+        )
+        self.configure(rpm, tpm, max_retries)
+        self.waited = 0.0
+        self.rate_limited = 0
+
+    def configure(
+        self, rpm: Optional[float], tpm: Optional[float], max_retries: int
+    ) -> None:
+        with self._lock:
+            self.requests = Bucket(rpm) if rpm else None
+            self.tokens = Bucket(tpm) if tpm else None
+            self.max_retries = max_retries
+
+    def estimate(self, prompt: str) -> int:
+        return math.ceil(len(prompt) / self.chars_per_token) + OUTPUT_TOKENS_ESTIMATE
+
+    def reserve(self, tokens: int) -> float:
+        """Reserve one request and `tokens`; returns the seconds to wait first."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._blocked_until - now)
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.reserve(tokens, now))
+            self.waited += wait
+            return wait
+
+    def blocked_for(self) -> float:
+        with self._lock:
+            return max(0.0, self._blocked_until - time.monotonic())
+
+    def settle(self, estimated: int, usage: Optional[Usage]) -> None:
+        """Correct the token bucket once the request's real usage is known."""
+        if usage is None or self.tokens is None:
+            return
+        with self._lock:
+            self.tokens.adjust(usage.input_tokens + usage.output_tokens - estimated)
+
+    def on_error(self, error: BaseException, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying after `error`, or None to give up.
+
+        A rate-limit error blocks the whole limiter instead, so it returns 0.
+        """
+        if attempt >= self.max_retries or not is_transient(error):
+            return None
+        wait = retry_after(error_headers(error))
+        if wait is None:
+            wait = BACKOFF * 2 ** attempt
+        wait = min(wait, MAX_WAIT)
+        if not is_rate_limit(error):
+            return wait
+        with self._lock:
+            self.rate_limited += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + wait)
+        return 0.0
+
+    def call(self, fn: Callable[[str], str], prompt: str, usage: Callable[[], Optional[Usage]]) -> str:
+        """Run `fn(prompt)` when capacity allows, retrying transient errors.
+
+        Capacity is reserved once; retries only wait out blocks and backoff.
+        """
+        tokens = self.estimate(prompt)
+        time.sleep(self.reserve(tokens))
+        for attempt in range(self.max_retries + 1):
+            while self.blocked_for() > 0:
+                time.sleep(self.blocked_for())
+            try:
+                result = fn(prompt)
+            except Exception as e:
+                delay = self.on_error(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self.settle(tokens, usage())
+            return result
+        raise AssertionError("unreachable")
+
+    async def acall(
+        self, fn: Callable[[str], Awaitable[str]], prompt: str,
+        usage: Callable[[], Optional[Usage]],
+    ) -> str:
+        tokens = self.estimate(prompt)
+        await asyncio.sleep(self.reserve(tokens))
+        for attempt in range(self.max_retries + 1):
+            while self.blocked_for() > 0:
+                await asyncio.sleep(self.blocked_for())
+            try:
+                result = await fn(prompt)
+            except Exception as e:
+                delay = self.on_error(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self.settle(tokens, usage())
+            return result
+        raise AssertionError("unreachable")
+
+    def stream(
+        self, fn: Callable[[str], Iterator[str]], prompt: str,
+        usage: Callable[[], Optional[Usage]],
+    ) -> Iterator[str]:
+        """Like call(), for a stream; it is only retried before its first chunk."""
+        tokens = self.estimate(prompt)
+        time.sleep(self.reserve(tokens))
+        for attempt in range(self.max_retries + 1):
+            while self.blocked_for() > 0:
+                time.sleep(self.blocked_for())
+            started = False
+            try:
+                for chunk in fn(prompt):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                delay = None if started else self.on_error(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self.settle(tokens, usage())
+            return
+
+
+class Scheduler:
+    """The limiters of every provider/model in the process, sharing one config."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._limiters: Dict[Tuple[str, str], Limiter] = {}
+        self._config: Dict[str, Any] = {}
+        self.config_path: Optional[Path] = None
+
+    def configure(self, path: Optional[Path]) -> None:
+        """Load limits from a TOML file; a missing default file means no limits."""
+        config: Dict[str, Any] = {}
+        if path is not None and path.exists():
+            import tomllib
+
+            try:
+                config = tomllib.loads(path.read_text(encoding="utf-8"))
+            except (OSError, tomllib.TOMLDecodeError) as e:
+                raise SystemExit(f"Invalid rate limit config {path}: {e}")
+        config = {PROVIDER_ALIASES.get(k.lower(), k.lower()): v for k, v in config.items()}
+        with self._lock:
+            if config == self._config:
+                return
+            self._config = config
+            self.config_path = path
+            for (provider, model), limiter in self._limiters.items():
+                limiter.configure(*self._settings(provider, model))
+
+    def _settings(self, provider: str, model: str) -> Tuple[Optional[float], Optional[float], int]:
+        table = self._config.get(provider, {})
+        merged = {k: v for k, v in table.items() if not isinstance(v, dict)}
+        merged.update(table.get(model, {}))
+        return (
+            merged.get("rpm"),
+            merged.get("tpm"),
+            int(merged.get("max_retries", DEFAULT_MAX_RETRIES)),
+        )
+
+    def report(self) -> None:
+        with self._lock:
+            limiters = list(self._limiters.values())
+        for lim in limiters:
+            if lim.waited >= 0.05 or lim.rate_limited:
+                print(
+                    f"Rate limits: {lim.provider}/{lim.model} waited {lim.waited:.1f}s, "
+                    f"{lim.rate_limited} rate-limited response(s)",
+                    file=sys.stderr,
+                )
+
+    def limiter(self, provider: str, model: str) -> Limiter:
+        provider = PROVIDER_ALIASES.get(provider.lower(), provider.lower())
+        with self._lock:
+            key = (provider, model)
+            if key not in self._limiters:
+                self._limiters[key] = Limiter(provider, model, *self._settings(provider, model))
+            return self._limiters[key]
+
+
+def _status(error: BaseException) -> Optional[int]:
+    """The HTTP status of an error from the provider SDKs (or urllib), if any."""
+    for attr in ("status_code", "status", "code"):
+        value = getattr(error, attr, None)
+        try:
+            if value is not None:
+                return int(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def is_rate_limit(error: BaseException) -> bool:
+    """True for HTTP 429 errors from the provider SDKs (or urllib)."""
+    return _status(error) == 429
+
+
+def is_transient(error: BaseException) -> bool:
+    """True for the failures the SDKs would have retried themselves: 408,
+    409, 429, 5xx, and their connection and timeout errors."""
+    status = _status(error)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    return any(cls.__name__ == "APIConnectionError" for cls in type(error).__mro__)
+
+
+def error_headers(error: BaseException) -> Any:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    return headers if headers is not None else getattr(error, "headers", None)
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Seconds in an OpenAI-style reset duration such as '1m30s' or '20ms'."""
+    parts = DURATION.findall(value.strip())
+    if not parts or "".join(n + u for n, u in parts) != value.strip():
+        return None
+    return sum(float(n) * UNIT_SECONDS[u] for n, u in parts)
+
+
+def _seconds_until(value: str) -> Optional[float]:
+    """Seconds until an HTTP date or an RFC 3339 timestamp."""
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            when = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=dt.timezone.utc)
+    return max(0.0, (when - dt.datetime.now(dt.timezone.utc)).total_seconds())
+
+
+def retry_after(headers: Any) -> Optional[float]:
+    """How long the provider asked us to wait, from a 429's headers."""
+    if headers is None:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            seconds = _seconds_until(value)
+            if seconds is not None:
+                return seconds
+    # Reset times of the exhausted limits.
+    waits = []
+    for kind in ("requests", "tokens", "input-tokens", "output-tokens"):
+        for remaining, reset, parse in (
+            (f"x-ratelimit-remaining-{kind}", f"x-ratelimit-reset-{kind}", parse_duration),
+            (f"anthropic-ratelimit-{kind}-remaining", f"anthropic-ratelimit-{kind}-reset",
+             _seconds_until),
+        ):
+            left, when = headers.get(remaining), headers.get(reset)
+            if when and left is not None and left.strip() == "0":
+                seconds = parse(when)
+                if seconds is not None:
+                    waits.append(seconds)
+    return max(waits) if waits else None
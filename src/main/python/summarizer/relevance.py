@@ -0,0 +1,285 @@
+"""Relevance-ranked context selection with a persistent BM25 index.
+
+The inverted index lives next to the note catalog, in the same SQLite file:
+one row per (term, note) with the term's frequency, plus each note's length
+in terms and each term's document frequency. It is brought up to date
+incrementally from the catalog, so only new or changed transcripts are
+tokenized, and nothing is read at all while the catalog's generation is
+unchanged.
+
+To pick context for a window, the most distinctive terms of the IN-RANGE
+notes form the query, and earlier notes are ranked by their BM25 score
+against it. Terms found in most notes carry almost no weight and are left
+out of the query, so only a few short posting lists are read and a query
+over a multi-year archive stays in the low milliseconds.
+"""
+
+import datetime as dt
+import math
+import re
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .catalog import NoteCatalog
+from .file_ops import load_notes
+from .models import Note
+from .profiling import span
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bm25_docs (
+    id       INTEGER PRIMARY KEY,
+    name     TEXT NOT NULL UNIQUE,
+    ts       TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    length   INTEGER NOT NULL    -- number of indexed terms
+);
+CREATE INDEX IF NOT EXISTS bm25_docs_ts ON bm25_docs (ts);
+CREATE TABLE IF NOT EXISTS bm25_postings (
+    term TEXT NOT NULL,
+    doc  INTEGER NOT NULL,
+    tf   INTEGER NOT NULL,
+    PRIMARY KEY (term, doc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS bm25_postings_doc ON bm25_postings (doc);
+CREATE TABLE IF NOT EXISTS bm25_terms (
+    term TEXT PRIMARY KEY,
+    df   INTEGER NOT NULL        -- number of notes containing the term
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS bm25_meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+K1 = 1.2
+B = 0.75
+QUERY_TERMS = 32
+MAX_DF_RATIO = 0.5      # terms in more than half the notes are left out of queries
+MAX_SQL_VARIABLES = 500  # terms looked up per statement, well under SQLite's limit
+
+_WORD = re.compile(r"[a-z0-9']{3,}")
+STOPWORDS = frozenset("""
+about after again also and any are back because been before being but can
+could did does doing don't done down each even for from get getting going
+gonna got had has have having her here him his how i'm into it's its just
+know let like look make more most much need not now off okay one only other
+our out over really right said say see she should some still that that's
+the their them then there these they thing things think this those through
+too two under up very want was way we're well were what when where which
+while who why will with would yeah yes you your
+""".split())
+
+
+def terms(text: str) -> List[str]:
+    """Lowercased words of three or more characters, without stopwords."""
+    return [w for w in _WORD.findall(text.lower()) if w not in STOPWORDS]
+
+
+class BM25Index:
+    """Inverted index over the notes in a NoteCatalog."""
+
+    def __init__(self, catalog: NoteCatalog, io_workers: int = 8) -> None:
+        self.input_dir = catalog.input_dir
+        self.io_workers = io_workers
+        self._conn = sqlite3.connect(str(catalog.db_path))
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "BM25Index":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _get_meta(self, key: str) -> Optional[int]:
+        row = self._conn.execute(
+            "SELECT value FROM bm25_meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _catalog_version(self) -> Optional[int]:
+        # The catalog bumps its generation whenever an entry changes, including
+        # files edited in place, which leave the directory's mtime alone.
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'generation'"
+        ).fetchone()
+        return int(row[0]) if row else None
+
+    def update(self) -> int:
+        """Index notes the catalog has that are new or changed; drop removed ones.
+
+        The catalog should be refreshed first. Returns the number of notes
+        indexed or removed.
+        """
+        with span("relevance.update") as stats:
+            changed = self._update()
+            stats["notes_changed"] = changed
+        return changed
+
+    def _update(self) -> int:
+        version = self._catalog_version()
+        if version is not None and self._get_meta("catalog_version") == version:
+            return 0
+        catalog = {
+            name: (ts, size, mtime_ns)
+            for name, ts, size, mtime_ns in self._conn.execute(
+                "SELECT name, ts, size, mtime_ns FROM notes WHERE text_len > 0"
+            )
+        }
+        indexed = {
+            name: (doc, (ts, size, mtime_ns))
+            for doc, name, ts, size, mtime_ns in self._conn.execute(
+                "SELECT id, name, ts, size, mtime_ns FROM bm25_docs"
+            )
+        }
+        stale = [
+            name for name, row in catalog.items()
+            if name not in indexed or indexed[name][1] != row
+        ]
+        gone = [name for name in indexed if name not in catalog]
+        loaded = load_notes(
+            [self.input_dir / name for name in stale], io_workers=self.io_workers
+        )
+        with self._conn:
+            for name in gone + stale:
+                if name not in indexed:
+                    continue
+                doc = indexed[name][0]
+                self._conn.execute(
+                    "UPDATE bm25_terms SET df = df - 1 WHERE term IN "
+                    "(SELECT term FROM bm25_postings WHERE doc = ?)",
+                    (doc,),
+                )
+                self._conn.execute("DELETE FROM bm25_postings WHERE doc = ?", (doc,))
+                self._conn.execute("DELETE FROM bm25_docs WHERE id = ?", (doc,))
+            postings: List[Tuple[str, int, int]] = []
+            df: Counter = Counter()
+            for name, note in zip(stale, loaded):
+                counts = Counter(terms(note[1])) if note else Counter()
+                doc = self._conn.execute(
+                    "INSERT INTO bm25_docs (name, ts, size, mtime_ns, length) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (name, *catalog[name], sum(counts.values())),
+                ).lastrowid
+                postings.extend((term, doc, tf) for term, tf in counts.items())
+                df.update(counts.keys())
+            postings.sort()  # insert in primary-key order
+            self._conn.executemany(
+                "INSERT INTO bm25_postings VALUES (?, ?, ?)", postings
+            )
+            self._conn.executemany(
+                "INSERT INTO bm25_terms VALUES (?, ?) "
+                "ON CONFLICT (term) DO UPDATE SET df = df + excluded.df",
+                sorted(df.items()),
+            )
+            self._conn.execute("DELETE FROM bm25_terms WHERE df <= 0")
+            n_docs, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM bm25_docs"
+            ).fetchone()
+            meta = [("docs", n_docs), ("total_len", total)]
+            if version is not None:
+                meta.append(("catalog_version", version))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO bm25_meta (key, value) VALUES (?, ?)", meta
+            )
+        return len(stale) + len(gone)
+
+    def search(
+        self,
+        query_text: str,
+        since: dt.date,
+        before: dt.date,
+        limit: int = 200,
+    ) -> List[Tuple[Path, dt.datetime, float]]:
+        """Rank notes dated in [since, before) against query_text.
+
+        Returns (path, when, score) for matching notes, best first.
+        """
+        with span("relevance.search") as stats:
+            n_docs = self._get_meta("docs") or 0
+            avg_len = (self._get_meta("total_len") or 0) / max(n_docs, 1)
+            query = self._query_weights(query_text, n_docs)
+            stats["query_terms"] = len(query)
+            if not query:
+                return []
+
+            marks = ",".join("?" * len(query))   # at most QUERY_TERMS
+            rows = self._conn.execute(
+                "SELECT d.name, d.ts, d.length, p.term, p.tf "
+                "FROM bm25_postings p JOIN bm25_docs d ON d.id = p.doc "
+                f"WHERE p.term IN ({marks}) AND d.ts >= ? AND d.ts < ?",
+                (*query, since.isoformat(), before.isoformat()),
+            )
+            scores: Dict[str, float] = {}
+            when: Dict[str, str] = {}
+            for name, ts, length, term, tf in rows:
+                norm = K1 * (1 - B + B * length / (avg_len or 1))
+                scores[name] = (
+                    scores.get(name, 0.0)
+                    + query[term] * tf * (K1 + 1) / (tf + norm)
+                )
+                when[name] = ts
+            stats["notes_matched"] = len(scores)
+            ranked = sorted(scores.items(), key=lambda kv: -kv[1])[:limit]
+        return [
+            (self.input_dir / name, dt.datetime.fromisoformat(when[name]), score)
+            for name, score in ranked
+        ]
+
+    def _query_weights(self, query_text: str, n_docs: int) -> Dict[str, float]:
+        """IDF-weighted query terms, keeping the QUERY_TERMS most distinctive.
+
+        Only the rarest few candidates are weighed; common terms could not
+        outrank them anyway unless repeated many times in the query.
+        """
+        q_counts = Counter(terms(query_text))
+        if not n_docs or not q_counts:
+            return {}
+        candidates = list(q_counts)
+        rows: List[Tuple[str, int]] = []
+        for i in range(0, len(candidates), MAX_SQL_VARIABLES):
+            chunk = candidates[i:i + MAX_SQL_VARIABLES]
+            marks = ",".join("?" * len(chunk))
+            rows += self._conn.execute(
+                f"SELECT term, df FROM bm25_terms WHERE term IN ({marks}) AND df <= ? "
+                "ORDER BY df LIMIT ?",
+                (*chunk, max(int(n_docs * MAX_DF_RATIO), 1), 8 * QUERY_TERMS),
+            )
+        df = sorted(rows, key=lambda row: row[1])[:8 * QUERY_TERMS]
+        weights = sorted(
+            (
+                (
+                    math.log(1 + (n_docs - f + 0.5) / (f + 0.5))
+                    * (1 + math.log(q_counts[t])),
+                    t,
+                )
+                for t, f in df
+            ),
+            reverse=True,
+        )
+        return {t: w for w, t in weights[:QUERY_TERMS]}
+
+
+def fill_budget(
+    notes: Sequence[Note], budget: int, cost: Callable[[Note], int] = lambda n: n.length
+) -> List[Note]:
+    """Take notes in the given (best-first) order while their cost fits budget.
+
+    The cost is the note's text length by default; pass a token count to
+    budget in tokens.
+    """
+    kept: List[Note] = []
+    used = 0
+    for n in notes:
+        c = cost(n)
+        if used + c > budget:
+            continue
+        kept.append(n)
+        used += c
+    return kept
@@ -0,0 +1,228 @@
+"""Thin client for `summarizer serve`, used by `summarizer --server ADDRESS`.
+
+It speaks just enough HTTP/1.1 over a plain socket (TCP or Unix) to call the
+server's JSON endpoints, on one kept-alive connection. `http.client` would
+add ~30 ms of imports to a command whose point is to start instantly.
+
+Only the options in SERVER_OPTIONS are forwarded; the server uses its own
+key, cache, ledger and other paths, and only reads the input directories it
+was started with. A TCP server also wants the token it wrote at startup.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from .cli import build_parser, deliver_summary, parse_date_or_range
+from .paths import DEFAULT_RUNTIME_ROOT, DEFAULT_SERVER_SOCKET
+
+
+DEFAULT_PORT = 8765
+
+# Summarize and refine options a request may set. Everything else (API key,
+# paths, recording, tracing, worker counts) is the server's own.
+SERVER_OPTIONS = frozenset({
+    "provider", "model", "hedge", "hedge_percentile", "hedge_delay", "retries",
+    "context_days", "max_chars", "max_tokens", "context_strategy", "dedup",
+    "dedup_threshold", "no_cache", "no_index", "context_select",
+    "relevance_lookback", "rollups", "map_reduce", "fan_out", "refine_mode",
+})
+
+TOKEN_ENV = "SUMMARIZER_SERVER_TOKEN"
+
+
+def token_file(port: int) -> Path:
+    """Where a TCP server on `port` writes its bearer token (mode 0600)."""
+    return DEFAULT_RUNTIME_ROOT / f"server-{port}.token"
+
+
+def parse_address(address: str) -> Tuple[int, Any]:
+    """(socket family, address) for 'unix:/path', 'http://host:port' or 'host:port'.
+
+    'unix' or 'unix:' alone is the default socket.
+    """
+    if address in ("unix", "unix:"):
+        return socket.AF_UNIX, str(DEFAULT_SERVER_SOCKET)
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    rest = address.split("://", 1)[-1].rstrip("/")
+    host, sep, port = rest.rpartition(":")
+    if not sep:
+        host, port = rest, ""
+    return socket.AF_INET, (host or "127.0.0.1", int(port) if port else DEFAULT_PORT)
+
+
+def _read_token(port: int) -> Optional[str]:
+    try:
+        return token_file(port).read_text(encoding="ascii").strip()
+    except OSError:
+        return None
+
+
+class ServerConnection:
+    """A kept-alive connection to the server; requests are serialized."""
+
+    def __init__(self, address: str) -> None:
+        self.address = address
+        self._headers = "Host: localhost\r\n"
+        family, addr = parse_address(address)
+        if family != socket.AF_UNIX:
+            host = f"[{addr[0]}]" if ":" in addr[0] else addr[0]
+            self._headers = f"Host: {host}:{addr[1]}\r\n"
+            token = os.getenv(TOKEN_ENV) or _read_token(addr[1])
+            if token:
+                self._headers += f"Authorization: Bearer {token}\r\n"
+        self._sock: Optional[socket.socket] = None
+        self._file: Optional[BinaryIO] = None
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+        self._sock = self._file = None
+
+    def _connect(self) -> None:
+        family, addr = parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.connect(addr)
+        except OSError as e:
+            sock.close()
+            raise RuntimeError(
+                f"Cannot reach summarizer server at {self.address}: {e}"
+            ) from e
+        self._sock, self._file = sock, sock.makefile("rb")
+
+    def post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST JSON and return the decoded reply; raises RuntimeError on errors."""
+        body = json.dumps(payload).encode("utf-8")
+        request = (
+            f"POST {path} HTTP/1.1\r\n{self._headers}"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        ).encode("ascii") + body
+        with self._lock:
+            for attempt in range(2):
+                reused = self._sock is not None
+                if not reused:
+                    self._connect()
+                try:
+                    self._sock.sendall(request)
+                    status, reply = self._read_response()
+                    break
+                except (ConnectionError, EOFError):
+                    self.close()
+                    # A kept-alive connection the server closed: retry once.
+                    if not reused or attempt:
+                        raise RuntimeError(
+                            f"Connection to summarizer server {self.address} lost"
+                        )
+        if status != 200:
+            raise RuntimeError(f"Server error: {reply.get('error', status)}")
+        return reply
+
+    def _read_response(self) -> Tuple[int, Dict[str, Any]]:
+        status_line = self._file.readline()
+        if not status_line:
+            raise EOFError
+        status = int(status_line.split()[1])
+        length = 0
+        close = False
+        while True:
+            line = self._file.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "connection" and value.strip().lower() == "close":
+                close = True
+        reply = json.loads(self._file.read(length) or b"{}")
+        if close:
+            self.close()
+        return status, reply
+
+
+class RemoteClient:
+    """Summaries and refinements from the server, for one command line.
+
+    Concurrent calls (speculative refinements) each get their own
+    connection; idle connections are kept for reuse.
+    """
+
+    def __init__(self, address: str, argv: List[str]) -> None:
+        self.provider = "server"
+        self.model = address
+        self.last_usage = None
+        self._address = address
+        self._argv = list(argv)
+        self._lock = threading.Lock()
+        self._idle: List[ServerConnection] = []
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._idle.pop() if self._idle else ServerConnection(self._address)
+        try:
+            return conn.post(path, payload)
+        finally:
+            with self._lock:
+                self._idle.append(conn)
+
+    def summarize(self) -> Optional[str]:
+        return self._post("/summarize", {"argv": self._argv}).get("summary")
+
+    def refine(self, summary: str, feedback: str) -> str:
+        return self._post(
+            "/refine", {"argv": self._argv, "summary": summary, "feedback": feedback}
+        )["summary"]
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._idle:
+                conn.close()
+            self._idle.clear()
+
+
+def forwarded_argv(args: argparse.Namespace) -> List[str]:
+    """The request's command line: the date, the absolute input directory,
+    and each SERVER_OPTIONS option that differs from its default."""
+    argv = [args.date_or_range, "--input-dir", str(args.input_dir.resolve())]
+    for action in build_parser()._actions:
+        value = getattr(args, action.dest, None)
+        if action.dest not in SERVER_OPTIONS or value == action.default:
+            continue
+        flag = action.option_strings[-1]
+        if action.nargs == 0:
+            argv.append(flag)
+        elif isinstance(value, list):
+            for item in value:
+                argv += [flag, str(item)]
+        else:
+            argv += [flag, str(value)]
+    return argv
+
+
+def summarize_remote(args: argparse.Namespace) -> int:
+    """Run the summarize command through a `summarizer serve` process."""
+    start, end = parse_date_or_range(args.date_or_range)
+    client = RemoteClient(args.server, forwarded_argv(args))
+    try:
+        t0 = time.perf_counter()
+        try:
+            summary = client.summarize()
+        except RuntimeError as e:
+            raise SystemExit(str(e))
+        if summary is None:
+            print("No transcripts found in the specified window.")
+            return 1
+        print(f"Latency: {time.perf_counter() - t0:.2f}s total (server)",
+              file=sys.stderr)
+        return deliver_summary(args, client, summary, False, start, end)
+    finally:
+        client.close()
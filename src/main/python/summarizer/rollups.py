@@ -0,0 +1,266 @@
+"""Persistent day/week/month rollups for long-range summaries.
+
+Each day with transcripts gets its own summary, keyed by a fingerprint of
+that day's files (name, size, mtime from the note catalog) and of the
+provider, model and prompt templates. Days roll up into weeks (Monday-Sunday,
+clipped to the month) and weeks into months; a rollup's fingerprint is the
+hash of its children's, so a changed day only invalidates its own week and
+month.
+
+A range is answered by covering it with the largest whole units (months,
+then weeks, then days), generating only the units whose fingerprint is not
+in the store yet, and merging the covering summaries with REDUCE_TEMPLATE.
+Rollups live in the same SQLite file as the catalog.
+"""
+
+import calendar
+import datetime as dt
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .catalog import NoteCatalog
+from .file_ops import find_notes, load_texts
+from .llm_clients import LLMClient
+from .mapreduce import reduce_summaries, summarize_map_reduce
+from .models import Note
+from .profiling import span
+from .prompts import REDUCE_TEMPLATE, SUMMARY_TEMPLATE
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    level       TEXT NOT NULL,   -- 'day', 'week' or 'month'
+    start_day   TEXT NOT NULL,
+    end_day     TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    summary     TEXT NOT NULL,
+    created     REAL NOT NULL,
+    PRIMARY KEY (level, start_day, end_day)
+);
+"""
+
+LEVELS = ("day", "week", "month")
+
+Unit = Tuple[str, dt.date, dt.date]     # (level, first day, last day)
+
+
+def _digest(*parts: object) -> str:
+    blob = json.dumps(parts, default=str).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+def settings_key(provider: str, model: str) -> str:
+    """Fingerprint of everything besides the notes that shapes a summary."""
+    return _digest(provider, model, SUMMARY_TEMPLATE, REDUCE_TEMPLATE)
+
+
+def _month(day: dt.date) -> Tuple[dt.date, dt.date]:
+    last = calendar.monthrange(day.year, day.month)[1]
+    return day.replace(day=1), day.replace(day=last)
+
+
+def _week(day: dt.date) -> Tuple[dt.date, dt.date]:
+    """The Monday-Sunday week containing day, clipped to day's month."""
+    m_start, m_end = _month(day)
+    monday = day - dt.timedelta(days=day.weekday())
+    return max(monday, m_start), min(monday + dt.timedelta(days=6), m_end)
+
+
+def cover(start: dt.date, end: dt.date) -> List[Unit]:
+    """Split [start, end] into the fewest whole months, weeks and days."""
+    units: List[Unit] = []
+    day = start
+    while day <= end:
+        for level, (first, last) in (("month", _month(day)), ("week", _week(day))):
+            if first == day and last <= end:
+                units.append((level, first, last))
+                break
+        else:
+            units.append(("day", day, day))
+        day = units[-1][2] + dt.timedelta(days=1)
+    return units
+
+
+def children(unit: Unit) -> List[Unit]:
+    level, start, end = unit
+    if level == "day":
+        return []
+    out: List[Unit] = []
+    day = start
+    while day <= end:
+        out.append(("week", *_week(day)) if level == "month" else ("day", day, day))
+        day = out[-1][2] + dt.timedelta(days=1)
+    return out
+
+
+class RollupStore:
+    """Summaries per (level, start, end), each tagged with its fingerprint."""
+
+    def __init__(self, catalog: NoteCatalog) -> None:
+        self._conn = sqlite3.connect(str(catalog.db_path))
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "RollupStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def get(self, unit: Unit, fingerprint: str) -> Optional[str]:
+        level, start, end = unit
+        row = self._conn.execute(
+            "SELECT summary FROM rollups WHERE level = ? AND start_day = ? "
+            "AND end_day = ? AND fingerprint = ?",
+            (level, start.isoformat(), end.isoformat(), fingerprint),
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, unit: Unit, fingerprint: str, summary: str) -> None:
+        level, start, end = unit
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?)",
+                (level, start.isoformat(), end.isoformat(), fingerprint,
+                 summary, time.time()),
+            )
+
+
+class Rollups:
+    """Answer date ranges from the rollup store, regenerating only stale units."""
+
+    def __init__(
+        self,
+        catalog: NoteCatalog,
+        store: RollupStore,
+        settings: str,
+        max_chars: int,
+        fan_out: int = 4,
+        io_workers: int = 8,
+    ) -> None:
+        self.catalog = catalog
+        self.store = store
+        self.settings = settings
+        self.max_chars = max_chars
+        self.fan_out = fan_out
+        self.io_workers = io_workers
+        self._days: Dict[dt.date, str] = {}
+        self._fingerprints: Dict[Unit, Optional[str]] = {}
+
+    def fingerprint(self, unit: Unit) -> Optional[str]:
+        """None when the unit has no transcripts."""
+        if unit not in self._fingerprints:
+            level, start, _ = unit
+            if level == "day":
+                day = self._days.get(start)
+                fp = _digest(level, day, self.settings) if day else None
+            else:
+                parts = [self.fingerprint(c) for c in children(unit)]
+                fp = _digest(unit, parts) if any(parts) else None
+            self._fingerprints[unit] = fp
+        return self._fingerprints[unit]
+
+    def plan(self, start: dt.date, end: dt.date) -> Tuple[List[Unit], List[Unit]]:
+        """Return (covering units that have notes, units that must be generated).
+
+        Units to generate are listed children first.
+        """
+        first, last = _month(start)[0], _month(end)[1]
+        self.catalog.refresh()
+        self.catalog.verify(first, last)
+        self._days = self.catalog.day_fingerprints(first, last)
+        self._fingerprints.clear()
+        stale: List[Unit] = []
+
+        def visit(unit: Unit) -> None:
+            fp = self.fingerprint(unit)
+            if fp is None or unit in stale or self.store.get(unit, fp) is not None:
+                return
+            for child in children(unit):
+                visit(child)
+            stale.append(unit)
+
+        units = [u for u in cover(start, end) if self.fingerprint(u)]
+        for unit in units:
+            visit(unit)
+        return units, stale
+
+    def summarize(
+        self, client: LLMClient, start: dt.date, end: dt.date
+    ) -> Optional[str]:
+        """Summarize [start, end] from rollups; None if it has no transcripts."""
+        units, stale = self.plan(start, end)
+        if not units:
+            return None
+        if stale:
+            counts = ", ".join(
+                f"{sum(1 for u in stale if u[0] == level)} {level}(s)"
+                for level in LEVELS
+            )
+            print(f"Generating {len(stale)} rollup(s): {counts}...", file=sys.stderr)
+        day_notes = self._load_days([u[1] for u in stale if u[0] == "day"])
+        with ThreadPoolExecutor(max_workers=max(self.fan_out, 1)) as pool:
+            for level in LEVELS:
+                todo = [u for u in stale if u[0] == level]
+                # The store is read here, not in the worker threads.
+                inputs = [
+                    day_notes[u[1]] if level == "day" else self._child_summaries(u)
+                    for u in todo
+                ]
+                with span("rollups.generate", level=level, units=len(todo)):
+                    summaries = list(pool.map(
+                        lambda job: self._generate(client, *job), zip(todo, inputs)
+                    ))
+                for unit, summary in zip(todo, summaries):
+                    self.store.put(unit, self.fingerprint(unit), summary)
+
+        parts = [self.store.get(u, self.fingerprint(u)) or "" for u in units]
+        if len(units) == 1:
+            return parts[0]
+        with span("rollups.merge", units=len(units)):
+            return reduce_summaries(
+                parts, client, start, end, 0, self.max_chars, self.fan_out
+            )
+
+    def _load_days(self, days: Sequence[dt.date]) -> Dict[dt.date, List[Note]]:
+        if not days:
+            return {}
+        notes = find_notes(
+            self.catalog.input_dir, min(days), max(days), context_days=0,
+            catalog=self.catalog,
+        )
+        wanted = set(days)
+        by_day: Dict[dt.date, List[Note]] = {}
+        for n in notes:
+            if n.when.date() in wanted:
+                by_day.setdefault(n.when.date(), []).append(n)
+        load_texts(
+            [n for group in by_day.values() for n in group],
+            io_workers=self.io_workers,
+        )
+        return by_day
+
+    def _child_summaries(self, unit: Unit) -> List[str]:
+        return [
+            self.store.get(c, fp) or ""
+            for c, fp in ((c, self.fingerprint(c)) for c in children(unit))
+            if fp is not None
+        ]
+
+    def _generate(self, client: LLMClient, unit: Unit, inputs: list) -> str:
+        """Summarize a day's notes, or merge a week's or month's child summaries."""
+        level, start, end = unit
+        if level == "day":
+            return summarize_map_reduce(
+                inputs, client, start, end, 0, self.max_chars, fan_out=1
+            )
+        return reduce_summaries(
+            inputs, client, start, end, 0, self.max_chars, fan_out=1
+        )
@@ -0,0 +1,358 @@
+"""`summarizer serve`: a long-running local server with warm clients.
+
+Each CLI run pays for importing a provider SDK, creating its HTTP client
+(and a fresh TLS connection) and opening the note catalog. The server does
+that once. Provider clients are kept per provider, model and key, so SDK
+connection pools stay alive between requests, and each input directory's
+catalog stays open. Identical prompts that are in flight at the same time
+(two terminals asking for the same day, overlapping rollups) share a
+single LLM call.
+
+Endpoints, JSON over HTTP/1.1 on a Unix socket (by default) or a TCP port:
+
+  GET  /health     counters
+  POST /summarize  {"argv": [...]} -> {"summary": str or null}
+  POST /refine     {"argv": [...], "summary": str, "feedback": str}
+                   -> {"summary": str}
+
+`argv` is a summarize command line limited to `remote.SERVER_OPTIONS`, plus
+the date and one of the server's --input-dir directories; `summarizer
+--server ADDRESS ...` sends its own. The socket is created mode 0600. Over
+TCP, requests need the Host of a loopback or bound address and the bearer
+token written to `remote.token_file(port)`. Requests carrying an Origin
+header (from a browser) are refused, and POSTs must be application/json.
+"""
+
+import argparse
+import hmac
+import json
+import os
+import secrets
+import signal
+import socketserver
+import stat
+import sys
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Optional, Sequence, Tuple
+
+from .catalog import NoteCatalog
+from .cli import (
+    build_client,
+    build_parser,
+    complete_summary,
+    make_rollups,
+    parse_date_or_range,
+    prepare_summary,
+)
+from .feedback import refine_summary
+from .hedging import parse_target
+from .llm_clients import LLMClient, call_usage, record_usage
+from .paths import DEFAULT_RUNTIME_ROOT, DEFAULT_SERVER_SOCKET
+from .remote import DEFAULT_PORT, SERVER_OPTIONS, token_file
+from .rollups import RollupStore
+
+
+class CoalescingClient:
+    """Share one completion between identical prompts that are in flight together."""
+
+    def __init__(self, client: LLMClient) -> None:
+        self._client = client
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.coalesced = 0
+        self.provider = getattr(client, "provider", type(client).__name__)
+        self.model = getattr(client, "model", None)
+        self.temperature = getattr(client, "temperature", None)
+        self.system_prompt = getattr(client, "system_prompt", None)
+        self.last_usage = None
+
+    def complete(self, prompt: str) -> str:
+        with self._lock:
+            shared = self._inflight.get(prompt)
+            if shared is None:
+                mine: Future = Future()
+                self._inflight[prompt] = mine
+            else:
+                self.coalesced += 1
+        if shared is not None:
+            result = shared.result()
+            record_usage(self, None)   # billed to the request that made the call
+            return result
+        try:
+            result = self._client.complete(prompt)
+        except BaseException as e:
+            mine.set_exception(e)
+            raise
+        else:
+            record_usage(self, call_usage())
+            mine.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[prompt]
+
+
+class SummaryService:
+    """Warm clients and catalogs behind the server's endpoints."""
+
+    def __init__(self, input_dirs: Sequence[Path]) -> None:
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple, CoalescingClient] = {}
+        self._catalogs: Dict[Path, NoteCatalog] = {}
+        self.input_dirs = [d.resolve() for d in input_dirs]
+        self.requests = 0
+
+    def client_for(self, args: argparse.Namespace) -> CoalescingClient:
+        key = (args.provider.lower(), args.model, args.api_key,
+               args.no_cache, str(args.cache_dir), tuple(args.hedge or ()),
+               args.hedge_percentile, args.hedge_delay, args.retries)
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = CoalescingClient(build_client(args))
+            return self._clients[key]
+
+    def catalog_for(self, input_dir: Path) -> NoteCatalog:
+        input_dir = input_dir.resolve()
+        with self._lock:
+            if input_dir not in self._catalogs:
+                self._catalogs[input_dir] = NoteCatalog(input_dir, shared=True)
+            return self._catalogs[input_dir]
+
+    def _parse(self, payload: Dict[str, Any]) -> argparse.Namespace:
+        with self._lock:
+            self.requests += 1
+        argv = [str(a) for a in payload.get("argv", [])]
+        parser = build_parser()
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit:
+            raise ValueError(f"invalid arguments: {' '.join(argv)}")
+        # Comparing parsed values also catches abbreviations and --opt=value.
+        for action in parser._actions:
+            if action.dest in SERVER_OPTIONS or not action.option_strings:
+                continue
+            if action.dest not in ("help", "input_dir") and \
+                    getattr(args, action.dest) != action.default:
+                raise ValueError(f"{action.option_strings[-1]} is not accepted by the server")
+        providers = [args.provider] + [parse_target(h)[0] for h in args.hedge or ()]
+        if any(p.lower() == "replay" for p in providers):
+            raise ValueError("the replay provider is not available through the server")
+        input_dir = args.input_dir.resolve()
+        if input_dir not in self.input_dirs:
+            raise ValueError(f"{input_dir} is not served; start the server "
+                             f"with --input-dir {input_dir}")
+        args.input_dir = input_dir
+        return args
+
+    def summarize(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        args = self._parse(payload)
+        start, end = parse_date_or_range(args.date_or_range)
+        client = self.client_for(args)
+        catalog = None if args.no_index else self.catalog_for(args.input_dir)
+        if args.rollups:
+            if catalog is None:
+                raise ValueError("--rollups needs the note catalog; drop --no-index.")
+            with RollupStore(catalog) as store:
+                summary = make_rollups(args, catalog, store, start, end).summarize(
+                    client, start, end
+                )
+            return {"summary": summary}
+        notes, prompt = prepare_summary(args, start, end, catalog)
+        if not notes:
+            return {"summary": None}
+        return {
+            "summary": complete_summary(args, client, notes, prompt, start, end)
+        }
+
+    def refine(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        args = self._parse(payload)
+        summary = refine_summary(
+            str(payload["summary"]), str(payload["feedback"]), self.client_for(args),
+            args.refine_mode,
+        )
+        return {"summary": summary}
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "status": "ok",
+                "requests": self.requests,
+                "coalesced": sum(c.coalesced for c in self._clients.values()),
+                "clients": len(self._clients),
+                "catalogs": len(self._catalogs),
+            }
+
+    def close(self) -> None:
+        for catalog in self._catalogs.values():
+            catalog.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep connections alive between requests
+
+    def address_string(self) -> str:
+        return self.client_address[0] if self.client_address else "unix"
+
+    def _reply(self, status: int, payload: Dict[str, Any], close: bool = False) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if close:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _refused(self) -> Optional[Tuple[int, str]]:
+        """(status, reason) if the request must not be served."""
+        if "Origin" in self.headers:
+            return 403, "cross-origin requests are not accepted"
+        token = getattr(self.server, "token", None)
+        if token is not None:
+            if self.headers.get("Host", "").lower() not in self.server.hosts:
+                return 403, "unexpected Host header"
+            auth = self.headers.get("Authorization", "")
+            if not hmac.compare_digest(auth.encode(), f"Bearer {token}".encode()):
+                return 401, "missing or wrong token"
+        if self.command == "POST":
+            content_type = self.headers.get("Content-Type", "")
+            if content_type.split(";")[0].strip().lower() != "application/json":
+                return 415, "expected Content-Type: application/json"
+        return None
+
+    def do_GET(self) -> None:
+        refused = self._refused()
+        if refused is not None:
+            self._reply(refused[0], {"error": refused[1]}, close=True)
+        elif self.path == "/health":
+            self._reply(200, self.server.service.health())
+        else:
+            self._reply(404, {"error": f"no such endpoint: {self.path}"})
+
+    def do_POST(self) -> None:
+        service: SummaryService = self.server.service
+        routes: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            "/summarize": service.summarize,
+            "/refine": service.refine,
+        }
+        refused = self._refused()
+        if refused is not None:
+            # The body is left unread, so the connection can't be reused.
+            self._reply(refused[0], {"error": refused[1]}, close=True)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        if self.path not in routes:
+            self._reply(404, {"error": f"no such endpoint: {self.path}"})
+            return
+        try:
+            reply = routes[self.path](json.loads(raw or b"{}"))
+        except (ValueError, KeyError, SystemExit) as e:
+            self._reply(400, {"error": str(e)})
+        except Exception as e:
+            self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+        else:
+            self._reply(200, reply)
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    service: SummaryService
+    token: str
+    hosts: FrozenSet[str]
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    service: SummaryService
+
+
+def write_token(path: Path) -> str:
+    """Generate a bearer token and write it to `path`, readable only by us."""
+    token = secrets.token_urlsafe(32)
+    path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.fchmod(fd, 0o600)   # an older file may have had looser permissions
+    with os.fdopen(fd, "w", encoding="ascii") as f:
+        f.write(token)
+    return token
+
+
+def bind_unix(path: Path) -> _UnixServer:
+    """Listen on a Unix socket that only our user can connect to."""
+    path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    if path.exists() and stat.S_ISSOCK(path.stat().st_mode):
+        path.unlink()   # left over from a previous run
+    old_umask = os.umask(0o177)
+    try:
+        server = _UnixServer(str(path), _Handler)
+    finally:
+        os.umask(old_umask)
+    os.chmod(path, 0o600)
+    return server
+
+
+def serve_main(argv: Sequence[str]) -> int:
+    """Entry point for `summarizer serve`."""
+    parser = argparse.ArgumentParser(
+        prog="summarizer serve",
+        description=("Serve summaries from a long-running process with warm "
+                     "provider clients; use 'summarizer --server ADDRESS' "
+                     "to send requests to it"),
+    )
+    parser.add_argument("--socket", type=Path, default=DEFAULT_SERVER_SOCKET,
+                        help=f"Unix socket to listen on, mode 0600 "
+                             f"(default: {DEFAULT_SERVER_SOCKET})")
+    parser.add_argument("--tcp", action="store_true",
+                        help=("Listen on --host/--port instead; clients need the "
+                              f"token written to {DEFAULT_RUNTIME_ROOT}/server-PORT.token"))
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Interface to listen on with --tcp (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"TCP port with --tcp (default: {DEFAULT_PORT})")
+    parser.add_argument("--input-dir", type=Path, action="append", default=None,
+                        help=("Transcript directory requests may read (repeatable; "
+                              "default: the current directory); its catalog is "
+                              "opened and refreshed at startup"))
+    args = parser.parse_args(argv)
+
+    service = SummaryService(args.input_dir or [Path.cwd()])
+    for input_dir in service.input_dirs:
+        service.catalog_for(input_dir).refresh()
+
+    server: socketserver.BaseServer
+    socket_path: Optional[Path] = None
+    token_path: Optional[Path] = None
+    if args.tcp:
+        server = _TCPServer((args.host, args.port), _Handler)
+        port = server.server_address[1]
+        host = f"[{args.host}]" if ":" in args.host else args.host
+        server.hosts = frozenset(
+            f"{h}:{port}" for h in ("127.0.0.1", "localhost", "[::1]", host.lower())
+        )
+        token_path = token_file(port)
+        server.token = write_token(token_path)
+        address = f"http://{host}:{port} (token in {token_path})"
+    else:
+        socket_path = args.socket.expanduser()
+        server = bind_unix(socket_path)
+        address = f"unix:{socket_path}"
+    server.service = service
+    print(f"Serving on {address} (Ctrl-C to stop)", file=sys.stderr)
+    # Let `kill` remove the socket and token file too.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        for path in (socket_path, token_path):
+            if path is not None:
+                path.unlink(missing_ok=True)
+    return 0
@@ -0,0 +1,352 @@
+"""Watch a folder for finished files and copy them into another directory.
+
+Replaces the polling loop in `whispermac_sync.sh`. On Linux the kernel tells
+us when a writer closes a file (inotify IN_CLOSE_WRITE) or renames one into
+place (IN_MOVED_TO), so a recording is copied as soon as it is complete. On
+other platforms a polling fallback lists the folder once per tick and treats
+a file as complete when its size and mtime have not changed for `settle`
+seconds.
+
+Either way only the names reported in a tick are handled, so a burst of new
+files costs one copy each rather than a rescan per file. Copies are written
+to a hidden temporary file and renamed into place, so readers (MacWhisper,
+the note catalog) never see a partial file. When a copied file is a
+transcript, the note catalog for the destination is updated in place.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import shutil
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .profiling import span
+
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+    except OSError:  # pragma: no cover - no usable libc
+        return None
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    return libc
+
+
+class InotifySource:
+    """Names of files closed after writing, or moved into `directory`."""
+
+    def __init__(self, directory: Path, libc: ctypes.CDLL) -> None:
+        self.directory = directory
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        wd = libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(err, os.strerror(err), str(directory))
+        # Set when the kernel queue overflowed and events were lost.
+        self.overflowed = False
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+    def poll(self, timeout: float) -> List[str]:
+        """Wait up to `timeout` seconds and return the completed names."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        names: List[str] = []
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                raw = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                elif raw:
+                    names.append(os.fsdecode(raw))
+        return names
+
+
+class PollingSource:
+    """Portable fallback: report files whose size and mtime have settled."""
+
+    def __init__(self, directory: Path, settle: float = 2.0) -> None:
+        self.directory = directory
+        self.settle = settle
+        self.overflowed = False
+        # name -> ((size, mtime_ns), monotonic time that signature was first seen)
+        self._pending: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        self._reported: Dict[str, Tuple[int, int]] = {}
+        # Settled files already present are left to the startup sync.
+        self._scan(report=False)
+
+    def close(self) -> None:
+        pass
+
+    def poll(self, timeout: float) -> List[str]:
+        time.sleep(timeout)
+        return self._scan(report=True)
+
+    def _scan(self, report: bool) -> List[str]:
+        now = time.monotonic()
+        present: Dict[str, Tuple[int, int]] = {}
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                present[entry.name] = (st.st_size, st.st_mtime_ns)
+
+        done: List[str] = []
+        for name, sig in present.items():
+            if self._reported.get(name) == sig:
+                continue
+            if not report and sig[1] < (time.time() - self.settle) * 1e9:
+                self._reported[name] = sig
+                continue
+            seen = self._pending.get(name)
+            if seen is None or seen[0] != sig:
+                self._pending[name] = (sig, now)
+            elif now - seen[1] >= self.settle:
+                del self._pending[name]
+                self._reported[name] = sig
+                done.append(name)
+        for gone in (self._pending.keys() | self._reported.keys()) - present.keys():
+            self._pending.pop(gone, None)
+            self._reported.pop(gone, None)
+        return done
+
+
+def make_source(
+    directory: Path, force_polling: bool = False, settle: float = 2.0
+):
+    """Use inotify where available, otherwise the polling fallback."""
+    libc = None if force_polling else _load_libc()
+    if libc is not None:
+        try:
+            return InotifySource(directory, libc)
+        except OSError as e:
+            print(f"Warning: inotify unavailable ({e}); polling instead.",
+                  file=sys.stderr)
+    return PollingSource(directory, settle=settle)
+
+
+def copy_atomic(src: Path, dest_dir: Path) -> Optional[Path]:
+    """Copy src into dest_dir via a temporary file and rename.
+
+    Existing destination files are left alone (like `rsync --ignore-existing`);
+    returns the new path, or None if nothing was copied.
+    """
+    target = dest_dir / src.name
+    if target.exists():
+        return None
+    tmp = dest_dir / f".{src.name}.partial"
+    try:
+        shutil.copy2(src, tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return target
+
+
+class Watcher:
+    """Copy completed files matching `patterns` from source to dest."""
+
+    def __init__(
+        self,
+        source: Path,
+        dest: Path,
+        patterns: Sequence[str] = ("*",),
+        on_copied: Optional[Callable[[Path, int], None]] = None,
+    ) -> None:
+        self.source = source
+        self.dest = dest
+        self.patterns = list(patterns)
+        self.on_copied = on_copied
+        self.copied = 0
+
+    def wanted(self, name: str) -> bool:
+        # Skip hidden files, including our own and other tools' temp files.
+        if name.startswith("."):
+            return False
+        return any(fnmatch.fnmatch(name, p) for p in self.patterns)
+
+    def handle(self, names: Sequence[str]) -> int:
+        """Copy the given source names (deduplicated); return how many were copied."""
+        count = 0
+        with span("watch.copy", events=len(names)) as stats:
+            for name in dict.fromkeys(names):
+                if not self.wanted(name):
+                    continue
+                src = self.source / name
+                if not src.is_file():
+                    continue
+                before = os.stat(self.dest).st_mtime_ns
+                try:
+                    target = copy_atomic(src, self.dest)
+                except OSError as e:
+                    print(f"Warning: could not copy {src}: {e}", file=sys.stderr)
+                    continue
+                if target is None:
+                    continue
+                count += 1
+                print(f"Copied {name} -> {self.dest}", flush=True)
+                if self.on_copied is not None:
+                    self.on_copied(target, before)
+            stats["files_copied"] = count
+        self.copied += count
+        return count
+
+    def sync_existing(self, min_age: float = 0.0) -> int:
+        """Copy matching files not yet in dest, skipping any modified in the
+        last `min_age` seconds (they may still be being written)."""
+        cutoff = time.time() - min_age
+        with os.scandir(self.source) as it:
+            names = sorted(
+                e.name for e in it
+                if e.is_file() and e.stat().st_mtime <= cutoff
+            )
+        return self.handle(names)
+
+    def run(
+        self, event_source, interval: float = 1.0, resync_after: Optional[float] = None
+    ) -> None:
+        """Handle completed files until interrupted.
+
+        With `resync_after`, one more full pass runs that many seconds in, for
+        files the startup pass skipped as too recent: inotify only reports
+        files closed after it subscribed, so it would never mention them.
+        """
+        resync = None if resync_after is None else time.monotonic() + resync_after
+        while True:
+            names = event_source.poll(interval)
+            if event_source.overflowed:
+                # Events were dropped; fall back to one full pass.
+                event_source.overflowed = False
+                self.sync_existing(min_age=interval)
+            if names:
+                self.handle(names)
+            if resync is not None and time.monotonic() >= resync:
+                resync = None
+                self.sync_existing(min_age=resync_after)
+
+
+def watch_main(argv: Sequence[str]) -> int:
+    """Entry point for `summarizer watch`."""
+    parser = argparse.ArgumentParser(
+        prog="summarizer watch",
+        description=("Copy finished recordings or transcripts from SOURCE into "
+                     "DEST as soon as they are complete"),
+    )
+    parser.add_argument("source", type=Path, help="Folder to watch")
+    parser.add_argument("dest", type=Path, help="Folder to copy files into")
+    parser.add_argument(
+        "--pattern",
+        action="append",
+        default=None,
+        help="Only copy names matching this glob (repeatable; default: all files)",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Use the polling fallback even where inotify is available",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Seconds between polls / event checks (default: 1)",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=2.0,
+        help=("Seconds a file must stay unchanged before it is copied when "
+              "polling, or when found at startup (default: 2)"),
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Copy files that are already present and exit",
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Don't update the note catalog for DEST when transcripts arrive",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.source.is_dir():
+        raise SystemExit(f"Not a directory: {args.source}")
+    args.dest.mkdir(parents=True, exist_ok=True)
+
+    catalog = None
+    on_copied = None
+    if not args.no_index:
+        from .catalog import NoteCatalog
+
+        catalog = NoteCatalog(args.dest)
+
+        def on_copied(path: Path, dir_mtime_before: int) -> None:
+            if path.suffix == ".json":
+                catalog.upsert(path, dir_mtime_before=dir_mtime_before)
+
+    watcher = Watcher(
+        args.source, args.dest, patterns=args.pattern or ["*"],
+        on_copied=on_copied,
+    )
+    try:
+        # Subscribe before the initial pass so nothing slips in between.
+        source = None if args.once else make_source(
+            args.source, force_polling=args.poll, settle=args.settle
+        )
+        watcher.sync_existing(min_age=0 if args.once else args.settle)
+        if source is None:
+            return 0
+        kind = "inotify" if isinstance(source, InotifySource) else "polling"
+        print(f"Watching {args.source} ({kind})...", flush=True)
+        try:
+            watcher.run(source, interval=args.interval, resync_after=args.settle)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            source.close()
+    finally:
+        if catalog is not None:
+            catalog.close()
+    print(f"Copied {watcher.copied} file(s).")
+    return 0
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from summarizer.cache import ResponseCache
+
+
+def key(i: int) -> str:
+    return f"{i:064x}"
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_round_trip(self) -> None:
+        cache = ResponseCache(self.dir)
+        cache.put(key(1), "hello")
+        self.assertEqual(cache.get(key(1)), "hello")
+        self.assertIsNone(cache.get(key(2)))
+
+    def test_evicts_least_recently_used_over_budget(self) -> None:
+        cache = ResponseCache(self.dir, max_bytes=300)
+        for i in range(10):
+            cache.put(key(i), "x" * 50)
+        left = sorted(p.name for p in self.dir.iterdir())
+        self.assertEqual(left, [f"{key(i)}.json" for i in (7, 8, 9)])
+
+    def test_evict_leaves_other_files_alone(self) -> None:
+        note = self.dir / "Global (2020-01-01 08.00.00).json"
+        note.write_text('{"text": "a transcript"}')
+        old = time.time() - 365 * 24 * 3600
+        os.utime(note, (old, old))
+        cache = ResponseCache(self.dir, max_bytes=1)
+        cache.put(key(1), "x" * 50)
+        cache.evict()
+        self.assertTrue(note.exists())
+
+    def test_expired_entries_are_misses(self) -> None:
+        cache = ResponseCache(self.dir, max_age=0.0)
+        cache.put(key(1), "stale")
+        time.sleep(0.01)
+        self.assertIsNone(cache.get(key(1)))
+        self.assertFalse((self.dir / f"{key(1)}.json").exists())
+
+    def test_concurrent_puts_of_one_key(self) -> None:
+        cache = ResponseCache(self.dir)
+        answers = [str(i) * 20_000 for i in range(8)]
+        with ThreadPoolExecutor(8) as pool:
+            for _ in range(5):
+                list(pool.map(lambda a: cache.put(key(1), a), answers))
+        self.assertIn(cache.get(key(1)), answers)
+        self.assertEqual([p.name for p in self.dir.iterdir()], [f"{key(1)}.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import datetime as dt
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from summarizer.catalog import NoteCatalog
+from summarizer.rollups import Rollups, RollupStore
+
+DAY = dt.date(2025, 9, 10)
+
+
+def write_note(path: Path, text: str) -> None:
+    path.write_text(json.dumps([{"text": text}]))
+
+
+def edit_in_place(path: Path, text: str) -> None:
+    """Rewrite a note without touching the directory's mtime."""
+    st = os.stat(path.parent)
+    write_note(path, text)
+    mtime = path.stat().st_mtime_ns + 1_000_000   # in case the clock is coarse
+    os.utime(path, ns=(mtime, mtime))
+    os.utime(path.parent, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+class CatalogTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.notes = self.root / "notes"
+        self.notes.mkdir()
+        self.note = self.notes / "Global (2025-09-10 08.00.00).json"
+        write_note(self.note, "first draft")
+        self.catalog = NoteCatalog(self.notes, db_path=self.root / "catalog.sqlite3")
+
+    def tearDown(self) -> None:
+        self.catalog.close()
+        self._tmp.cleanup()
+
+    def test_missing_input_dir(self) -> None:
+        db_path = self.root / "missing.sqlite3"
+        with self.assertRaises(SystemExit):
+            NoteCatalog(self.root / "missing", db_path=db_path)
+        self.assertFalse(db_path.exists())
+
+    def test_refresh_and_query(self) -> None:
+        self.assertEqual(self.catalog.refresh(), 1)
+        self.assertEqual(self.catalog.refresh(), 0)
+        self.assertEqual(
+            self.catalog.query_lengths(DAY, DAY),
+            [(self.note, dt.datetime(2025, 9, 10, 8), len("first draft"))],
+        )
+
+    def test_verify_picks_up_edits_in_place(self) -> None:
+        self.catalog.refresh()
+        edit_in_place(self.note, "a much longer second draft")
+        self.assertEqual(self.catalog.refresh(), 0)   # directory mtime unchanged
+        self.assertEqual(self.catalog.verify(DAY, DAY), 1)
+        self.assertEqual(self.catalog.query_lengths(DAY, DAY)[0][2],
+                         len("a much longer second draft"))
+        self.assertEqual(self.catalog.verify(DAY, DAY), 0)
+
+    def test_edited_day_rollup_is_regenerated(self) -> None:
+        with RollupStore(self.catalog) as store:
+            rollups = Rollups(self.catalog, store, "stub/stub", max_chars=10_000)
+            _, stale = rollups.plan(DAY, DAY)
+            for unit in stale:
+                store.put(unit, rollups.fingerprint(unit), "summary")
+            self.assertEqual(rollups.plan(DAY, DAY)[1], [])
+            edit_in_place(self.note, "second draft")
+            self.assertIn(("day", DAY, DAY), rollups.plan(DAY, DAY)[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
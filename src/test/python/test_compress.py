@@ -0,0 +1,37 @@
+import datetime as dt
+import unittest
+
+from summarizer.compress import compress_notes
+from summarizer.models import Note
+
+SENTENCES = (
+    "Reviewed the release checklist with the team. "
+    "The billing migration is blocked on the schema change. "
+    "Lunch was good. "
+    "Agreed to ship the onboarding fix on Friday after the billing migration."
+)
+
+
+def note(i: int, in_range: bool) -> Note:
+    return Note(id=f"n{i}.json", when=dt.datetime(2025, 9, 1 + i), text=SENTENCES,
+                in_range=in_range)
+
+
+class CompressNotesTest(unittest.TestCase):
+    def test_under_budget_is_unchanged(self) -> None:
+        notes = [note(0, False), note(1, True)]
+        self.assertEqual(compress_notes(notes, 10_000), notes)
+
+    def test_context_shrinks_and_in_range_is_verbatim(self) -> None:
+        notes = [note(0, False), note(1, False), note(2, True)]
+        out = compress_notes(notes, len(SENTENCES) * 2)
+        self.assertIn(notes[2], out)
+        self.assertLessEqual(sum(n.length for n in out), len(SENTENCES) * 2)
+
+    def test_no_context_notes(self) -> None:
+        notes = [note(0, True), note(1, True)]
+        self.assertEqual(compress_notes(notes, 100), notes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import datetime as dt
+import os
+import subprocess
+import sys
+import unittest
+
+import summarizer
+from summarizer.dedup import dedup_notes, duplicate_groups, shingles
+from summarizer.models import Note
+
+BASE = (
+    "Met with the design team to review the onboarding flow and agreed to cut "
+    "the second survey screen, then followed up on the billing migration and "
+    "the flaky integration tests that block the release branch this week"
+)
+TEXTS = [
+    BASE,
+    BASE + " again",
+    BASE.replace("design", "product"),
+    "Completely unrelated dictation about groceries, the dentist and a birthday gift",
+]
+
+
+def notes():
+    return [
+        Note(id=f"n{i}.json", when=dt.datetime(2025, 9, 10, 8 + i), text=t)
+        for i, t in enumerate(TEXTS)
+    ]
+
+
+GROUPS_SCRIPT = f"""
+import datetime as dt
+from summarizer.dedup import duplicate_groups
+from summarizer.models import Note
+texts = {TEXTS!r}
+print(duplicate_groups([Note(id=str(i), when=dt.datetime(2025, 9, 10), text=t)
+                        for i, t in enumerate(texts)], threshold=0.5))
+"""
+
+
+class DedupTest(unittest.TestCase):
+    def test_near_duplicates_collapse_citing_every_member(self) -> None:
+        out = dedup_notes(notes(), threshold=0.8)
+        self.assertEqual([n.id for n in out], ["n0.json, n1.json", "n2.json", "n3.json"])
+
+    def test_short_text_still_has_a_shingle(self) -> None:
+        self.assertEqual(len(shingles("two words")), 1)
+        self.assertEqual(shingles(""), frozenset())
+
+    def test_groups_do_not_depend_on_hash_seed(self) -> None:
+        src = os.path.dirname(os.path.dirname(os.path.abspath(summarizer.__file__)))
+        results = set()
+        for seed in ("1", "2", "3"):
+            env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=src)
+            out = subprocess.run(
+                [sys.executable, "-c", GROUPS_SCRIPT], env=env,
+                capture_output=True, text=True, check=True,
+            ).stdout
+            results.add(out)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(
+            results.pop().strip(),
+            str(duplicate_groups(
+                [Note(id=str(i), when=dt.datetime(2025, 9, 10), text=t)
+                 for i, t in enumerate(TEXTS)], threshold=0.5,
+            )),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+from summarizer.edits import EditError, apply_edits, parse_edits
+
+A = "Global (2025-09-05 13.42.00).json"
+B = "Global (2025-09-05 15.10.00).json"
+C = "Global (2025-09-06 09.00.00).json"
+
+SUMMARY = f"""# Summary for 2025-09-05
+A week of migration work.
+
+### Tasks Completed
+- Shipped the schema rollout ({A})
+- Fixed the flaky importer ({B})
+
+### Remaining Action Items
+- Backfill the archive ({C})
+"""
+
+
+class ParseEditsTest(unittest.TestCase):
+    def test_bare_and_fenced_lists(self) -> None:
+        edits = [{"op": "remove", "bullet": 2}]
+        self.assertEqual(parse_edits('[{"op": "remove", "bullet": 2}]'), edits)
+        self.assertEqual(parse_edits('```json\n{"edits": [{"op": "remove", "bullet": 2}]}\n```'), edits)
+
+    def test_non_json_reply(self) -> None:
+        with self.assertRaises(EditError):
+            parse_edits("Sure! I removed the second bullet.")
+
+    def test_wrong_shapes(self) -> None:
+        for reply in ("[]", '{"op": "remove"}', "[1, 2]", '{"edits": "none"}'):
+            with self.subTest(reply=reply), self.assertRaises(EditError):
+                parse_edits(reply)
+
+
+class ApplyEditsTest(unittest.TestCase):
+    def test_valid_edits(self) -> None:
+        result = apply_edits(SUMMARY, [
+            {"op": "replace", "bullet": 1, "text": f"- Shipped and verified the rollout ({A})"},
+            {"op": "add", "section": "### Remaining Action Items",
+             "text": f"Announce the rollout ({A})", "after": 3},
+            {"op": "blurb", "text": "Migration shipped."},
+        ])
+        self.assertIn(f"- Shipped and verified the rollout ({A})", result)
+        self.assertIn(f"- Fixed the flaky importer ({B})", result)
+        self.assertTrue(result.index(C) < result.index("Announce the rollout"))
+        self.assertIn("Migration shipped.", result)
+        self.assertNotIn("A week of migration work.", result)
+
+    def test_remove_drops_its_only_citation(self) -> None:
+        result = apply_edits(SUMMARY, [{"op": "remove", "bullet": 2}])
+        self.assertNotIn(B, result)
+        self.assertIn(A, result)
+
+    def test_unknown_op(self) -> None:
+        with self.assertRaisesRegex(EditError, "unknown edit op"):
+            apply_edits(SUMMARY, [{"op": "merge", "bullet": 1}])
+
+    def test_bad_bullet_numbers(self) -> None:
+        for bullet in (0, 4, "1", None):
+            with self.subTest(bullet=bullet), self.assertRaises(EditError):
+                apply_edits(SUMMARY, [{"op": "remove", "bullet": bullet}])
+        with self.assertRaisesRegex(EditError, "edited twice"):
+            apply_edits(SUMMARY, [{"op": "remove", "bullet": 1},
+                                  {"op": "replace", "bullet": 1, "text": f"x ({A})"}])
+
+    def test_unknown_note_id(self) -> None:
+        with self.assertRaisesRegex(EditError, "not in the summary"):
+            apply_edits(SUMMARY, [{"op": "replace", "bullet": 1,
+                                   "text": "Shipped (Global (2025-01-01 00.00.00).json)"}])
+
+    def test_added_bullet_without_note_id(self) -> None:
+        with self.assertRaisesRegex(EditError, "cites no note IDs"):
+            apply_edits(SUMMARY, [{"op": "add", "section": "Tasks Completed",
+                                   "text": "Celebrated"}])
+
+    def test_replace_that_loses_a_citation(self) -> None:
+        with self.assertRaisesRegex(EditError, "drop citations"):
+            apply_edits(SUMMARY, [{"op": "replace", "bullet": 3, "text": "Backfill later"}])
+
+    def test_unknown_section(self) -> None:
+        with self.assertRaisesRegex(EditError, "no section"):
+            apply_edits(SUMMARY, [{"op": "add", "section": "Risks", "text": f"Risk ({A})"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import contextlib
+import datetime as dt
+import io
+import threading
+import time
+import unittest
+from concurrent.futures import wait
+from typing import List
+from unittest import mock
+
+from summarizer.cli import build_parser, deliver_summary
+from summarizer.feedback import LESS_DETAIL, MORE_DETAIL, interactive_refinement_loop
+
+
+class CountingClient:
+    """Answers every prompt with a numbered revision; with `blocked`, only
+    once `release` is set."""
+
+    def __init__(self, blocked: bool = False) -> None:
+        self.release = threading.Event() if blocked else None
+        self._lock = threading.Lock()
+        self.prompts: List[str] = []
+
+    def complete(self, prompt: str) -> str:
+        with self._lock:
+            self.prompts.append(prompt)
+            n = len(self.prompts)
+        if self.release is not None:
+            self.release.wait(5)
+        return f"revision {n}"
+
+
+def run_loop(client: CountingClient, answers: List, **kwargs) -> str:
+    with mock.patch("summarizer.feedback.get_user_feedback", side_effect=answers), \
+            contextlib.redirect_stdout(io.StringIO()), \
+            contextlib.redirect_stderr(io.StringIO()):
+        return interactive_refinement_loop("initial", client, refine_mode="rewrite", **kwargs)
+
+
+class PrefetchTest(unittest.TestCase):
+    def test_no_prefetch_on_last_iteration(self) -> None:
+        client = CountingClient()
+        stats = {}
+        run_loop(client, [MORE_DETAIL], max_iterations=1, stats=stats)
+        self.assertEqual(len(client.prompts), 1)
+        self.assertEqual(stats["refinements"], 1)
+        self.assertEqual(stats["prefetch_wasted"], 0)
+
+    def test_prefetch_used_before_last_iteration(self) -> None:
+        client = CountingClient()
+        stats = {}
+        run_loop(client, [MORE_DETAIL, None], max_iterations=2, stats=stats)
+        self.assertEqual(stats["prefetch_used"], 1)
+        self.assertEqual(stats["prefetch_wasted"], 1)
+        self.assertEqual(len(client.prompts), 2)   # no prefetch for the final summary
+
+    def test_unfinished_prefetches_are_handed_back(self) -> None:
+        client = CountingClient(blocked=True)
+        unfinished = []
+        run_loop(client, [None], max_iterations=3, unfinished=unfinished)
+        self.assertEqual(len(unfinished), 2)
+        client.release.set()
+        wait(unfinished, timeout=5)
+        self.assertTrue(all(f.done() for f in unfinished))
+        self.assertEqual({p for p in client.prompts if MORE_DETAIL in p or LESS_DETAIL in p},
+                         set(client.prompts))
+
+
+class DeliverSummaryTest(unittest.TestCase):
+    def test_prefetches_abandoned_without_ledger(self) -> None:
+        client = CountingClient(blocked=True)
+        args = build_parser().parse_args(["2024-01-02", "--interactive", "--no-ledger"])
+        day = dt.date(2024, 1, 2)
+        t0 = time.perf_counter()
+        with mock.patch("summarizer.feedback.get_user_feedback", side_effect=[None]), \
+                mock.patch("builtins.input", return_value="n"), \
+                contextlib.redirect_stdout(io.StringIO()), \
+                contextlib.redirect_stderr(io.StringIO()):
+            deliver_summary(args, client, "initial", False, day, day, record={}, before=())
+        self.assertLess(time.perf_counter() - t0, 2.0)
+        client.release.set()
+
+
+if __name__ == "__main__":
+    unittest.main()
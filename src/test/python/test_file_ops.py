@@ -0,0 +1,120 @@
+import datetime as dt
+import importlib.util
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from summarizer.file_ops import (
+    JSON_BACKENDS, find_notes, parse_filename_dt, parse_note, load_note,
+)
+
+ODD_INPUTS = [
+    b"[]", b" [ ] ", b"{}", b'"text"', b"null", b"[1, 2, 3]",
+    b'[{"text": "  a  "}, {"text": 5}, {"text": null}, "text", [{"text": "b"}]]',
+    b'[{"start": NaN, "text": "nan start"}]',
+    b'[{"start": Infinity, "text": "inf start"}]',
+    b'[{"text": "\\ud800 lone surrogate"}]',
+    b'[{"text": "dup"}, {"text": "first", "text": "last"}]',
+    b'\xef\xbb\xbf[{"text": "utf-8 bom"}]',
+    '[{"text": "utf-16"}]'.encode("utf-16"),
+    b'[{"text": "  "}, {"text": ""}]',
+    b'[{"text": "caf\xc3\xa9 \\u00e9\\n line"}]',
+    b'[{"text": "nested", "words": [{"w": "a"}, {"w": {"x": [1, 2.5e3]}}]}]',
+    b'[\n  {"text": "pretty"},\n  {"text": "printed"}\n]\n',
+    b'[{"text": "trailing"},]', b'[{"text": "x"}] extra', b'[{"text": "x"}',
+    b'[{"text": "x"} {"text": "y"}]', b'[{"text": "bad \\x escape"}]',
+    b"", b"   ", b"not json", b"\xff\xfe\xfd",
+]
+
+
+def reference_parse(name: str, raw: Union[str, bytes]) -> Optional[Tuple[str, str]]:
+    """parse_note as it was before the JSON backends were added."""
+    blobs = json.loads(raw)
+    texts: List[str] = []
+    if isinstance(blobs, list):
+        for obj in blobs:
+            if isinstance(obj, dict) and isinstance(obj.get("text"), str):
+                texts.append(obj["text"].strip())
+    content = "\n\n".join(t for t in texts if t)
+    return (name, content) if content else None
+
+
+def outcome(fn, raw: bytes) -> object:
+    """The result, or "error" if parsing raised (the exception types differ)."""
+    try:
+        return fn(raw)
+    except Exception:
+        return "error"
+
+
+def transcript(segments: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    words = ["alpha", "beta", "déjà", "vu", "naïve", "日本", "emoji 🎉", 'quote "q"', "\\"]
+    return json.dumps([
+        {"start": i * 2.5, "end": i * 2.5 + 2.0,
+         "text": " ".join(rng.choice(words) for _ in range(rng.randint(0, 30)))}
+        for i in range(segments)
+    ], ensure_ascii=rng.random() < 0.5).encode()
+
+
+def installed(backend: str) -> bool:
+    return backend in ("stdlib", "stream") or importlib.util.find_spec(backend) is not None
+
+
+class BackendEquivalenceTest(unittest.TestCase):
+    """Every JSON backend gives the same notes as the original json.loads code."""
+
+    samples = ODD_INPUTS + [transcript(n, seed=n) for n in (1, 10, 500)]
+
+    def test_backends_match_reference(self) -> None:
+        for backend in JSON_BACKENDS:
+            if not installed(backend):
+                continue
+            for raw in self.samples:
+                with self.subTest(backend=backend, raw=raw[:40]):
+                    self.assertEqual(
+                        outcome(lambda r: parse_note("n", r, backend), raw),
+                        outcome(lambda r: reference_parse("n", r), raw),
+                    )
+
+    def test_default_backend_matches_reference(self) -> None:
+        for raw in self.samples:
+            with self.subTest(raw=raw[:40]):
+                self.assertEqual(
+                    outcome(lambda r: parse_note("n", r), raw),
+                    outcome(lambda r: reference_parse("n", r), raw),
+                )
+
+    def test_str_input(self) -> None:
+        raw = transcript(20).decode()
+        for backend in JSON_BACKENDS:
+            if installed(backend):
+                with self.subTest(backend=backend):
+                    self.assertEqual(parse_note("n", raw, backend), reference_parse("n", raw))
+
+
+class FilesTest(unittest.TestCase):
+    def test_parse_filename_dt(self) -> None:
+        self.assertEqual(
+            parse_filename_dt("Global (2025-09-05 13.42.00).json"),
+            dt.datetime(2025, 9, 5, 13, 42),
+        )
+        self.assertIsNone(parse_filename_dt("notes.json"))
+
+    def test_load_note_skips_empty_and_malformed(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            ok = Path(tmp) / "Global (2025-09-05 13.42.00).json"
+            ok.write_bytes(transcript(5))
+            empty = Path(tmp) / "Global (2025-09-05 14.00.00).json"
+            empty.write_bytes(b'[{"text": " "}]')
+            self.assertEqual(load_note(ok), reference_parse(ok.name, ok.read_bytes()))
+            self.assertIsNone(load_note(empty))
+            notes = find_notes(Path(tmp), dt.date(2025, 9, 5), dt.date(2025, 9, 5), 0)
+            self.assertEqual([n.id for n in notes], [ok.name])
+
+
+if __name__ == "__main__":
+    unittest.main()
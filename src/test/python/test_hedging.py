@@ -0,0 +1,122 @@
+import asyncio
+import random
+import threading
+import time
+import unittest
+from typing import List, Optional
+
+from summarizer.hedging import HedgedClient, LatencyHistory, percentile
+from summarizer.llm_clients import call_usage, record_usage
+from summarizer.models import Usage
+
+
+class StubClient:
+    """Answers after `delay` seconds, failing the first `failures` calls."""
+
+    def __init__(self, name: str, delay: float = 0.0, failures: int = 0,
+                 tokens: int = 1) -> None:
+        self.provider = "stub"
+        self.model = name
+        self.delay = delay
+        self.failures = failures
+        self.tokens = tokens
+        self.calls = 0
+        self.last_usage: Optional[Usage] = None
+        self._lock = threading.Lock()
+
+    def _next(self) -> None:
+        with self._lock:
+            self.calls += 1
+            failing = self.calls <= self.failures
+        if failing:
+            raise ConnectionError(f"{self.model} down")
+
+    def complete(self, prompt: str) -> str:
+        time.sleep(self.delay)
+        self._next()
+        record_usage(self, Usage(input_tokens=self.tokens))
+        return self.model
+
+    async def acomplete(self, prompt: str) -> str:
+        await asyncio.sleep(self.delay)
+        self._next()
+        record_usage(self, Usage(input_tokens=self.tokens))
+        return self.model
+
+
+def hedged(clients: List[StubClient], **kwargs) -> HedgedClient:
+    options = dict(initial_delay=0.05, retries=0, backoff=0.01, rng=random.Random(0))
+    return HedgedClient(clients, **(options | kwargs))
+
+
+class PercentileTest(unittest.TestCase):
+    def test_nearest_rank(self) -> None:
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 95), 95.0)
+        self.assertEqual(percentile([3.0], 99), 3.0)
+
+    def test_history_needs_enough_samples(self) -> None:
+        history = LatencyHistory()
+        for seconds in (0.1, 0.2, 0.3, 0.4):
+            history.record("stub/a", seconds)
+        self.assertIsNone(history.percentile("stub/a", 95))
+        history.record("stub/a", 0.5)
+        self.assertEqual(history.percentile("stub/a", 95), 0.5)
+
+
+class HedgedClientTest(unittest.TestCase):
+    def test_fast_primary_wins_alone(self) -> None:
+        primary, backup = StubClient("a"), StubClient("b")
+        client = hedged([primary, backup])
+        self.assertEqual(client.complete("p"), "a")
+        self.assertEqual(backup.calls, 0)
+        self.assertEqual(client.outcomes[-1].reason, "primary")
+
+    def test_slow_primary_is_hedged(self) -> None:
+        primary, backup = StubClient("a", delay=0.5), StubClient("b", tokens=7)
+        client = hedged([primary, backup])
+        self.assertEqual(client.complete("p"), "b")
+        self.assertTrue(client.outcomes[-1].reason.startswith("hedge"))
+        self.assertEqual(client.outcomes[-1].launched, 2)
+        self.assertEqual(call_usage().input_tokens, 7)
+
+    def test_failed_primary_falls_back(self) -> None:
+        primary, backup = StubClient("a", failures=5), StubClient("b")
+        client = hedged([primary, backup], initial_delay=5.0)
+        self.assertEqual(client.complete("p"), "b")
+        outcome = client.outcomes[-1]
+        self.assertTrue(outcome.reason.startswith("fallback"))
+        self.assertEqual(len(outcome.errors), 1)
+
+    def test_retries_before_falling_back(self) -> None:
+        primary, backup = StubClient("a", failures=2), StubClient("b")
+        client = hedged([primary, backup], initial_delay=5.0, retries=2)
+        self.assertEqual(client.complete("p"), "a")
+        self.assertEqual(primary.calls, 3)
+        self.assertEqual(backup.calls, 0)
+
+    def test_all_failing_raises(self) -> None:
+        client = hedged([StubClient("a", failures=9), StubClient("b", failures=9)])
+        with self.assertRaises(RuntimeError):
+            client.complete("p")
+
+    def test_learned_delay_replaces_initial(self) -> None:
+        history = LatencyHistory()
+        for _ in range(5):
+            history.record("stub/a", 0.02)
+        client = hedged([StubClient("a"), StubClient("b")], history=history,
+                        initial_delay=60.0)
+        self.assertEqual(client.hedge_delay(client.clients[0]), 0.02)
+
+    def test_async_hedge_cancels_loser(self) -> None:
+        primary, backup = StubClient("a", delay=5.0), StubClient("b")
+        client = hedged([primary, backup])
+        t0 = time.perf_counter()
+        self.assertEqual(asyncio.run(client.acomplete("p")), "b")
+        self.assertLess(time.perf_counter() - t0, 1.0)
+        self.assertEqual(primary.calls, 0)   # cancelled while sleeping
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from summarizer.ledger import stats_main
+
+RUN = {"provider": "openai", "model": "gpt-4o-mini", "status": "ok", "latency_s": 1.0,
+       "notes": 3, "input_tokens": 100, "output_tokens": 20}
+
+
+class StatsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.ledger = Path(self._tmp.name) / "runs.jsonl"
+        # A hand-written or truncated record may lack a timestamp.
+        records = [{"ts": "2025-09-01T10:00:00"} | RUN, RUN, {"ts": "soon"} | RUN]
+        self.ledger.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def stats(self, *argv: str) -> str:
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(stats_main(["--ledger", str(self.ledger), *argv]), 0)
+        return out.getvalue()
+
+    def test_weekly_buckets_undated_records(self) -> None:
+        report = json.loads(self.stats("--weekly", "--json"))
+        self.assertEqual(report["overall"]["openai/gpt-4o-mini"]["runs"], 3)
+        weekly = {k: v["runs"] for k, v in report["weekly"].items()}
+        self.assertEqual(weekly, {"openai/gpt-4o-mini 2025-W36": 1,
+                                  "openai/gpt-4o-mini undated": 2})
+
+    def test_table_with_undated_records(self) -> None:
+        self.assertIn("3 run(s) from 2025-09-01 to 2025-09-01", self.stats("--weekly"))
+        self.assertIn("2025-W36", self.stats("--since", "2025-01-01", "--weekly"))
+
+
+if __name__ == "__main__":
+    unittest.main()
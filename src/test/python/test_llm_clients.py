@@ -0,0 +1,65 @@
+import asyncio
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from summarizer.llm_clients import TALLY, _traced, call_usage, record_usage
+from summarizer.models import Usage
+
+
+class SlowClient:
+    """Reports usage as soon as a call starts, then takes longer for short prompts,
+    so calls that overlap would read each other's `last_usage`."""
+
+    provider = "stub"
+    model = "slow"
+
+    def __init__(self) -> None:
+        self.last_usage = None
+
+    def _usage(self, prompt: str) -> float:
+        record_usage(self, Usage(input_tokens=len(prompt), output_tokens=1))
+        return 0.05 / len(prompt)
+
+    @_traced("llm.complete")
+    def complete(self, prompt: str) -> str:
+        time.sleep(self._usage(prompt))
+        return prompt
+
+    @_traced("llm.acomplete", kind="async")
+    async def acomplete(self, prompt: str) -> str:
+        await asyncio.sleep(self._usage(prompt))
+        return prompt
+
+
+PROMPTS = ["x" * n for n in range(1, 9)]
+
+
+class CallUsageTest(unittest.TestCase):
+    def test_threads_tally_their_own_usage(self) -> None:
+        client = SlowClient()
+        before = TALLY.snapshot()
+        with ThreadPoolExecutor(len(PROMPTS)) as pool:
+            list(pool.map(client.complete, PROMPTS))
+        fields = TALLY.since(before)
+        self.assertEqual(fields["llm_calls"], len(PROMPTS))
+        self.assertEqual(fields["input_tokens"], sum(map(len, PROMPTS)))
+
+    def test_tasks_tally_their_own_usage(self) -> None:
+        client = SlowClient()
+
+        async def one(prompt: str) -> Usage:
+            await client.acomplete(prompt)
+            return call_usage()
+
+        async def run():
+            return await asyncio.gather(*(one(p) for p in PROMPTS))
+
+        before = TALLY.snapshot()
+        usages = asyncio.run(run())
+        self.assertEqual([u.input_tokens for u in usages], list(map(len, PROMPTS)))
+        self.assertEqual(TALLY.since(before)["input_tokens"], sum(map(len, PROMPTS)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import datetime as dt
+import re
+import threading
+import unittest
+from typing import List
+
+from summarizer.mapreduce import reduce_summaries, split_summary
+
+DAY = dt.date(2025, 9, 10)
+PARTIAL = re.compile(r"^# PARTIAL SUMMARY \d+\n(.*?)(?=\n\n# PARTIAL SUMMARY|\Z)",
+                     re.DOTALL | re.MULTILINE)
+
+
+class ShrinkingClient:
+    """Answers each reduce prompt with one short line per partial merged."""
+
+    provider = "stub"
+    model = "stub"
+    last_usage = None
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.partials: List[List[str]] = []
+
+    def complete(self, prompt: str) -> str:
+        parts = [m.group(1) for m in PARTIAL.finditer(prompt)]
+        with self.lock:
+            self.partials.append(parts)
+        return f"- merged {len(parts)} part(s)\n"
+
+
+def summary(lines: int, width: int = 40) -> str:
+    return "".join(f"- {'x' * (width - 3)}\n" for _ in range(lines))
+
+
+class SplitSummaryTest(unittest.TestCase):
+    def test_pieces_fit_and_rejoin(self) -> None:
+        text = summary(10)
+        pieces = split_summary(text, 100)
+        self.assertTrue(all(len(p) <= 100 for p in pieces))
+        self.assertEqual("".join(pieces), text)
+
+    def test_line_over_budget_fails_clearly(self) -> None:
+        with self.assertRaises(SystemExit):
+            split_summary(summary(1, width=200), 100)
+
+
+class ReduceTest(unittest.TestCase):
+    def test_small_partials_merge_in_one_call(self) -> None:
+        client = ShrinkingClient()
+        reduce_summaries(["- a\n", "- b\n", "- c\n"], client, DAY, DAY, 0, 1000)
+        self.assertEqual(len(client.partials), 1)
+
+    def test_oversized_partials_respect_budget(self) -> None:
+        client = ShrinkingClient()
+        partials = [summary(10) for _ in range(4)]   # 400 chars each
+        merged = reduce_summaries(partials, client, DAY, DAY, 0, 300)
+        self.assertTrue(merged.startswith("- merged"))
+        for parts in client.partials:
+            self.assertLessEqual(sum(len(p) for p in parts), 300)
+
+
+if __name__ == "__main__":
+    unittest.main()
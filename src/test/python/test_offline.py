@@ -0,0 +1,70 @@
+import asyncio
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from summarizer.cli import build_client, build_parser
+from summarizer.llm_clients import TALLY
+from summarizer.offline import RecordingClient, ReplayClient, SimulatedClient
+
+
+PROMPTS = [f"Summarize note {i}: " + "word " * (40 * i) for i in range(1, 9)]
+
+
+class ReplayUsageTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.fixture = Path(self._tmp.name) / "fixture.jsonl"
+        recorder = RecordingClient(SimulatedClient("median=0.02,seed=3"), self.fixture)
+        before = TALLY.snapshot()
+        for prompt in PROMPTS:
+            recorder.complete(prompt)
+        self.recorded = TALLY.since(before)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_concurrent_replay_tallies_recorded_usage(self) -> None:
+        client = ReplayClient(str(self.fixture))
+        before = TALLY.snapshot()
+        with ThreadPoolExecutor(len(PROMPTS)) as pool:
+            list(pool.map(client.complete, PROMPTS))
+        replayed = TALLY.since(before)
+        self.assertEqual(replayed["input_tokens"], self.recorded["input_tokens"])
+        self.assertEqual(replayed["output_tokens"], self.recorded["output_tokens"])
+
+    def test_concurrent_async_replay_tallies_recorded_usage(self) -> None:
+        client = ReplayClient(str(self.fixture))
+
+        async def run() -> None:
+            await asyncio.gather(*(client.acomplete(p) for p in PROMPTS))
+
+        before = TALLY.snapshot()
+        asyncio.run(run())
+        replayed = TALLY.since(before)
+        self.assertEqual(replayed["input_tokens"], self.recorded["input_tokens"])
+        self.assertEqual(replayed["output_tokens"], self.recorded["output_tokens"])
+
+
+class RecordOnWarmCacheTest(unittest.TestCase):
+    def test_record_then_replay_with_a_warm_cache(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            fixture = Path(tmp) / "fixture.jsonl"
+
+            def client(*argv: str):
+                return build_client(build_parser().parse_args([
+                    "2024-01-02", "--cache-dir", str(Path(tmp) / "cache"), *argv,
+                ]))
+
+            live = ["--provider", "simulated", "--model", "median=0.001,seed=1"]
+            answer = client(*live).complete(PROMPTS[0])   # warms the cache
+            recorder = client(*live, "--record", str(fixture))
+            self.assertEqual(recorder.complete(PROMPTS[0]), answer)
+            self.assertEqual(recorder.recorded, 1)
+            replay = client("--provider", "replay", "--model", f"{fixture},speed=0")
+            self.assertEqual(replay.complete(PROMPTS[0]), answer)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import asyncio
+import email.utils
+import time
+import unittest
+from typing import Dict, List
+from unittest import mock
+
+from summarizer.models import Usage
+from summarizer.ratelimit import (
+    Bucket, Limiter, is_rate_limit, is_transient, parse_duration, retry_after,
+)
+
+
+class RateLimited(Exception):
+    """Shaped like an SDK's 429 error."""
+
+    status_code = 429
+
+    def __init__(self, headers: Dict[str, str]) -> None:
+        super().__init__("429")
+        self.response = type("Response", (), {"headers": headers})()
+
+
+class ServerError(Exception):
+    """Shaped like an SDK's 5xx error."""
+
+    status_code = 503
+
+    def __init__(self, headers: Dict[str, str]) -> None:
+        super().__init__("503")
+        self.response = type("Response", (), {"headers": headers})()
+
+
+class APIConnectionError(Exception):
+    """Named like the SDKs' connection error, which carries no status."""
+
+
+class Flaky:
+    """Fails with `errors` in turn, then answers."""
+
+    def __init__(self, *errors: Exception) -> None:
+        self.errors: List[Exception] = list(errors)
+        self.calls = 0
+
+    def __call__(self, prompt: str) -> str:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+class RetryAfterTest(unittest.TestCase):
+    def test_parse_duration(self) -> None:
+        self.assertEqual(parse_duration("1m30s"), 90.0)
+        self.assertEqual(parse_duration("20ms"), 0.02)
+        self.assertEqual(parse_duration("6m0.5s"), 360.5)
+        self.assertIsNone(parse_duration("soon"))
+        self.assertIsNone(parse_duration("1m junk"))
+
+    def test_retry_after_headers(self) -> None:
+        self.assertEqual(retry_after({"retry-after-ms": "250"}), 0.25)
+        self.assertEqual(retry_after({"retry-after": "3"}), 3.0)
+        later = email.utils.formatdate(time.time() + 30, usegmt=True)
+        self.assertAlmostEqual(retry_after({"retry-after": later}), 30, delta=2)
+        self.assertIsNone(retry_after({}))
+        self.assertIsNone(retry_after(None))
+
+    def test_reset_headers_of_exhausted_limits(self) -> None:
+        headers = {
+            "x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2s",
+            "x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "1m",
+        }
+        self.assertEqual(retry_after(headers), 60.0)
+        headers["x-ratelimit-remaining-tokens"] = "500"
+        self.assertEqual(retry_after(headers), 2.0)
+
+    def test_is_rate_limit(self) -> None:
+        self.assertTrue(is_rate_limit(RateLimited({})))
+        self.assertFalse(is_rate_limit(ValueError("nope")))
+
+    def test_is_transient(self) -> None:
+        self.assertTrue(is_transient(RateLimited({})))
+        self.assertTrue(is_transient(ServerError({})))
+        self.assertTrue(is_transient(APIConnectionError("reset")))
+        self.assertFalse(is_transient(ConnectionError("reset")))
+        self.assertFalse(is_transient(ValueError("nope")))
+
+
+class BucketTest(unittest.TestCase):
+    def test_debt_is_repaid_in_order(self) -> None:
+        bucket = Bucket(60)   # one per second, burst of one
+        now = bucket.updated
+        self.assertEqual(bucket.reserve(1, now), 0.0)
+        self.assertAlmostEqual(bucket.reserve(1, now), 0.0)
+        self.assertAlmostEqual(bucket.reserve(1, now), 1.0)
+        self.assertAlmostEqual(bucket.reserve(1, now), 2.0)
+
+    def test_oversized_request_goes_through(self) -> None:
+        bucket = Bucket(60)
+        now = bucket.updated
+        self.assertEqual(bucket.reserve(10, now), 0.0)
+        self.assertAlmostEqual(bucket.reserve(1, now), 9.0)
+
+
+class LimiterTest(unittest.TestCase):
+    def test_429_is_retried_after_header_delay(self) -> None:
+        limiter = Limiter("stub", "m", max_retries=3)
+        fn = Flaky(RateLimited({"retry-after-ms": "20"}), RateLimited({"retry-after-ms": "20"}))
+        t0 = time.perf_counter()
+        self.assertEqual(limiter.call(fn, "prompt", lambda: None), "ok")
+        self.assertGreaterEqual(time.perf_counter() - t0, 0.04)
+        self.assertEqual(fn.calls, 3)
+        self.assertEqual(limiter.rate_limited, 2)
+
+    def test_retries_are_capped(self) -> None:
+        limiter = Limiter("stub", "m", max_retries=1)
+        fn = Flaky(*(RateLimited({"retry-after-ms": "1"}) for _ in range(3)))
+        with self.assertRaises(RateLimited):
+            limiter.call(fn, "prompt", lambda: None)
+        self.assertEqual(fn.calls, 2)
+
+    def test_other_errors_are_not_retried(self) -> None:
+        limiter = Limiter("stub", "m")
+        fn = Flaky(ConnectionError("reset"))
+        with self.assertRaises(ConnectionError):
+            limiter.call(fn, "prompt", lambda: None)
+        self.assertEqual(fn.calls, 1)
+
+    def test_server_error_backs_off_only_that_request(self) -> None:
+        limiter = Limiter("stub", "m", max_retries=3)
+        fn = Flaky(ServerError({"retry-after-ms": "20"}), APIConnectionError("reset"))
+        with mock.patch("summarizer.ratelimit.BACKOFF", 0.01):
+            self.assertEqual(limiter.call(fn, "prompt", lambda: None), "ok")
+        self.assertEqual(fn.calls, 3)
+        self.assertEqual(limiter.rate_limited, 0)
+        self.assertEqual(limiter.blocked_for(), 0.0)
+
+    def test_async_429_is_retried(self) -> None:
+        limiter = Limiter("stub", "m")
+        fn = Flaky(RateLimited({"retry-after-ms": "10"}))
+
+        async def afn(prompt: str) -> str:
+            return fn(prompt)
+
+        self.assertEqual(asyncio.run(limiter.acall(afn, "prompt", lambda: None)), "ok")
+        self.assertEqual(fn.calls, 2)
+
+    def test_stream_retried_only_before_first_chunk(self) -> None:
+        limiter = Limiter("stub", "m")
+        calls = []
+
+        def stream(prompt: str):
+            calls.append(prompt)
+            yield "first"
+            raise RateLimited({"retry-after-ms": "1"})
+
+        with self.assertRaises(RateLimited):
+            list(limiter.stream(stream, "prompt", lambda: None))
+        self.assertEqual(len(calls), 1)
+
+    def test_retries_reserve_capacity_once(self) -> None:
+        limiter = Limiter("stub", "m", rpm=600, tpm=600_000, max_retries=3)
+        requests, tokens = limiter.requests.level, limiter.tokens.level
+        fn = Flaky(RateLimited({"retry-after-ms": "1"}), RateLimited({"retry-after-ms": "1"}))
+        self.assertEqual(limiter.call(fn, "prompt", lambda: None), "ok")
+        self.assertEqual(fn.calls, 3)
+        self.assertEqual(limiter.requests.level, requests - 1)
+        self.assertEqual(limiter.tokens.level, tokens - limiter.estimate("prompt"))
+
+    def test_settle_corrects_token_estimate(self) -> None:
+        limiter = Limiter("stub", "m", tpm=600_000)   # 10k tokens/s, burst 10k
+        level = limiter.tokens.level
+        limiter.call(lambda p: "ok", "x" * 4000, lambda: Usage(input_tokens=1000, output_tokens=100))
+        # Only the reported 1,100 tokens stay taken, not the larger estimate.
+        self.assertAlmostEqual(limiter.tokens.level, level - 1100, delta=100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import datetime as dt
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from summarizer.budget import TokenCounter
+from summarizer.catalog import NoteCatalog
+from summarizer.cli import build_parser, prepare_summary
+from summarizer.relevance import BM25Index
+
+DAY = dt.date(2025, 9, 10)
+
+
+def write_note(notes: Path, when: dt.datetime, text: str) -> None:
+    name = f"Global ({when:%Y-%m-%d %H.%M.%S}).json"
+    (notes / name).write_text(json.dumps([{"text": text}]))
+
+
+class RelevanceBudgetTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.notes = root / "notes"
+        self.notes.mkdir()
+        write_note(self.notes, dt.datetime(2025, 9, 10, 9),
+                   "Zephyr migration kickoff: schema rollout and quokka backfill.")
+        # Months-old notes about the same project, and recent unrelated ones.
+        for i in range(12):
+            write_note(self.notes, dt.datetime(2025, 5, 1 + i, 9),
+                       f"Zephyr schema rollout notes {i}; quokka backfill " + "detail " * 40)
+        for i in range(28):
+            write_note(self.notes, dt.datetime(2025, 9, 9, 0, i),
+                       f"Lunch order {i}: " + "sandwich " * 40)
+        self.catalog = NoteCatalog(self.notes, db_path=root / "catalog.sqlite3")
+
+    def tearDown(self) -> None:
+        self.catalog.close()
+        self._tmp.cleanup()
+
+    def prepare(self, *argv: str):
+        args = build_parser().parse_args([
+            DAY.isoformat(), "--input-dir", str(self.notes), "--provider", "simulated",
+            "--context-select", "relevance", *argv,
+        ])
+        return args, prepare_summary(args, DAY, DAY, self.catalog)
+
+    def test_token_budget_keeps_relevant_older_notes(self) -> None:
+        args, (notes, prompt) = self.prepare("--max-tokens", "1400")
+        context = [n for n in notes if not n.in_range]
+        self.assertGreater(len(context), 4)
+        self.assertTrue(all(n.when.month == 5 for n in context))
+        self.assertLessEqual(TokenCounter(args.provider, args.model).count(prompt), 1400)
+
+    def test_char_budget(self) -> None:
+        _, (notes, prompt) = self.prepare("--max-chars", "1500")
+        self.assertTrue(any(n.when.month == 5 for n in notes if not n.in_range))
+        self.assertLessEqual(sum(n.length for n in notes), 1500)
+
+
+class BM25IndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.notes = root / "notes"
+        self.notes.mkdir()
+        for i, topic in enumerate(["zephyr rollout", "lunch sandwich", "garden hose", "tax forms"]):
+            write_note(self.notes, dt.datetime(2025, 5, 1 + i, 9), f"{topic} notes")
+        self.catalog = NoteCatalog(self.notes, db_path=root / "catalog.sqlite3")
+        self.catalog.refresh()
+        self.index = BM25Index(self.catalog)
+        self.index.update()
+
+    def tearDown(self) -> None:
+        self.index.close()
+        self.catalog.close()
+        self._tmp.cleanup()
+
+    def search(self, query: str):
+        return [p.name for p, _, _ in self.index.search(query, dt.date(2025, 1, 1), DAY)]
+
+    def test_file_edited_in_place_is_reindexed(self) -> None:
+        path = next(self.notes.glob("*05-01*"))
+        self.assertEqual(self.search("zephyr"), [path.name])
+        path.write_text(json.dumps([{"text": "quokka backfill notes"}]))
+        self.catalog.verify(dt.date(2025, 5, 1), dt.date(2025, 5, 1))
+        self.assertEqual(self.index.update(), 1)
+        self.assertEqual(self.search("quokka"), [path.name])
+        self.assertEqual(self.search("zephyr"), [])
+        self.assertEqual(self.index.update(), 0)
+
+    def test_query_with_many_distinct_terms(self) -> None:
+        query = " ".join(f"filler{i}" for i in range(40_000)) + " garden"
+        self.assertEqual(len(self.search(query)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import contextlib
+import http.client
+import io
+import os
+import stat
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from summarizer.cli import build_parser
+from summarizer.remote import SERVER_OPTIONS, forwarded_argv
+from summarizer.server import SummaryService, _Handler, _TCPServer, bind_unix
+
+
+class ParseTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.notes = Path(self._tmp.name).resolve()
+        self.service = SummaryService([self.notes])
+        self.enterContext(contextlib.redirect_stderr(io.StringIO()))
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def parse(self, *argv: str):
+        return self.service._parse(
+            {"argv": ["2024-01-02", "--input-dir", str(self.notes), *argv]}
+        )
+
+    def test_summarize_options_accepted(self) -> None:
+        args = self.parse("--provider", "simulated", "--model", "median=0.1",
+                          "--map-reduce", "--fan-out", "2", "--refine-mode", "edit")
+        self.assertEqual(args.fan_out, 2)
+        self.assertEqual(args.input_dir, self.notes)
+
+    def test_other_options_rejected(self) -> None:
+        for argv in (["--cache-dir", "/tmp/x"], ["--cache", "/tmp/x"],
+                     ["--ledger=/tmp/l"], ["--api-key", "k"], ["--record", "/tmp/r"],
+                     ["--trace-out", "/tmp/t"], ["--rebuild-index"]):
+            with self.subTest(argv=argv), self.assertRaises(ValueError):
+                self.parse(*argv)
+
+    def test_replay_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            self.parse("--provider", "replay")
+        with self.assertRaises(ValueError):
+            self.parse("--hedge", "replay:x")
+
+    def test_unserved_input_dir_rejected(self) -> None:
+        with tempfile.TemporaryDirectory() as other, self.assertRaises(ValueError):
+            self.service._parse({"argv": ["2024-01-02", "--input-dir", other]})
+
+    def test_forwarded_argv_round_trips(self) -> None:
+        client = build_parser().parse_args([
+            "2024-01-02", "--input-dir", str(self.notes), "--provider", "simulated",
+            "--hedge", "simulated:a", "--hedge", "simulated:b", "--dedup",
+            "--max-chars", "5000", "--cache-dir", "/tmp/elsewhere",
+            "--ledger", "/tmp/ledger.jsonl", "--api-key", "secret",
+        ])
+        argv = forwarded_argv(client)
+        self.assertNotIn("secret", argv)
+        self.assertNotIn("/tmp/elsewhere", argv)
+        served = self.service._parse({"argv": argv})
+        for dest in SERVER_OPTIONS:
+            self.assertEqual(getattr(served, dest), getattr(client, dest), dest)
+
+
+class HandlerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.enterContext(contextlib.redirect_stderr(io.StringIO()))
+        self.server = _TCPServer(("127.0.0.1", 0), _Handler)
+        self.port = self.server.server_address[1]
+        self.server.service = SummaryService([])
+        self.server.token = "t0ken"
+        self.server.hosts = frozenset({f"127.0.0.1:{self.port}"})
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def request(self, method: str = "GET", path: str = "/health", **headers: str) -> int:
+        headers = {"Host": f"127.0.0.1:{self.port}",
+                   "Authorization": "Bearer t0ken"} | headers
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        try:
+            conn.putrequest(method, path, skip_host=True)
+            for name, value in headers.items():
+                if value:
+                    conn.putheader(name, value)
+            body = b"{}" if method == "POST" else b""
+            conn.putheader("Content-Length", str(len(body)))
+            conn.endheaders(body)
+            return conn.getresponse().status
+        finally:
+            conn.close()
+
+    def test_health_with_token(self) -> None:
+        self.assertEqual(self.request(), 200)
+
+    def test_missing_or_wrong_token(self) -> None:
+        self.assertEqual(self.request(Authorization=""), 401)
+        self.assertEqual(self.request(Authorization="Bearer nope"), 401)
+
+    def test_unexpected_host(self) -> None:
+        self.assertEqual(self.request(Host=f"evil.example:{self.port}"), 403)
+
+    def test_origin_refused(self) -> None:
+        self.assertEqual(self.request(Origin="http://evil.example"), 403)
+
+    def test_post_needs_json(self) -> None:
+        self.assertEqual(
+            self.request("POST", "/summarize", **{"Content-Type": "text/plain"}), 415
+        )
+        self.assertEqual(
+            self.request("POST", "/summarize", **{"Content-Type": "application/json"}), 400
+        )
+
+
+class UnixSocketTest(unittest.TestCase):
+    def test_socket_is_private(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "run" / "server.sock"
+            server = bind_unix(path)
+            try:
+                self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+            finally:
+                server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import List
+
+from summarizer.watcher import Watcher
+
+
+class Stop(Exception):
+    pass
+
+
+class QuietSource:
+    """An event source that never reports anything, for `polls` ticks."""
+
+    overflowed = False
+
+    def __init__(self, polls: int) -> None:
+        self.polls = polls
+
+    def poll(self, timeout: float) -> List[str]:
+        if self.polls == 0:
+            raise Stop
+        self.polls -= 1
+        time.sleep(timeout)
+        return []
+
+
+class WatcherTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.src = Path(self._tmp.name) / "src"
+        self.dest = Path(self._tmp.name) / "dest"
+        self.src.mkdir()
+        self.dest.mkdir()
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_handle_copies_wanted_names_once(self) -> None:
+        (self.src / "a.json").write_text("{}")
+        (self.src / ".hidden.json").write_text("{}")
+        watcher = Watcher(self.src, self.dest, patterns=["*.json"])
+        self.assertEqual(watcher.handle(["a.json", "a.json", ".hidden.json"]), 1)
+        self.assertEqual(watcher.handle(["a.json"]), 0)
+        self.assertEqual(sorted(p.name for p in self.dest.iterdir()), ["a.json"])
+
+    def test_files_too_recent_at_startup_are_copied_later(self) -> None:
+        (self.src / "new.json").write_text("{}")
+        watcher = Watcher(self.src, self.dest)
+        self.assertEqual(watcher.sync_existing(min_age=0.2), 0)
+        with self.assertRaises(Stop):
+            watcher.run(QuietSource(polls=5), interval=0.1, resync_after=0.2)
+        self.assertTrue((self.dest / "new.json").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()